@@ -1,21 +1,136 @@
-from flask import Flask, jsonify, request
+import copy
+import functools
+import json
+import os
+
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from game import Game
-from assistant import  determine_position, classify_hand, determine_action, get_updated_ranges
-from flop_assistant import recommend_action
-import threading
+from assistant import  determine_position, classify_hand, determine_action, get_updated_ranges, get_preflop_equities
+from flop_assistant import METHODS, recommend_action
+from handdb import HandDatabase
+from history import HandRecorder, HandRecording
+from cards import card_strings, to_cards
+from sessions import DEFAULT_TABLE, TableManager
+from state_store import VersionConflict, make_state_store
 
 app = Flask(__name__)
-CORS(app, supports_credentials=True)
+CORS(app, supports_credentials=True, expose_headers=["ETag", "X-State-Version"])
+
+# Tables are kept in the process unless POKER_STATE_DB names a SQLite file shared by the workers
+tables = TableManager(make_state_store(os.environ.get("POKER_STATE_DB")))
+# Opponent ranges follow the observed frequencies of the players stored in the POKER_HAND_DB hand database
+hand_db = HandDatabase(os.environ["POKER_HAND_DB"]) if os.environ.get("POKER_HAND_DB") else None
+# Hands played at the tables are appended to the POKER_HAND_HISTORY file (see history.py), to fill the hand database
+hand_recorder = HandRecorder(os.environ["POKER_HAND_HISTORY"]) if os.environ.get("POKER_HAND_HISTORY") else None
+SAVE_ATTEMPTS = 5
+STREAM_KEEPALIVE = 15  # Seconds between keep-alive comments of the state streams
+LONG_POLL_MAX_WAIT = 30  # Longest wait of a long-polling /game_state request, in seconds
+
+def current_table_id():
+    """
+    Returns the table a request is for: the "table" query parameter or JSON field, "default" otherwise.
+    """
+    data = request.get_json(silent=True) if request.is_json else None
+    return str(request.args.get("table") or (data or {}).get("table") or DEFAULT_TABLE)
 
-game_instance = None
-config_locked = False
+def start_recording(table, finished):
+    """
+    Records the hand played at a table during a request, when hands are recorded (see hand_recorder).
 
-@app.route('/game_state', methods=['GET'])
-def get_game_state():
+    :param finished: List receiving the hand history lines of the hands finished during the request
+    :return: Tuple (HandRecording, EventBus it listens to), or None
     """
-    Get the current game state, including players, stacks, and community cards.
+    if hand_recorder is None or table.game is None:
+        return None
+    # A copy, so a request that fails leaves the record of the cached table untouched
+    recording = HandRecording(finished.append, copy.deepcopy(table.recording))
+    recording.subscribe(table.game.events)
+    return recording, table.game.events
+
+def table_route(mutates=False):
+    """
+    Passes the table of the request to the view. For views changing the table, the table is saved
+    after a successful response and the view is run again on the fresh state when another worker
+    saved the table in the meantime. The hands they finish are recorded once the table is saved.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            table_id = current_table_id()
+            if not mutates:
+                return view(tables.get(table_id), *args, **kwargs)
+            for _ in range(SAVE_ATTEMPTS):
+                with tables.lock(table_id):
+                    table = tables.get(table_id)
+                    finished = []
+                    recording = start_recording(table, finished)
+                    try:
+                        response = view(table, *args, **kwargs)
+                    except Exception:
+                        tables.discard(table_id)  # Reload whatever the view changed before raising
+                        raise
+                    finally:
+                        if recording is not None:
+                            recording[0].unsubscribe(recording[1])
+                    status = response[1] if isinstance(response, tuple) else 200
+                    if status >= 400:
+                        tables.discard(table_id)  # Reload whatever the view changed before failing
+                        return response
+                    if recording is not None:
+                        table.recording = recording[0].hand
+                    try:
+                        tables.save(table)
+                    except VersionConflict:
+                        continue
+                    for line in finished:
+                        hand_recorder.write_line(line)
+                    return response
+            return jsonify({"error": "Table is busy, try again"}), 409
+        return wrapper
+    return decorator
+
+def parse_cards(cards):
+    """
+    Converts card strings from a request into Cards; returns None if any card is invalid.
+    """
+    try:
+        return to_cards(cards)
+    except ValueError:
+        return None
+
+def equity_method():
     """
+    Returns the equity method a recommendation request asks for ("exact" by default, see flop_assistant.METHODS),
+    or None if it is unknown.
+    """
+    method = (request.get_json(silent=True) or {}).get("method", "exact")
+    return method if method in METHODS else None
+
+def equity_results_json(equity_results):
+    """
+    Converts the Card combos of recommend_action results (only there when asked for) into card strings.
+    """
+    return {
+        pos: {
+            **info,
+            "combo": card_strings(info["combo"]),
+            "top_combos": [{**top, "combo": card_strings(top["combo"])} for top in info["top_combos"]],
+        } if "combo" in info else info for pos, info in equity_results.items()
+    }
+
+def wants_best_combo():
+    """
+    Returns whether a recommendation request asks for the analysis against the strongest combo of each range
+    ("best_combo": true, see flop_assistant.recommend_action).
+    """
+    return bool((request.get_json(silent=True) or {}).get("best_combo"))
+
+def game_state_json(table):
+    """
+    Builds the state of a table shown by the frontend: players, stacks, community cards, ...
+    """
+    game_instance = table.game
     active_player_name = None
     game_state = {}
     if game_instance is not None:
@@ -27,14 +142,14 @@ def get_game_state():
                     {
                         "name": p.name,
                         "stack": p.stack,
-                        "hole_cards": p.hole_cards if p.name.lower() == "you" else ["🂠", "🂠"],
+                        "hole_cards": card_strings(p.hole_cards) if p.name.lower() == "you" else ["🂠", "🂠"],
                         "folded": p.folded,
                         "all_in": p.all_in,
                         "current_bet": p.current_bet,
                         "selectedHoleCards": p.selected_hole_cards,
                     } for p in game_instance.players
                 ],
-                "community_cards": game_instance.community_cards,
+                "community_cards": card_strings(game_instance.community_cards),
                 "pot": game_instance.pot,
                 "current_hand": game_instance.hand_number,
                 "dealer_position": game_instance.dealer_position,
@@ -42,13 +157,113 @@ def get_game_state():
                 "awaiting_flop_input": game_instance.awaiting_flop_input if hasattr(game_instance, "awaiting_flop_input") else False,
                 "awaiting_turn_input": game_instance.awaiting_turn_input if hasattr(game_instance, "awaiting_turn_input") else False,
             }
-    return jsonify(game_state)
+    return game_state
+
+def state_delta(old, new):
+    """
+    Returns the fields of a game state that changed: top-level fields in "changes", the changed fields
+    of each player (by index) in "players", and the fields that disappeared in "removed".
+    """
+    changes = {key: value for key, value in new.items() if key != "players" and old.get(key) != value}
+    removed = [key for key in old if key not in new]
+    old_players, new_players = old.get("players", []), new.get("players", [])
+    players = {}
+    if len(old_players) == len(new_players):
+        for index, (old_player, new_player) in enumerate(zip(old_players, new_players)):
+            if old_player != new_player:
+                players[str(index)] = {key: value for key, value in new_player.items() if old_player.get(key) != value}
+    else:
+        changes["players"] = new_players
+    return {"changes": changes, "players": players, "removed": removed}
+
+def etag_state_tag():
+    """
+    Returns the state tag (see sessions.Table.state_tag) named by the If-None-Match header, or None.
+    """
+    for tag in request.if_none_match.as_set():
+        epoch, _, version = tag.partition("-")
+        if epoch and version.isdigit():
+            return tag
+    return None
+
+@app.route('/game_state', methods=['GET'])
+def get_game_state():
+    """
+    Get the current game state, including players, stacks, and community cards.
+
+    The state has a version, sent as the ETag (and X-State-Version) header as "<epoch>-<version>" (see
+    sessions.Table.state_tag): the version only increases when the table changes, and the epoch changes
+    when the table is deleted and opened again. Clients can avoid downloading an unchanged state:
+    - If-None-Match with the ETag they have answers 304 Not Modified while the state is the same.
+    - ?since=<ETag value> (the full "<epoch>-<version>" tag) returns only the fields changed since that
+      version (see state_delta), or 304 if none; the full state when the tag is too old to be known or
+      from another epoch.
+    - &wait=<seconds> holds the request until the state changes (long polling, at most LONG_POLL_MAX_WAIT).
+    """
+    table_id = current_table_id()
+    since = request.args.get("since")
+    known = since if since is not None else etag_state_tag()
+    wait = min(max(request.args.get("wait", 0, type=float), 0), LONG_POLL_MAX_WAIT)
+    if known is not None and wait:
+        with tables.lock(table_id):
+            table = tables.get(table_id)
+        if table.state_tag == known:
+            tables.wait_for_change(table_id, table.version, timeout=wait)
+
+    with tables.lock(table_id):
+        table = tables.get(table_id)
+        tag = table.state_tag
+        # Unchanged states answer 304 without building the view
+        state = tables.snapshot(table, game_state_json) if tag != known else None
+    if state is None:
+        response = Response(status=304)
+    else:
+        old_state = tables.snapshot_at(table_id, since) if since is not None else None
+        if old_state is not None:
+            response = jsonify({"version": tag, "since": since, **state_delta(old_state, state)})
+        else:
+            response = jsonify(state)
+    response.set_etag(tag)
+    response.headers["X-State-Version"] = tag
+    response.headers["Cache-Control"] = "no-cache"  # Cached copies are revalidated with the ETag
+    return response
+
+@app.route('/game_state/stream', methods=['GET'])
+def stream_game_state():
+    """
+    Pushes the game state as Server-Sent Events: once when connecting, then every time the table changes.
+    Comment lines keep the connection alive while nothing happens.
+    """
+    table_id = current_table_id()
+
+    def events():
+        version = tag = None
+        while True:
+            tables.wait_for_change(table_id, version, timeout=STREAM_KEEPALIVE)
+            with tables.lock(table_id):
+                table = tables.get(table_id)
+                version = table.version
+                # Compared by state tag, so a table opened again at the same version is sent too
+                state = tables.snapshot(table, game_state_json) if table.state_tag != tag else None
+                tag = table.state_tag
+            if state is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {tag}\nevent: state\ndata: {json.dumps(state, separators=(',', ':'))}\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route('/action', methods=['POST'])
-def player_action():
+@table_route(mutates=True)
+def player_action(table):
     """
     Handle player actions (fold, call, raise).
     """
+    game_instance = table.game
+    if not game_instance or not game_instance.current_betting_round:
+        return jsonify({"error": "Game not active"}), 400
+
     data = request.json
     player_name = data.get("player")
     action = data.get("action")
@@ -65,27 +280,35 @@ def player_action():
 
     if action == "call":
         amount = valid_actions[action]
-    player.pending_action = (action, amount)
+    try:
+        game_instance.perform_action(player_name, action, amount)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
 
     return jsonify({"message": f"{player_name} {action}ed"})
 
 @app.route('/next_hand', methods=['POST'])
-def next_hand():
+@table_route(mutates=True)
+def next_hand(table):
     """
     Start the next hand.
     """
-    game_instance.play_hand()
+    game_instance = table.game
+    if not game_instance:
+        return jsonify({"error": "Game not configured"}), 400
+    game_instance.start_hand()
     return jsonify({"message": "Next hand started"})
 
 @app.route('/game_config', methods=['POST'])
-def configure_game():
-    
-    global game_instance, config_locked
-
-    if config_locked:
+@table_route(mutates=True)
+def configure_game(table):
+    if table.config_locked:
         return jsonify({"error": "Game already started"}), 403
 
     data = request.get_json()
+    seed = data.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        return jsonify({"error": "Seed must be a non-negative integer"}), 400
     players_config = data.get("players", [])
     button_index = data.get("button_player_index", 0)
 
@@ -97,45 +320,49 @@ def configure_game():
         if p["available"]:
             active_players.append((p["name"], p["amount"]))
             if p.get("selectedHoleCards") and p["name"].lower() == "you":
-                manual_holecards["you"] = p["selectedHoleCards"]
+                manual_holecards["you"] = parse_cards(p["selectedHoleCards"])
+                if manual_holecards["you"] is None:
+                    return jsonify({"error": "Invalid hole cards"}), 400
     
     dealer_name = players_config[button_index]["name"]
     dealer_index_mapped = ([ap[0] for ap in active_players]).index(dealer_name)
 
     names = [p[0] for p in active_players]
     stacks = [p[1] for p in active_players]
-    game_instance = Game(players=names, starting_stacks=stacks, manual_holecards=manual_holecards)
-    print("✅ Game instance created.")
+    table.reset()
+    game_instance = table.game = Game(players=names, starting_stacks=stacks, manual_holecards=manual_holecards, rng=seed)
+    print(f"✅ Game instance created for table {table.table_id}.")
     # game_instance.dealer_position = button_index
     game_instance.dealer_position = dealer_index_mapped
 
     return jsonify({"message": "Config received"})
 
 @app.route('/start_game', methods=['POST'])
-def start_game():
+@table_route(mutates=True)
+def start_game(table):
     """
     Start the game.
     """
-    global config_locked, game_instance
+    game_instance = table.game
 
     if not game_instance:
         print("❌ Cannot start game: game_instance is None")
         return jsonify({"error": "Game not configured"}), 400
     
-    config_locked = True
+    table.config_locked = True
 
-    def run_game():
-        game_instance.start_game()
     print("✅ Starting game...")
-    threading.Thread(target=run_game).start()
+    game_instance.start_hand()
     return jsonify({"message": "Game started"})
 
 @app.route('/recommend_preflop_action', methods=['POST'])
-def recommend_preflop_action():
+@table_route(mutates=False)
+def recommend_preflop_action(table):
     """
     Recommends an action based on position, hole cards, and betting history.
     Only for the player named "You".
     """
+    game_instance = table.game
     if not game_instance or not game_instance.current_betting_round:
         return jsonify({"error": "Game not active"}), 400
 
@@ -163,21 +390,38 @@ def recommend_preflop_action():
             bb_value=game_instance.big_blind
         )
 
+    equities = None
+    if len(player.hole_cards):
+        updated_ranges = get_updated_ranges(
+            players=game_instance.players,
+            big_blind=game_instance.big_blind,
+            dealer_position=game_instance.dealer_position,
+            hand_db=hand_db,
+            preflop_raisers=game_instance.preflop_raisers,
+        )
+        opponent_ranges = {pos: rng for pos, rng in updated_ranges.items() if pos != position_name}
+        equities = get_preflop_equities(player.hole_cards, opponent_ranges)
+
     return jsonify({
         "position": position_name,
         "hand": hand_code,
         "recommendation": action,
         "amount": amount,
+        "equities": equities,
     })
 
 @app.route('/set_flop', methods=['POST'])
-def set_flop():
+@table_route(mutates=True)
+def set_flop(table):
+    game_instance = table.game
     if not game_instance or not game_instance.current_betting_round:
         return jsonify({"error": "Game not active"}), 400
 
     data = request.get_json()
-    cards = data.get("flop_cards", [])
+    cards = parse_cards(data.get("flop_cards", []))
 
+    if cards is None:
+        return jsonify({"error": "Invalid flop cards"}), 400
     if len(cards) != 3:
         return jsonify({"error": "Flop must have 3 cards"}), 400
 
@@ -186,31 +430,28 @@ def set_flop():
         return jsonify({"error": "Flop already set"}), 400
     
     # Remove from deck
-    game_instance.deck.cards = [c for c in game_instance.deck.cards if c not in cards]
-    game_instance.community_cards.extend(cards)
+    game_instance.set_community_cards(cards)
     print(f"✅ Flop set to: {cards}")
 
     game_instance.awaiting_flop_input = False
 
     # Proceed with the next betting round
-    # game_instance.execute_betting_round("Flop")
-    # 🔹 Instead of calling execute_betting_round("Flop") directly:
-    import threading
-    def start_flop_betting_round():
-        game_instance.execute_betting_round("Flop")
-        # if game_instance.hand_continues():
-        #     game_instance.awaiting_turn_input = True
-    threading.Thread(target=start_flop_betting_round, daemon=True).start()
+    game_instance.start_betting_round("Flop")
 
     return jsonify({"message": "Flop set"})
 
 @app.route('/recommend_flop_action', methods=['POST'])
-def recommend_flop_action_route():
+@table_route(mutates=True)
+def recommend_flop_action_route(table):
     """
     Recommends an action based on your hand, the flop, and opponent's range.
     """
+    game_instance = table.game
     if not game_instance or not game_instance.community_cards or len(game_instance.community_cards) < 3:
         return jsonify({"error": "Flop not dealt yet"}), 400
+    method = equity_method()
+    if method is None:
+        return jsonify({"error": f"Unknown method, expected one of {', '.join(METHODS)}"}), 400
 
     player = next((p for p in game_instance.players if p.name.lower() == "you"), None)
     if not player or player.folded or player.all_in:
@@ -222,6 +463,8 @@ def recommend_flop_action_route():
         players=game_instance.players,
         big_blind=game_instance.big_blind,
         dealer_position=game_instance.dealer_position,
+        hand_db=hand_db,
+        preflop_raisers=game_instance.preflop_raisers,
     )
     game_instance.updated_ranges = updated_ranges
     
@@ -241,22 +484,27 @@ def recommend_flop_action_route():
         community=flop,
         updated_opponent_range=opponent_ranges,
         round="flop",
+        method=method,
+        best_combo=wants_best_combo(),
     )   
-    print("equity_results: ", equity_results)
 
     return jsonify({
         "opponent_ranges": opponent_ranges,
-        "equity_results": equity_results,
+        "equity_results": equity_results_json(equity_results),
     })
 
 @app.route('/set_turn', methods=['POST'])
-def set_turn():
+@table_route(mutates=True)
+def set_turn(table):
+    game_instance = table.game
     if not game_instance or not game_instance.current_betting_round:
         return jsonify({"error": "Game not active"}), 400
 
     data = request.get_json()
-    cards = data.get("turn_cards", []) # check where turn cards come from in the frontend
+    cards = parse_cards(data.get("turn_cards", [])) # check where turn cards come from in the frontend
 
+    if cards is None:
+        return jsonify({"error": "Invalid turn cards"}), 400
     if len(cards) != 1:
         return jsonify({"error": "Turn must have 4 cards"}), 400
 
@@ -265,29 +513,28 @@ def set_turn():
         return jsonify({"error": "Turn already set"}), 400
     
     # Remove from deck
-    game_instance.deck.cards = [c for c in game_instance.deck.cards if c not in cards]
-    game_instance.community_cards.extend(cards)
+    game_instance.set_community_cards(cards)
     print(f"✅ Turn set to: {cards}")
 
     game_instance.awaiting_turn_input = False # add flag for turn round
 
     # Proceed with the next betting round
-    # game_instance.execute_betting_round("Turn")
-    # 🔹 Instead of calling execute_betting_round("Turn") directly:
-    import threading
-    def start_turn_betting_round():
-        game_instance.execute_betting_round("Turn")
-    threading.Thread(target=start_turn_betting_round, daemon=True).start()
+    game_instance.start_betting_round("Turn")
 
     return jsonify({"message": "Turn set"})
 
 @app.route('/recommend_turn_action', methods=['POST'])
-def recommend_turn_action_route():
+@table_route(mutates=False)
+def recommend_turn_action_route(table):
     """
     Recommends an action based on your hand, the turn, and opponent's range.
     """
+    game_instance = table.game
     if not game_instance or not game_instance.community_cards or len(game_instance.community_cards) < 4:
         return jsonify({"error": "Turn not dealt yet"}), 400
+    method = equity_method()
+    if method is None:
+        return jsonify({"error": f"Unknown method, expected one of {', '.join(METHODS)}"}), 400
 
     player = next((p for p in game_instance.players if p.name.lower() == "you"), None)
     if not player or player.folded or player.all_in:
@@ -313,32 +560,29 @@ def recommend_turn_action_route():
             len(game_instance.players)
         )
     }
-    print("inside turn recommendation")
-    print("updated_ranges: ", updated_ranges)
-    print("opponent_ranges: ", opponent_ranges)
 
     equity_results = recommend_action(
         hero_hand=hero_hand,
         community=turn,
         updated_opponent_range=opponent_ranges,
         round="turn",
+        method=method,
+        best_combo=wants_best_combo(),
     )   
-    print("equity_results: ", equity_results)
 
     return jsonify({
         "opponent_ranges": opponent_ranges,
-        "equity_results": equity_results,
+        "equity_results": equity_results_json(equity_results),
     })
 
 @app.route("/reset", methods=["POST"])
-def reset_game():
+@table_route(mutates=True)
+def reset_game(table):
     """
     Reset the game state.
     """
-    global game_instance, config_locked
-    game_instance = None
-    config_locked = False
-    print("Game has been reset")
+    table.reset()
+    print(f"Game has been reset for table {table.table_id}")
     return jsonify({"message": "Game reset successful"})
 
 if __name__ == '__main__':
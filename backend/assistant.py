@@ -1,55 +1,74 @@
 from ranges import PREFLOP_BET_RANGES, POSITION_RANGES
+from preflop_equity import get_table
+from hand_range import Range
+from cards import to_cards
 
 def determine_position(pos_index, num_players):
+    """
+    Names a seat by its distance from the button. Tables of more than 6 players get UTG+1, UTG+2, ...
+    for their extra early seats, so every seat of the table has its own name.
+    """
     positions = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
-    return positions[pos_index % len(positions)]
+    if num_players <= len(positions) or pos_index < 3:
+        return positions[pos_index % len(positions)]
+    if pos_index >= num_players - 2:
+        return positions[pos_index - num_players]  # MP and CO are the last two seats
+    return "UTG" if pos_index == 3 else f"UTG+{pos_index - 3}"
+
+def chart_position(position):
+    """
+    Returns the position whose preflop charts (see ranges.py) a seat plays; the UTG+n seats play UTG.
+    """
+    return "UTG" if position.startswith("UTG+") else position
 
 def classify_hand(cards):
-    rank_order = "23456789TJQKA"
-    r1, s1 = cards[0][0], cards[0][1]
-    r2, s2 = cards[1][0], cards[1][1]
+    first, second = sorted(to_cards(cards), reverse=True)
 
-    suited = s1 == s2
-    ranks = sorted([r1, r2], key=lambda r: rank_order.index(r), reverse=True)
+    suited = first.suit == second.suit
 
-    if r1 == r2:
-        return f"{r1}{r2}"  # e.g., "77"
-    return f"{ranks[0]}{ranks[1]}{'s' if suited else 'o'}"
+    if first.rank == second.rank:
+        return f"{first.rank_char}{second.rank_char}"  # e.g., "77"
+    return f"{first.rank_char}{second.rank_char}{'s' if suited else 'o'}"
 
 def determine_action(position, hand, has_raiser, is_first_to_act, num_limpers, bb_value):
     """
     Determines the recommended action and raise amount based on position, hand, and previous actions.
     """
 
-    p_rules = PREFLOP_BET_RANGES[position]
-    print("+++++++++")
-    print(f"Position: {position}")
-    print("+++++++++")
+    p_rules = PREFLOP_BET_RANGES[chart_position(position)]
     # First to act: use open_raise range
     if is_first_to_act:
-        if hand in p_rules["open_raise"]["pairs"] or hand in p_rules["open_raise"]["suited"] or hand in p_rules["open_raise"]["offsuit"]:
+        open_raise = p_rules["open_raise"]
+        if Range.from_notations(open_raise["pairs"] + open_raise["suited"] + open_raise["offsuit"]).includes(hand):
             raise_amount = bb_value * 3 + (bb_value * num_limpers)
             return "raise", raise_amount
         else:
             return "fold", None
 
     # Not first: respond to a raise
-    if hand in p_rules.get("3bet_vs_raise", []):
+    if Range.from_notations(p_rules.get("3bet_vs_raise", [])).includes(hand):
         base = bb_value * 3
         if position == "BTN":
             base += bb_value
         return "raise", base * 3
-    elif hand in p_rules.get("call_vs_raise", []):
+    elif Range.from_notations(p_rules.get("call_vs_raise", [])).includes(hand):
         return "call", None
     else:
         return "fold", None
 
-def get_updated_ranges(players, big_blind, dealer_position):
+def get_updated_ranges(players, big_blind, dealer_position, hand_db=None, min_hands=50, preflop_raisers=()):
     """
     Return a filtered dict of player ranges based on preflop actions.
+
+    :param hand_db: Optional HandDatabase (see handdb.py); players with at least min_hands stored hands
+                    get the range matching their observed VPIP/PFR/3-bet frequencies instead of the charts
+    :param min_hands: Minimum number of stored hands before a player's frequencies are used
+    :param preflop_raisers: Names of the players who raised preflop, in order (see Game.preflop_raisers);
+                            a player whose first raise came after someone else's is a 3-bettor
     """
 
     updated_ranges = {}
+    raise_order = list(dict.fromkeys(preflop_raisers))  # Every raiser once, in the order of their first raise
 
     for player in players:
         if player.folded:
@@ -58,11 +77,13 @@ def get_updated_ranges(players, big_blind, dealer_position):
         pos_index = (player.position - dealer_position) % len(players)
         position_name = determine_position(pos_index, len(players))
 
-        full_range = POSITION_RANGES.get(position_name, [])
-        bet_range = PREFLOP_BET_RANGES.get(position_name, {})
+        full_range = POSITION_RANGES.get(chart_position(position_name), [])
+        bet_range = PREFLOP_BET_RANGES.get(chart_position(position_name), {})
 
         # Infer preflop action
-        if player.current_bet == 0:
+        if player.name in preflop_raisers:
+            action = "raise"
+        elif player.current_bet == 0:
             action = "check"
         elif player.current_bet == big_blind:
             action = "call"
@@ -71,6 +92,18 @@ def get_updated_ranges(players, big_blind, dealer_position):
         else:
             action = "call"  # Covers small blind case
 
+        # Narrow range from the player's observed frequencies when there are enough hands
+        if hand_db is not None:
+            # A 3-bettor's first raise came after someone else's (an opener who 4-bets stays an opener)
+            if player.name in raise_order and raise_order.index(player.name) >= 1:
+                action = "three_bet"
+            observed = hand_db.observed_range(player.name, position_name, action, min_hands)
+            if observed is not None:
+                updated_ranges[position_name] = observed
+                continue
+            if action == "three_bet":
+                action = "raise"
+
         # Narrow range based on action
         if action == "call":
             updated_ranges[position_name] = bet_range.get("call_vs_raise", [])
@@ -90,4 +123,23 @@ def get_updated_ranges(players, big_blind, dealer_position):
         else:
             updated_ranges[position_name] = full_range  # fallback (should not happen)
 
-    return updated_ranges
\ No newline at end of file
+    return updated_ranges
+
+def get_preflop_equities(hole_cards, opponent_ranges):
+    """
+    Looks up hero's preflop all-in equity against each opponent range.
+
+    :param hole_cards: Hero's 2 hole cards
+    :param opponent_ranges: Dictionary of position to list of hand notations
+    :return: Dictionary of position to equity in percent, or None if the equity table has not been built
+    """
+    table = get_table()
+    if table is None:
+        return None
+
+    equities = {}
+    for position, range_list in opponent_ranges.items():
+        equity = table.combo_vs_range(hole_cards, range_list) if range_list else None
+        if equity is not None:
+            equities[position] = equity * 100
+    return equities
@@ -0,0 +1,121 @@
+"""
+Vectorized hand evaluation for arrays of card codes.
+
+Uses the same card codes and strengths as lookup_evaluator, so results can be
+compared freely with evaluate_codes. Each call scores a whole (N, k) array of
+5, 6 or 7-card hands with a handful of NumPy operations.
+"""
+import numpy as np
+
+from lookup_evaluator import FLUSH_TABLE, RANK_TABLE, card_to_code
+
+_sorted_items = sorted(RANK_TABLE.items())
+RANK_KEYS = np.array([key for key, _ in _sorted_items], dtype=np.int64)
+RANK_STRENGTHS = np.array([strength for _, strength in _sorted_items], dtype=np.int32)
+FLUSH_STRENGTHS = np.array(FLUSH_TABLE, dtype=np.int32)
+del _sorted_items
+
+CODES = np.arange(52)
+CARD_RANK_KEYS = (5 ** (CODES >> 2)).astype(np.int64)
+CARD_RANK_BITS = (1 << (CODES >> 2)).astype(np.int32)
+CARD_SUITS = (CODES & 3).astype(np.int8)
+
+
+def to_code_array(hands):
+    """
+    Converts a list of hands into an integer code array.
+
+    :param hands: List of hands, each a list of card strings or codes of the same length
+    :return: (N, k) array of card codes
+    """
+    return np.array([[card_to_code(card) for card in hand] for hand in hands], dtype=np.int16).reshape(len(hands), -1)
+
+
+def evaluate_batch(codes):
+    """
+    Evaluates many hands at once.
+
+    :param codes: (N, k) integer array of card codes, with 5 <= k <= 7 and no duplicate card in a row
+    :return: (N,) int32 array of strengths (higher is better)
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    if codes.ndim != 2 or not 5 <= codes.shape[1] <= 7:
+        raise ValueError("Expected an (N, k) array of card codes with 5 <= k <= 7.")
+
+    rank_keys = CARD_RANK_KEYS[codes].sum(axis=1)
+    strengths = RANK_STRENGTHS[np.searchsorted(RANK_KEYS, rank_keys)]
+
+    suits = CARD_SUITS[codes]
+    bits = CARD_RANK_BITS[codes]
+    for suit in range(4):
+        in_suit = suits == suit
+        flush = in_suit.sum(axis=1) >= 5
+        if flush.any():
+            masks = np.where(in_suit[flush], bits[flush], 0).sum(axis=1)
+            strengths[flush] = FLUSH_STRENGTHS[masks]
+    return strengths
+
+
+def evaluate_on_board(hole_codes, board_codes):
+    """
+    Evaluates many 2-card holdings on the same board.
+
+    :param hole_codes: (N, 2) integer array of hole card codes
+    :param board_codes: List of 3 to 5 board card codes
+    :return: (N,) int32 array of strengths (higher is better)
+    """
+    hole_codes = np.asarray(hole_codes, dtype=np.intp).reshape(-1, 2)
+    board = np.broadcast_to(np.asarray(board_codes, dtype=np.intp), (len(hole_codes), len(board_codes)))
+    return evaluate_batch(np.concatenate([hole_codes, board], axis=1))
+
+
+def evaluate_combos_on_boards(combo_codes, board_codes):
+    """
+    Evaluates every combo on every board without materializing the (boards x combos, 7) hand array.
+
+    Rank keys, suit counts and suit masks are computed once per board and once
+    per combo, then combined by broadcasting. Pairs where a combo shares a card
+    with a board are not meaningful and should be masked out by the caller.
+
+    :param combo_codes: (C, 2) integer array of hole card codes
+    :param board_codes: (R, 5) integer array of board card codes
+    :return: (R, C) int32 array of strengths (higher is better)
+    """
+    combo_codes = np.asarray(combo_codes, dtype=np.intp).reshape(-1, 2)
+    board_codes = np.asarray(board_codes, dtype=np.intp)
+    if board_codes.ndim != 2 or board_codes.shape[1] != 5:
+        raise ValueError("Expected an (R, 5) array of board card codes.")
+
+    rank_keys = CARD_RANK_KEYS[board_codes].sum(axis=1)[:, None] + CARD_RANK_KEYS[combo_codes].sum(axis=1)[None, :]
+    strengths = RANK_STRENGTHS[np.minimum(np.searchsorted(RANK_KEYS, rank_keys), len(RANK_KEYS) - 1)]
+
+    board_suits = CARD_SUITS[board_codes]
+    combo_suits = CARD_SUITS[combo_codes]
+    board_bits = CARD_RANK_BITS[board_codes]
+    combo_bits = CARD_RANK_BITS[combo_codes]
+    for suit in range(4):
+        board_count = (board_suits == suit).sum(axis=1)
+        boards = np.flatnonzero(board_count >= 3)  # a flush needs at least 3 board cards of the suit
+        if not len(boards):
+            continue
+        combo_count = (combo_suits == suit).sum(axis=1)
+        flush = (board_count[boards][:, None] + combo_count[None, :]) >= 5
+        if not flush.any():
+            continue
+        board_mask = np.where(board_suits[boards] == suit, board_bits[boards], 0).sum(axis=1)
+        combo_mask = np.where(combo_suits == suit, combo_bits, 0).sum(axis=1)
+        masks = board_mask[:, None] | combo_mask[None, :]
+        rows, cols = np.nonzero(flush)
+        strengths[boards[rows], cols] = FLUSH_STRENGTHS[masks[rows, cols]]
+    return strengths
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    hands = np.argsort(rng.random((100000, 52)), axis=1)[:, :7]
+    start = time.perf_counter()
+    strengths = evaluate_batch(hands)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(hands)} 7-card hands in {elapsed * 1000:.1f} ms")
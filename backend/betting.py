@@ -1,4 +1,5 @@
 from player import Player
+from events import ActionTaken, BettingRoundStarted
 
 class BettingRound:
     """
@@ -6,7 +7,8 @@ class BettingRound:
     Ensures correct player turn order and valid actions.
     """
 
-    def __init__(self, players, pot, dealer_position, sb_position, bb_position, small_blind, preflop):
+    def __init__(self, players, pot, dealer_position, sb_position, bb_position, small_blind, preflop,
+                 strategies=None, events=None, street=None, raisers=None):
         """
         Initializes a new betting round.
 
@@ -14,6 +16,10 @@ class BettingRound:
         :param pot: Current pot size.
         :param dealer_position: Position of the dealer button.
         :param preflop: Boolean indicating if this is the preflop round.
+        :param strategies: Optional dictionary of player name to strategy deciding for that player (see strategies.py).
+        :param events: Optional EventBus (see events.py) receiving every action.
+        :param street: Name of the street (Preflop, Flop, Turn, River), for the events.
+        :param raisers: List the names of the raising players are appended to, in order (a new one by default).
         """
         self.players = [p for p in players]# if not p.folded]  # Only active players
         self.pot = pot
@@ -25,13 +31,79 @@ class BettingRound:
         self.bb_position = bb_position
         self.preflop = preflop
         self.small_blind = small_blind
+        self.strategies = strategies or {}
+        self.events = events
+        self.street = street or ("Preflop" if preflop else None)
+        self.raisers = raisers if raisers is not None else []
 
-        self.current_index = 0
+        self.current_index = 0  # Number of actions taken
         self.current_player = None
 
         # Determine correct betting order
         self.betting_order = self.determine_betting_order()
 
+        # Position in the betting order, so the round can also be played one request at a time
+        self.cursor = 0
+        self.last_raiser_index = -1
+        self.action_taken = False  # Whether someone raised during the current pass over the order
+        self.finished = False
+
+    def to_dict(self):
+        """
+        Serializes the round, with players as seat indexes.
+        """
+        return {
+            "pot": self.pot,
+            "current_bet": self.current_bet,
+            "last_raiser": self.last_raiser.position if self.last_raiser else None,
+            "active_bets": [self.active_bets[p] for p in self.players],
+            "dealer_position": self.dealer_position,
+            "sb_position": self.sb_position,
+            "bb_position": self.bb_position,
+            "preflop": self.preflop,
+            "small_blind": self.small_blind,
+            "street": self.street,
+            "current_index": self.current_index,
+            "betting_order": [p.position for p in self.betting_order],
+            "cursor": self.cursor,
+            "last_raiser_index": self.last_raiser_index,
+            "action_taken": self.action_taken,
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data, players, strategies=None, events=None, raisers=None):
+        """
+        Rebuilds a round serialized by to_dict.
+
+        :param data: Dictionary returned by to_dict.
+        :param players: List of Player objects of the game, indexed by seat.
+        :param raisers: List the names of the raising players are appended to (see __init__).
+        """
+        betting_round = cls.__new__(cls)
+        betting_round.players = list(players)
+        betting_round.pot = data["pot"]
+        betting_round.current_bet = data["current_bet"]
+        betting_round.last_raiser = None if data["last_raiser"] is None else players[data["last_raiser"]]
+        betting_round.active_bets = dict(zip(players, data["active_bets"]))
+        betting_round.dealer_position = data["dealer_position"]
+        betting_round.sb_position = data["sb_position"]
+        betting_round.bb_position = data["bb_position"]
+        betting_round.preflop = data["preflop"]
+        betting_round.small_blind = data["small_blind"]
+        betting_round.strategies = strategies or {}
+        betting_round.events = events
+        betting_round.street = data["street"]
+        betting_round.raisers = raisers if raisers is not None else []
+        betting_round.current_index = data["current_index"]
+        betting_round.current_player = None
+        betting_round.betting_order = [players[seat] for seat in data["betting_order"]]
+        betting_round.cursor = data["cursor"]
+        betting_round.last_raiser_index = data["last_raiser_index"]
+        betting_round.action_taken = data["action_taken"]
+        betting_round.finished = data["finished"]
+        return betting_round
+
     def determine_betting_order(self):
         """
         Determines the correct turn order based on the game phase.
@@ -72,15 +144,11 @@ class BettingRound:
 
         # Allow Big Blind to check if no one raised
         if player.position == self.bb_position and amount == 0 and current_bet <= 0:
-            check_checks = "checks" if player.name.lower() != "you" else "check"
-            print(f"{player.name} {check_checks} (Big Blind).")
             return
 
         # Handle all-in situations
         if amount < current_bet - player.current_bet:
             if amount == player.stack:  # Player is going all-in with less than the call amount
-                go_goes = "goes" if player.name.lower() != "you" else "go"
-                print(f"{player.name} {go_goes} all-in with {amount} chips!")
                 player.place_bet(amount)
                 self.active_bets[player] += amount
                 self.pot += amount
@@ -101,48 +169,45 @@ class BettingRound:
             self.last_raiser = player
 
 
+    def announce(self):
+        """
+        Emits the start of the round.
+        """
+        if self.events:
+            self.events.emit(BettingRoundStarted(self.street, tuple(bo.name for bo in self.betting_order if not bo.folded)))
+
     def process_actions(self, game=None):
         """
         Handles a full betting round, ensuring correct betting order.
+        Every player decides in turn (strategies synchronously, the others through the frontend).
+        """
+        while (player := self.next_player()) is not None:
+            valid_actions = self.get_valid_actions(player)
+            action, amount = player.make_decision(valid_actions, ai_model=self.strategies.get(player.name), game=game)
+            self.perform_action(player, action, amount)
+
+    def next_player(self):
         """
-        last_raiser = -1
-        print([bo.name for bo in self.betting_order if not bo.folded])
+        Returns the player whose turn it is, or None once the round is over.
+
+        Players act in betting order; a raise gives everyone else another chance, and the round
+        ends after a full pass without raise.
+        """
+        order = self.betting_order
         while True:
-            action_taken = False  # Track if a raise occurred
-            for i in range(len(self.betting_order)):
-                player = self.betting_order[i]
-                # Skip players who folded, are all-in, have no chips, or have already acted after the last raise
-                if (player.folded or player.all_in or player.stack == 0 or 
-                    (last_raiser > -1 and i >= last_raiser and not action_taken)):
-                    continue
-
-                valid_actions = self.get_valid_actions(player)
-                print("valid_actions: ", valid_actions)
-                if valid_actions is None:  # Player has no chips
-                    continue
-
-                action, amount =  player.make_decision(valid_actions)
-                self.current_index += 1
-                
-                if action == "fold":
-                    player.fold_hand()
-                elif action == "call":
-                    self.place_bet(player, amount)
-                elif action == "raise":
-                    self.place_bet(player, amount)
-                    action_taken = True  # Raise occurred, everyone gets another chance
-                    last_raiser = i
-
-                if self.current_index >= len(self.betting_order) and action_taken:
-                    self.current_index = 0
-
-            # Stop when no raises have occurred
-            if not action_taken:
-                break  # Betting round ends
-        
-        if game and not self.preflop and len(game.community_cards) == 3:
-            if game.hand_continues():
-                game.awaiting_turn_input = True
+            if self.cursor >= len(order):
+                # Stop when no raises have occurred during the pass
+                if not self.action_taken:
+                    return None
+                self.action_taken = False
+                self.cursor = 0
+            player = order[self.cursor]
+            # Skip players who folded, are all-in, have no chips, or have already acted after the last raise
+            if (player.folded or player.all_in or player.stack == 0 or
+                    (self.last_raiser_index > -1 and self.cursor >= self.last_raiser_index and not self.action_taken)):
+                self.cursor += 1
+                continue
+            return player
 
 
     def find_first_active_player_postflop(self):
@@ -217,22 +282,36 @@ class BettingRound:
         """
         Returns the name of the player whose turn it is to act.
         """
-        # print("self.current_index: ", self.current_index)
-        while self.current_index < len(self.betting_order):
-            player = self.betting_order[self.current_index]
-            if not player.folded and not player.all_in and player.stack > 0:
-                return player.name
-            self.current_index += 1  # Skip ineligible players
-
-        return None  # No one left to act
+        player = self.next_player()
+        return player.name if player else None  # No one left to act
     
     def perform_action(self, player, action, amount):
+        """
+        Applies the action of the player whose turn it is and moves to the next player.
+
+        :param player: The Player object acting.
+        :param action: fold, call or raise.
+        :param amount: Amount of chips for call and raise.
+        :raises ValueError: If it is not the player's turn or the bet is not valid.
+        """
+        if player is not self.next_player():
+            raise ValueError(f"It is not {player.name}'s turn")
         if action == "fold":
             player.fold_hand()
-        elif action in ["call", "raise"]:
+        elif action == "call":
             self.place_bet(player, amount)
+        elif action == "raise":
+            self.place_bet(player, amount)
+            self.raisers.append(player.name)
+            self.action_taken = True  # Raise occurred, everyone gets another chance
+            self.last_raiser_index = self.cursor
+        else:
+            raise ValueError(f"Invalid action: {action}")
+        if self.events:
+            self.events.emit(ActionTaken(player.name, player.position, action, amount, player.stack, player.all_in))
 
         # Move to the next player
+        self.cursor += 1
         self.current_index += 1
     
 if __name__ == "__name__":
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with hit/miss/eviction counters.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=4096):
+        """
+        Initializes an empty cache.
+
+        :param maxsize: Maximum number of entries kept before evicting the least recently used one.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for a key and marks it as recently used.
+
+        :param key: Hashable key.
+        :param default: Value returned (and counted as a miss) when the key is absent.
+        :return: Cached value or default.
+        """
+        with self.lock:
+            value = self.entries.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        :param key: Hashable key.
+        :param value: Value to cache.
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Empties the cache and resets its counters.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Returns the cache counters.
+        """
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
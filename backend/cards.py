@@ -0,0 +1,128 @@
+"""
+Interned card type shared by the deck, the game, the evaluators and the API.
+
+A Card is an int whose value is the engine's card code (``rank * 4 + suit``,
+see lookup_evaluator), so it can index lookup tables and NumPy arrays
+directly. Exactly 52 instances exist: parsing a card string is one dict
+lookup that returns the shared instance, and its symbol, letter and treys
+encodings are computed once at import. Strings are only produced at the
+JSON boundary (see app.py).
+"""
+
+RANKS = "23456789TJQKA"
+SUITS = "shdc"
+SUIT_SYMBOLS = "♠♥♦♣"
+
+RANK_INDEX = {r: i for i, r in enumerate(RANKS)}
+RANK_INDEX["10"] = RANK_INDEX["T"]
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+SUIT_INDEX.update({s: i for i, s in enumerate(SUIT_SYMBOLS)})
+
+# Encoding used by the treys library: prime | rank << 8 | suit bit << 12 | rank bit << 16
+TREYS_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+TREYS_SUITS = [1, 2, 4, 8]
+
+
+class Card(int):
+    """
+    Playing card, stored as its integer code.
+
+    Use to_card or the CARDS table to get instances; Card(...) accepts the same
+    inputs and returns the interned instance.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, card):
+        return to_card(card)
+
+    @property
+    def rank(self):
+        """Rank index between 0 ("2") and 12 ("A")."""
+        return self >> 2
+
+    @property
+    def suit(self):
+        """Suit index between 0 and 3 (s, h, d, c)."""
+        return self & 3
+
+    @property
+    def rank_char(self):
+        """Rank character (e.g., "A")."""
+        return RANKS[self >> 2]
+
+    @property
+    def symbol(self):
+        """Card string with a suit symbol (e.g., "A♠"), as used by the frontend."""
+        return _SYMBOLS[self]
+
+    @property
+    def letter(self):
+        """Card string with a suit letter (e.g., "As")."""
+        return _LETTERS[self]
+
+    @property
+    def treys(self):
+        """Integer encoding used by the treys library."""
+        return _TREYS[self]
+
+    def __str__(self):
+        return _SYMBOLS[self]
+
+    def __repr__(self):
+        return _SYMBOLS[self]
+
+
+_SYMBOLS = [RANKS[code >> 2] + SUIT_SYMBOLS[code & 3] for code in range(52)]
+_LETTERS = [RANKS[code >> 2] + SUITS[code & 3] for code in range(52)]
+_TREYS = [
+    TREYS_PRIMES[code >> 2] | (code >> 2) << 8 | TREYS_SUITS[code & 3] << 12 | 1 << (16 + (code >> 2))
+    for code in range(52)
+]
+
+CARDS = tuple(int.__new__(Card, code) for code in range(52))
+
+# Every accepted spelling of a card (codes, "A♠", "As", "10♠", ...) mapped to its instance
+CARD_LOOKUP = {}
+for _card in CARDS:
+    CARD_LOOKUP[int(_card)] = _card
+    for _rank, _rank_index in RANK_INDEX.items():
+        if _rank_index == _card.rank:
+            for _suit, _suit_index in SUIT_INDEX.items():
+                if _suit_index == _card.suit:
+                    CARD_LOOKUP[_rank + _suit] = _card
+
+
+def to_card(card):
+    """
+    Returns the interned Card of a card string or code.
+
+    :param card: Card, integer code or string with a suit symbol or letter (e.g., "A♠", "Td", "10♣")
+    :return: Card
+    :raises ValueError: If the card is not recognized
+    """
+    try:
+        return CARD_LOOKUP[card]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid card: {card!r}") from None
+
+
+def to_cards(cards):
+    """
+    Converts a list of card strings or codes into Cards.
+    """
+    return [to_card(card) for card in cards]
+
+
+def card_strings(cards):
+    """
+    Converts a list of Cards into their symbol strings (e.g., ["A♠", "K♦"]), for JSON responses.
+    """
+    return [_SYMBOLS[card] for card in cards]
+
+
+if __name__ == "__main__":
+    hand = to_cards(["A♠", "Kd"])
+    print(f"{hand}: codes {[int(card) for card in hand]}, letters {[card.letter for card in hand]}, "
+          f"treys {[card.treys for card in hand]}")
+    print(f"Interned: {to_card('A♠') is to_card('As') is to_card(48) is Card('A♠')}")
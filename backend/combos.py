@@ -0,0 +1,60 @@
+"""
+Fixed indexing of the 1,326 two-card combos.
+
+Combo i is COMBOS[i] = (low code, high code), using lookup_evaluator card codes.
+COMBO_INDEX[a][b] gives the index of the combo made of codes a and b in either
+order, and COMBO_CARD_MASKS[i] is the 52-bit mask of its two cards.
+"""
+from itertools import combinations
+
+import numpy as np
+
+from lookup_evaluator import card_to_code
+
+COMBOS = list(combinations(range(52), 2))
+NUM_COMBOS = len(COMBOS)
+
+COMBO_INDEX = [[-1] * 52 for _ in range(52)]
+for _index, (_low, _high) in enumerate(COMBOS):
+    COMBO_INDEX[_low][_high] = _index
+    COMBO_INDEX[_high][_low] = _index
+
+COMBO_CARD_MASKS = [(1 << low) | (1 << high) for low, high in COMBOS]
+COMBO_ARRAY = np.array(COMBOS, dtype=np.intp)
+
+
+def combo_index(cards):
+    """
+    Returns the index of a 2-card combo.
+
+    :param cards: 2 cards (strings or integer codes)
+    :return: Index between 0 and 1325
+    """
+    first, second = cards
+    return COMBO_INDEX[card_to_code(first)][card_to_code(second)]
+
+
+def cards_mask(cards):
+    """
+    Returns the 52-bit mask of a list of cards.
+
+    :param cards: Cards (strings or integer codes)
+    :return: Integer bitmask with one bit per card code
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_to_code(card)
+    return mask
+
+
+def blocked_combos(cards):
+    """
+    Returns a boolean array flagging the combos that use any of the given cards.
+
+    :param cards: Dead cards (strings or integer codes)
+    :return: (1326,) bool array
+    """
+    dead = np.zeros(52, dtype=bool)
+    for card in cards:
+        dead[card_to_code(card)] = True
+    return dead[COMBO_ARRAY].any(axis=1)
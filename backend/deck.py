@@ -1,67 +1,181 @@
-import random
+import numpy as np
+
+from cards import CARDS
+from rng import deal_boards, make_rng
+
+FULL_MASK = (1 << 52) - 1
+
 
 class Deck:
-    def __init__(self):
+    """
+    Standard 52-card deck stored as a fixed array with a deal pointer.
+
+    Cards before the pointer are gone (dealt or removed), cards from the pointer
+    on are live, and live_mask has bit c set for every live card code c. Dealing
+    advances the pointer, removing a known card swaps it just before the
+    pointer, and shuffling permutes the live part in place, so nothing is
+    reallocated between hands.
+    """
+
+    def __init__(self, rng=None):
         """
         Initializes a standard 52-card deck.
+
+        :param rng: Seed or numpy Generator driving the shuffles (see rng.make_rng); give each table
+                    or worker its own stream to make runs reproducible.
         """
-        self.cards = self._generate_deck()  # Create a full deck
+        self.rng = make_rng(rng)
+        self._order = self._generate_deck()  # Fixed array of the 52 cards
+        self._position = list(range(52))  # Index of each card code in _order
+        self._top = 0  # Index of the next card to deal
+        self.live_mask = FULL_MASK
         self.shuffle()  # Shuffle the deck when initialized
 
     def _generate_deck(self):
         """
         Generates a standard 52-card deck.
-        
-        :return: List of cards in the format "RankSuit" (e.g., "As", "Td").
+
+        :return: List of the 52 interned Cards (str() gives e.g. "A♠", "T♦").
+        """
+        return list(CARDS)
+
+    @property
+    def cards(self):
+        """
+        Returns the live cards, in dealing order.
         """
-        # suits = ['s', 'h', 'd', 'c']  # Spades, Hearts, Diamonds, Clubs
-        suits = ['♠', '♥', '♦', '♣']  # Spades, Hearts, Diamonds, Clubs
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        return [rank + suit for suit in suits for rank in ranks]
+        return self._order[self._top:]
 
-    def shuffle(self):
+    def _swap(self, i, j):
+        order, position = self._order, self._position
+        order[i], order[j] = order[j], order[i]
+        position[order[i]] = i
+        position[order[j]] = j
+
+    def shuffle(self, num_cards=None):
         """
-        Shuffles the deck.
+        Shuffles the live cards in place (Fisher-Yates).
+
+        :param num_cards: Only randomize the next num_cards cards to be dealt (partial shuffle).
+                          The dealt cards are uniformly random either way, and the rest is left as is.
         """
-        random.shuffle(self.cards)
+        top = self._top
+        end = 52 if num_cards is None else min(52, top + num_cards)
+        if end <= top:
+            return
+        # Offset of the card swapped into each position, drawn in one call
+        offsets = (self.rng.random(end - top) * np.arange(52 - top, 52 - end, -1)).astype(np.intp).tolist()
+        for i, offset in zip(range(top, end), offsets):
+            self._swap(i, i + offset)
 
     def deal(self, num_cards: int):
         """
         Deals a specified number of cards from the deck.
-        
+
         :param num_cards: Number of cards to deal.
         :return: List of dealt cards.
         """
-        if num_cards > len(self.cards):
+        if num_cards > 52 - self._top:
             raise ValueError("Not enough cards left in the deck to deal.")
-        
-        dealt_cards = self.cards[:num_cards]  # Take the top cards
-        self.cards = self.cards[num_cards:]   # Remove them from the deck
+
+        start = self._top
+        self._top += num_cards
+        dealt_cards = self._order[start:self._top]
+        for card in dealt_cards:
+            self.live_mask &= ~(1 << card)
         return dealt_cards
 
+    def remove(self, cards):
+        """
+        Removes known cards from the deck (e.g., manually selected hole cards or board cards).
+        Cards that are already gone are ignored.
+
+        :param cards: List of Cards or card codes.
+        """
+        for card in cards:
+            if self.live_mask >> card & 1:
+                self._swap(self._position[card], self._top)
+                self._top += 1
+                self.live_mask &= ~(1 << card)
+
+    def deal_boards(self, num_boards, num_cards):
+        """
+        Deals many independent boards from the live cards at once, without changing the deck.
+
+        :param num_boards: Number of boards (K)
+        :param num_cards: Cards per board
+        :return: (K, num_cards) array of card codes
+        """
+        return deal_boards(self.rng, np.array(self.cards, dtype=np.intp), num_boards, num_cards)
+
+    def checkpoint(self):
+        """
+        Returns the current deal position, to rewind to it later.
+        """
+        return self._top, self.live_mask
+
+    def rewind(self, checkpoint):
+        """
+        Puts back every card dealt or removed since a checkpoint, without reordering the deck.
+
+        :param checkpoint: Value returned by checkpoint.
+        """
+        self._top, self.live_mask = checkpoint
+
+    def to_dict(self):
+        """
+        Serializes the deck: card order, deal position and the state of its RNG.
+        """
+        return {"order": [int(card) for card in self._order], "top": self._top, "rng": self.rng.bit_generator.state}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds a deck serialized by to_dict; it deals and shuffles exactly as the original would have.
+        """
+        deck = cls.__new__(cls)
+        bit_generator = getattr(np.random, data["rng"]["bit_generator"])()
+        bit_generator.state = data["rng"]
+        deck.rng = np.random.Generator(bit_generator)
+        deck._order = [CARDS[code] for code in data["order"]]
+        deck._position = [0] * 52
+        for index, card in enumerate(deck._order):
+            deck._position[card] = index
+        deck._top = data["top"]
+        deck.live_mask = 0
+        for card in deck._order[deck._top:]:
+            deck.live_mask |= 1 << card
+        return deck
+
     def reset_deck(self):
         """
         Resets the deck back to a full 52 cards and shuffles it.
         """
-        self.cards = self._generate_deck()
+        self._top = 0
+        self.live_mask = FULL_MASK
         self.shuffle()
 
     def remaining_cards(self):
         """
         Returns the number of remaining cards in the deck.
         """
-        return len(self.cards)
+        return 52 - self._top
+
+    def __contains__(self, card):
+        return bool(self.live_mask >> card & 1)
 
     def __str__(self):
         """
         Returns a string representation of the deck.
         """
-        return f"Deck ({len(self.cards)} cards remaining): " + ", ".join(self.cards)
+        return f"Deck ({self.remaining_cards()} cards remaining): " + ", ".join(map(str, self.cards))
 
 
 if __name__ == "__main__":
+    import time
+
     # Initialize the deck
-    deck = Deck()
+    deck = Deck(rng=42)
     print(deck)  # Show shuffled deck
 
     # Deal two hole cards to a player
@@ -86,3 +200,14 @@ if __name__ == "__main__":
     # Reset the deck
     deck.reset_deck()
     print("Deck reset:", deck)
+
+    # Simulation pattern: remove known cards once, then rewind and partially shuffle for each runout
+    deck.reset_deck()
+    deck.remove(hole_cards + flop)
+    known = deck.checkpoint()
+    start = time.perf_counter()
+    for _ in range(100000):
+        deck.rewind(known)
+        deck.shuffle(2)
+        deck.deal(2)
+    print(f"100000 turn+river runouts in {time.perf_counter() - start:.2f} s")
@@ -1,6 +1,13 @@
-from treys import Evaluator, Card, Deck
-from collections import Counter
-from itertools import combinations, product
+import heapq
+from cards import to_card
+from lookup_evaluator import CARD_KEYS, card_to_code, code_to_card, evaluate_codes, evaluate_key, hand_key, best_five_codes, strength_name
+from isomorphism import canonicalize, invert_suit_map, remap_codes
+from cache import LRUCache
+from combos import combo_index
+from hand_range import Range
+from batch_evaluator import evaluate_on_board
+from flop_index import get_index as get_flop_index
+import numpy as np
 
 class HandEvaluator:
     """
@@ -28,6 +35,15 @@ class HandEvaluator:
         "♣": "c",
     }
     SUIT_LETTERS_TO_SYMBOLS = {v: k for k, v in SUIT_SYMBOMS_TO_LETTERS.items()}
+    RANK_VALUES = {"2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "T": 10, "10": 10,
+                   "J": 11, "Q": 12, "K": 13, "A": 14}
+
+    # Results are cached by suit-isomorphic key, so equivalent spots share one entry
+    CACHES = {
+        "evaluate_hand": LRUCache(maxsize=16384),
+        "get_best_opponent_hand": LRUCache(maxsize=2048),
+        "compute_outs": LRUCache(maxsize=4096),
+    }
 
     @staticmethod
     def evaluate_hand(hole_cards, community_cards):
@@ -39,127 +55,50 @@ class HandEvaluator:
         :return: Tuple (hand rank name, sorted 5-card best hand)
         """
         all_cards = hole_cards + community_cards
-        all_combinations = list(combinations(all_cards, 5))  # Get all possible 5-card hands
-        best_hand = max(all_combinations, key=HandEvaluator.rank_hand)
-        hand_rank = HandEvaluator.classify_hand(best_hand)
+        (key,), suit_map = canonicalize(all_cards)
+        cache = HandEvaluator.CACHES["evaluate_hand"]
+        cached = cache.get(key)
+        if cached is None:
+            strength = evaluate_codes(key)
+            cached = (strength_name(strength), best_five_codes(key, strength))
+            cache.put(key, cached)
+
+        hand_rank, canonical_best = cached
+        codes = [card_to_code(card) for card in all_cards]
+        best_codes = remap_codes(canonical_best, invert_suit_map(suit_map))
+        best_hand = [all_cards[codes.index(code)] for code in best_codes]
 
         return hand_rank, sorted(best_hand, key=HandEvaluator.card_value, reverse=True)
 
     @staticmethod
-    def classify_hand(hand):
-        """
-        Classifies a 5-card hand into its poker hand ranking.
-
-        :param hand: A list of 5 card strings (e.g., ["10♠", "J♠", "Q♠", "K♠", "9♠"])
-        :return: The name of the hand rank (e.g., "Straight Flush")
-        """
-        values = sorted([HandEvaluator.card_value(card) for card in hand], reverse=True)
-        suits = [card[-1] for card in hand]  # Extract suit symbols
-        value_counts = Counter(values)
-        unique_values = list(value_counts.keys())
-
-        # Royal Flush
-        if HandEvaluator.is_straight(values) and HandEvaluator.is_flush(hand) and max(values) == 14:
-            return "Royal Flush"
-        
-        # Straight Flush
-        if HandEvaluator.is_straight(values) and HandEvaluator.is_flush(hand):
-            return "Straight Flush"
-        
-        # Four of a Kind
-        if 4 in value_counts.values():
-            return "Four of a Kind"
-        
-        # Full House
-        if sorted(value_counts.values()) == [2, 3]:
-            return "Full House"
-        
-        # Flush
-        if HandEvaluator.is_flush(hand):
-            return "Flush"
-        
-        # Straight
-        if HandEvaluator.is_straight(values):
-            return "Straight"
-        
-        # Three of a Kind
-        if 3 in value_counts.values():
-            return "Three of a Kind"
-        
-        # Two Pair
-        if list(value_counts.values()).count(2) == 2:
-            return "Two Pair"
-        
-        # One Pair
-        if 2 in value_counts.values():
-            return "One Pair"
-        
-        # High Card
-        return "High Card"
-
-    @staticmethod
-    def is_flush(hand):
+    def cache_stats():
         """
-        Checks if all 5 cards have the same suit.
+        Returns the hit/miss/eviction counters of the evaluator caches.
 
-        :param hand: A list of 5 card strings (e.g., ["10♠", "J♠", "Q♠", "K♠", "9♠"])
-        :return: True if the hand is a flush, False otherwise.
+        :return: Dictionary of cache name to counters
         """
-        suits = [card[-1] for card in hand]
-        return len(set(suits)) == 1
+        return {name: cache.stats() for name, cache in HandEvaluator.CACHES.items()}
 
     @staticmethod
-    def is_straight(values):
+    def hand_strength(hole_cards, community_cards):
         """
-        Checks if a list of values represents a straight.
+        Computes the strength of the best 5-card hand using the lookup-table evaluator.
 
-        :param values: A sorted list of numeric card values.
-        :return: True if the hand is a straight, False otherwise.
+        :param hole_cards: List of 2 hole cards (e.g., ["A♠", "K♦"])
+        :param community_cards: List of 3 to 5 community cards
+        :return: Integer strength (higher is better)
         """
-        if values == [14, 5, 4, 3, 2]:  # A-5 straight (Ace-low)
-            return True
-        return sorted(values) == list(range(min(values), max(values) + 1))
+        return evaluate_codes([card_to_code(card) for card in hole_cards + community_cards])
 
     @staticmethod
     def card_value(card):
         """
         Converts a card into its numeric value.
 
-        :param card: A string representing a card (e.g., "A♠", "10♦", "K♣")
+        :param card: A Card or card string (e.g., "A♠", "10♦", "K♣")
         :return: Numeric value (2-14)
         """
-        rank = card[0]  # Extract the rank part (e.g., "A" from "A♠")
-        rank_values = {"2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "T": 10, 
-                       "J": 11, "Q": 12, "K": 13, "A": 14}
-        return rank_values[rank]
-
-    @staticmethod
-    def rank_hand(hand):
-        """
-        Returns a numerical ranking of a hand.
-
-        :param hand: A list of 5 card strings.
-        :return: Tuple (hand rank index, sorted values for tiebreaking)
-        """
-        values = [HandEvaluator.card_value(card) for card in hand]
-        value_counts = Counter(values)
-        hand_rank = HandEvaluator.classify_hand(hand)
-        
-        # Sort values first by frequency (descending), then by card value (descending)
-        values_by_freq = []
-        # First add pairs/trips/quads (frequency > 1)
-        for val, count in sorted(value_counts.items(), key=lambda x: (-x[1], -x[0])):
-            if count > 1:
-                values_by_freq.extend([val] * count)
-        # Then add kickers (frequency = 1)
-        for val, count in sorted(value_counts.items(), key=lambda x: (-x[0])):
-            if count == 1:
-                values_by_freq.append(val)
-        
-        return (
-            HandEvaluator.HAND_RANKINGS[hand_rank],  # Primary rank
-            tuple(values_by_freq)  # Secondary rank as immutable tuple
-        )
+        return to_card(card).rank + 2
 
     @staticmethod
     def compare_hands(players, community_cards):
@@ -170,12 +109,11 @@ class HandEvaluator:
         :param community_cards: List of 5 community cards.
         :return: List of winners.
         """
-        best_rank = (0, tuple())  # Default best rank
+        best_rank = -1  # Default best rank
         winners = []
 
         for player_name, hole_cards in players:
-            hand_rank, best_hand = HandEvaluator.evaluate_hand(hole_cards, community_cards)
-            hand_score = HandEvaluator.rank_hand(best_hand)
+            hand_score = HandEvaluator.hand_strength(hole_cards, community_cards)
 
             if hand_score > best_rank:
                 best_rank = hand_score
@@ -185,133 +123,177 @@ class HandEvaluator:
 
         return winners
     
-    def expand_notation(self, notation):
-        """
-        Expands shorthand notation for hands into full card representations.
-        
-        :param notation: A string representing a hand (e.g., "AKs", "77", "AJo").
-        :return: List of full card representations.
+    @staticmethod
+    def score_combos(combos, board):
+        """Scores card combinations on a board, reading the isomorphic flop index when it is available
+
+        :param combos: List of card combinations (2 cards), none of them sharing a card with the board
+        :param board: List of community cards (3 to 5 cards)
+        :return: Array of strengths (higher is better)
         """
-        rank1, rank2 = notation[0], notation[1]
-        suited = "s" if notation[-1] == "s" else "o" if notation[-1] == "o" else None
+        if not combos:
+            return np.zeros(0, dtype=np.int64)
+        index = get_flop_index() if len(board) == 3 else None
+        if index is not None:
+            return index.combo_strengths(board, [combo_index(combo) for combo in combos]).astype(np.int64)
+        combo_codes = [[card_to_code(card) for card in combo] for combo in combos]
+        return evaluate_on_board(combo_codes, [card_to_code(card) for card in board]).astype(np.int64)
+
+    def get_best_combos(self, combos, board, k=1):
+        """Selects the k strongest combos on a board
         
-        combos = []
-
-        if rank1 == rank2:
-            # Pair
-            for s1, s2 in product(HandEvaluator.SUIT_LETTERS, HandEvaluator.SUIT_LETTERS):
-                if s1 < s2:
-                    combos.append([rank1 + s1, rank2 + s2])
-        elif suited == "s":
-            for s in HandEvaluator.SUIT_LETTERS:
-                combos.append([rank1 + s, rank2 + s])
-        elif suited == "o":
-            for s1 in HandEvaluator.SUIT_LETTERS:
-                for s2 in HandEvaluator.SUIT_LETTERS:
-                    if s1 != s2:
-                        combos.append([rank1 + s1, rank2 + s2])
-        else:
-            combos += self.expand_notation(rank1 + rank2 + "s")
-            combos += self.expand_notation(rank1 + rank2 + "o")
-        return combos
-    
-    def filter_dead_cards(self, combos, dead_cards):
+        Combos are scored in one call, then selected with a bounded heap (O(n log k)).
+
+        :param combos: List of card combinations (2 cards)
+        :param board: List of community cards (3 to 5 cards)
+        :param k: Number of combos to return
+        :return: List of up to k (combo, strength) tuples, strongest first
         """
-        Filters out elements that are contained in the hole cards and community cards
+        scores = self.score_combos(combos, board).tolist()
+        best = heapq.nlargest(k, range(len(combos)), key=scores.__getitem__)
+        return [(combos[i], scores[i]) for i in best]
+
+    def rank_combos(self, combos, board):
+        """Ranks every combo of a range on a board in a single pass
         
-        :param combos: List of expanded card combinations
-        :param dead_cards: List of cards from hole and community cards
-        :return: Filtered list of combos
+        :param combos: List of card combinations (2 cards)
+        :param board: List of community cards (3 to 5 cards)
+        :return: List of (combo, strength) tuples, strongest first (ties keep the input order)
         """
-        return [combo for combo in combos if combo[0] not in dead_cards and combo[1] not in dead_cards]
-    
+        scores = self.score_combos(combos, board)
+        order = np.argsort(-scores, kind="stable")
+        return [(combos[i], int(scores[i])) for i in order]
+
     def get_best_combo(self, combos, flop):
-        """Evaluates the best hand from a list of card combinations and a flop using library treys
+        """Evaluates the best hand from a list of card combinations and a flop
         
         :param combos: List of card combinations (2 cards)
         :param flop: List of community cards (3 cards)
-        :return: Best hand from combination and associated rank
+        :return: Best hand from combination and associated strength (higher is better), or (None, None)
         """
-        
-        evaluator = Evaluator()
-        nb_considered = 2
-        best_combo = []
-        best_score = [9999 for _ in range(nb_considered)]
-        flop_cards = [Card.new(card[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[card[1]]) for card in flop]
-
-        for combo in combos:
-            if len(best_combo) < nb_considered:
-                best_combo.append(combo)
-            else:
-                hand_cards = [
-                    Card.new(combo[0]),
-                    Card.new(combo[1]),
-                ]
-                if len(set(hand_cards).intersection(set(flop_cards))):
-                    score = 9999
-                else:
-                    score = evaluator.evaluate(hand_cards, flop_cards)
-                    best_score.append(score)
-                    best_score.sort()
-                    score_index = best_score.index(score)
-                    best_combo = best_combo[:score_index] + [combo] + best_combo[score_index + 1:]
-                    best_combo = best_combo[:nb_considered]
-                    best_score = best_score[:nb_considered]
-        
-        return best_combo[-1], best_score[-1]
+        best = self.get_best_combos(combos, flop, k=1)
+        if not best:
+            return None, None
+        return best[0]
 
-    def get_best_opponent_hand(self, opponent_range, flop, hole_cards):
-        
-        dead_cards = flop + hole_cards
-        dead_cards = [card[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[card[1]] for card in dead_cards]
-
-        all_combos = []
-        for notation in opponent_range:
-            expanded = self.expand_notation(notation)
-            valid = self.filter_dead_cards(expanded, dead_cards)
-            all_combos += valid
-        best_combo, best_score = self.get_best_combo(all_combos, flop)
+    def get_best_opponent_hand(self, opponent_range, flop, hole_cards, k=1):
+        """Finds the best combos of an opponent range on a flop, given the hero's hole cards
+
+        :param opponent_range: List of hand notations (e.g., ["AKs", "77"])
+        :param flop: List of community cards (3 cards)
+        :param hole_cards: Hero's hole cards (2 cards)
+        :param k: Number of combos to keep in "top_combos"
+        :return: Dictionary with the best combo (Cards), its score and the k strongest combos with their scores
+        """
+        (canonical_flop, canonical_hole), suit_map = canonicalize(flop, hole_cards)
+        key = (tuple(opponent_range), canonical_flop, canonical_hole, k)
+        cache = HandEvaluator.CACHES["get_best_opponent_hand"]
+        cached = cache.get(key)
+        if cached is None:
+            cached = self._get_best_opponent_hand(opponent_range, list(canonical_flop), list(canonical_hole), k)
+            cache.put(key, cached)
+
+        inverse = invert_suit_map(suit_map)
+
+        def restore(combo):
+            return [code_to_card(code) for code in remap_codes(combo, inverse)]
+
+        return {
+            "combo": restore(cached["combo"]) if cached["combo"] else None,
+            "score": cached["score"],
+            "top_combos": [{"combo": restore(top["combo"]), "score": top["score"]} for top in cached["top_combos"]],
+        }
+
+    def _get_best_opponent_hand(self, opponent_range, flop, hole_cards, k):
         
+        # Compiled once per notation list, dead cards removed with a single mask
+        all_combos = Range.from_notations(opponent_range).remove_dead(flop + hole_cards).combos()
+        top_combos = self.get_best_combos(all_combos, flop, k=k)
+
+        def to_cards(combo):
+            return [code_to_card(code) for code in reversed(combo)]
+
         best_hand = {
-            "combo": [combo[0] + HandEvaluator.SUIT_LETTERS_TO_SYMBOLS[combo[1]] for combo in best_combo],
-            "score": best_score,
+            "combo": to_cards(top_combos[0][0]) if top_combos else None,
+            "score": top_combos[0][1] if top_combos else None,
+            "top_combos": [{"combo": to_cards(combo), "score": score} for combo, score in top_combos],
         }
         
         return best_hand
     
     def compute_outs(self, hole_cards, flop, opponent_combo):
-        """Computes the number of outs for a given hand against an opponent's combo
+        """Computes the outs of a given hand against an opponent's combo, one and two cards ahead
         
         :param hole_cards: List of hole cards (2 cards)
-        :param flop: List of community cards (3 cards)
+        :param flop: List of community cards (3 or 4 cards)
         :param opponent_combo: Opponent's best hand in his range (2 cards)
-        :return: Number of outs
+        :return: Dictionary with:
+            - outs_on_turn: next cards that put the hand ahead
+            - clean_outs: next cards that put the hand ahead and keep it ahead on every river (flop only)
+            - runner_runner_outs: turn+river pairs that win although neither card puts the hand ahead alone (flop only)
+            - redraw_risk: share of rivers on which the opponent takes the lead back after one of the outs (flop only)
         """
-        evaluator = Evaluator()
-        deck = Deck()
-        known_cards = flop + hole_cards + opponent_combo
-        known_card_objs = [Card.new(c[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[c[1]]) for c in known_cards]
-
-
-        remaining_deck = [c for c in deck.cards if c not in known_card_objs]
-
-        hole_cards = [Card.new(c[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[c[1]]) for c in hole_cards]
-        opponent_cards = [Card.new(c[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[c[1]]) for c in opponent_combo]
-        flop_cards = [Card.new(c[0] + HandEvaluator.SUIT_SYMBOMS_TO_LETTERS[c[1]]) for c in flop]
-
-        # we could also expand this to two hands (turn, river)
-        outs_one_hand = set()
-
-        for turn in remaining_deck:
-            community = flop_cards + [turn]
-            player_score = evaluator.evaluate(hole_cards, community)
-            opp_score = evaluator.evaluate(opponent_cards, community)
-
-            if player_score < opp_score:
-                outs_one_hand.add(turn)
+        key, _ = canonicalize(hole_cards, flop, opponent_combo)
+        cache = HandEvaluator.CACHES["compute_outs"]
+        cached = cache.get(key)
+        if cached is None:
+            cached = self._compute_outs(*key)
+            cache.put(key, cached)
+        return dict(cached)
+
+    def _compute_outs(self, hole_codes, board_codes, opponent_codes):
+        known = set(hole_codes) | set(board_codes) | set(opponent_codes)
+        remaining_deck = [code for code in range(52) if code not in known]
+
+        board_key = hand_key(board_codes)
+        hero_key = board_key + hand_key(hole_codes)
+        opponent_key = board_key + hand_key(opponent_codes)
+
+        # Lead after the next card alone, with the board+card keys kept for the river loop
+        ahead = {}
+        next_keys = {}
+        for card in remaining_deck:
+            hero_next = hero_key + CARD_KEYS[card]
+            opponent_next = opponent_key + CARD_KEYS[card]
+            ahead[card] = evaluate_key(hero_next) > evaluate_key(opponent_next)
+            next_keys[card] = (hero_next, opponent_next)
+        outs = [card for card in remaining_deck if ahead[card]]
+
+        if len(board_codes) != 3:
+            return {
+                "outs_on_turn": len(outs),
+                "clean_outs": len(outs),
+                "runner_runner_outs": 0,
+                "redraw_risk": 0.0,
+            }
+
+        # Turn+river runouts, each unordered pair evaluated once from the turn keys
+        river_losses = {card: 0 for card in remaining_deck}
+        runner_runner = 0
+        for index, turn in enumerate(remaining_deck):
+            hero_turn, opponent_turn = next_keys[turn]
+            for river in remaining_deck[index + 1:]:
+                river_key = CARD_KEYS[river]
+                hero_score = evaluate_key(hero_turn + river_key)
+                opponent_score = evaluate_key(opponent_turn + river_key)
+                if hero_score < opponent_score:
+                    river_losses[turn] += 1
+                    river_losses[river] += 1
+                elif hero_score > opponent_score and not ahead[turn] and not ahead[river]:
+                    runner_runner += 1
+
+        rivers_per_turn = len(remaining_deck) - 1
+        clean_outs = sum(1 for card in outs if river_losses[card] == 0)
+        redraw_risk = (
+            sum(river_losses[card] for card in outs) / (len(outs) * rivers_per_turn)
+            if outs else 0.0
+        )
 
         return {
-            "outs_on_turn": len(outs_one_hand),
+            "outs_on_turn": len(outs),
+            "clean_outs": clean_outs,
+            "runner_runner_outs": runner_runner,
+            "redraw_risk": redraw_risk,
         }
 
 if __name__ == "__main__":
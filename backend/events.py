@@ -0,0 +1,197 @@
+"""
+Typed event stream of the engine.
+
+Game, BettingRound and Player emit events (a hand starting, an action, cards
+being dealt, a pot being awarded, ...) on an EventBus instead of printing.
+Consumers subscribe to the types they care about: ConsoleLogger prints the
+course of the game, history.HandRecorder writes hand histories, and the API
+can push updates to the UI.
+
+Emitting costs nothing when nobody listens: an EventBus without subscribers
+is falsy, and call sites build events behind ``if self.events:``, so bulk
+simulations run silent without formatting a single message.
+"""
+from typing import NamedTuple, Optional
+
+
+class HandStarted(NamedTuple):
+    """Blinds posted and hole cards dealt (cards are empty when unknown)."""
+    hand_number: int
+    dealer: int
+    players: tuple
+    stacks: tuple  # Stacks before the blinds
+    small_blind: int
+    big_blind: int
+    hole_cards: tuple
+
+
+class BettingRoundStarted(NamedTuple):
+    street: str
+    players: tuple  # Names of the players still in, in betting order
+
+
+class WaitingForAction(NamedTuple):
+    """A player without strategy waits for the frontend to submit an action."""
+    player: str
+
+
+class ActionTaken(NamedTuple):
+    player: str
+    seat: int
+    action: str  # fold, call or raise (a call of 0 is a check)
+    amount: Optional[int]  # Amount decided, as given to BettingRound
+    stack: int  # Stack after the action
+    all_in: bool
+
+
+class CommunityCardsDealt(NamedTuple):
+    street: str
+    cards: tuple  # New cards
+    board: tuple  # Whole board
+
+
+class ShowdownStarted(NamedTuple):
+    hands: tuple  # (name, hole cards) of the players still in
+
+
+class PotAwarded(NamedTuple):
+    player: str
+    amount: int
+    pot: int  # Size of the pot (or side pot) being split
+
+
+class HandEnded(NamedTuple):
+    hand_number: int
+    stacks: tuple
+
+
+class GameOver(NamedTuple):
+    winner: Optional[str]  # None when the hand limit was reached first
+    stack: int
+
+
+class EventBus:
+    """
+    Dispatches events to the handlers subscribed to their type.
+    """
+
+    def __init__(self):
+        self._handlers = {}  # Event type (None for every type) to list of handlers
+
+    def subscribe(self, handler, *event_types):
+        """
+        Calls handler(event) for every event of the given types (of every type when none is given).
+
+        :return: The handler, to unsubscribe it later
+        """
+        for event_type in event_types or (None,):
+            self._handlers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def unsubscribe(self, handler):
+        for event_type in list(self._handlers):
+            handlers = [h for h in self._handlers[event_type] if h != handler]
+            if handlers:
+                self._handlers[event_type] = handlers
+            else:
+                del self._handlers[event_type]
+
+    def emit(self, event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+        for handler in self._handlers.get(None, ()):
+            handler(event)
+
+    def __bool__(self):
+        return bool(self._handlers)
+
+
+def _verb(name, verb):
+    """
+    Conjugates a verb for a player ("Anne folds", "You fold").
+    """
+    return verb if name.lower() == "you" else verb + ("es" if verb.endswith("s") else "s")
+
+
+class ConsoleLogger:
+    """
+    Prints the course of the game, as the engine used to.
+    """
+
+    def __init__(self, events=None):
+        """
+        :param events: Optional EventBus to subscribe to
+        """
+        if events is not None:
+            events.subscribe(self)
+
+    def __call__(self, event):
+        line = self.format(event)
+        if line is not None:
+            print(line)
+
+    @staticmethod
+    def format(event):
+        """
+        Returns the console line(s) of an event, or None for events that are not printed.
+        """
+        if isinstance(event, ActionTaken):
+            if event.action == "fold":
+                return f"{event.player} {_verb(event.player, 'fold')}."
+            if event.all_in:
+                return f"{event.player} {_verb(event.player, 'go')} all-in!"
+            if event.action == "call" and not event.amount:
+                return f"{event.player} {_verb(event.player, 'check')}."
+            return f"{event.player} {_verb(event.player, 'bet')} {event.amount} chips. Remaining stack: {event.stack}"
+        if isinstance(event, HandStarted):
+            n = len(event.players)
+            small_blind, big_blind = event.players[(event.dealer + 1) % n], event.players[(event.dealer + 2) % n]
+            return (f"\n=== Hand {event.hand_number} ===\n"
+                    f"\nBlinds: {small_blind} posts {event.small_blind}, {big_blind} posts {event.big_blind}")
+        if isinstance(event, BettingRoundStarted):
+            return f"\n--- {event.street} Betting Round ---\n{list(event.players)}"
+        if isinstance(event, CommunityCardsDealt):
+            return f"\n{event.street} dealt: {', '.join(map(str, event.board))}"
+        if isinstance(event, WaitingForAction):
+            return f"⏳ Waiting for frontend to provide action for {event.player}"
+        if isinstance(event, ShowdownStarted):
+            return "\n--- Showdown ---\n" + "\n".join(f"{name}: {cards}" for name, cards in event.hands)
+        if isinstance(event, PotAwarded):
+            return f"{event.player} {_verb(event.player, 'win')} {event.amount} chips!"
+        if isinstance(event, GameOver):
+            if event.winner is None:
+                return "\nGame Over!"
+            return f"\nGame Over!\n🏆 {event.winner} is the winner with {event.stack} chips!"
+        return None
+
+
+if __name__ == "__main__":
+    import time
+
+    from game import Game
+    from strategies import RangeStrategy
+
+    names = ["Anne", "Benoît", "Claire", "Denis", "Elodie", "François"]
+
+    # One hand on the console
+    game = Game(names, [20000] * len(names), rng=42, strategies=RangeStrategy(), verbose=True)
+    game.play_hand()
+
+    # Count the events of many hands with a single subscriber
+    counts = {}
+    game = Game(names, [20000] * len(names), rng=42, strategies=RangeStrategy())
+    game.events.subscribe(lambda event: counts.__setitem__(type(event).__name__, counts.get(type(event).__name__, 0) + 1))
+    for _ in range(1000):
+        for player in game.players:
+            player.stack = 20000
+        game.play_hand()
+    print(f"\nEvents of 1000 hands: {counts}")
+
+    # Silent bulk run: nobody listens, nothing is built
+    game = Game(names, [20000] * len(names), rng=42, strategies=RangeStrategy())
+    start = time.perf_counter()
+    for _ in range(5000):
+        for player in game.players:
+            player.stack = 20000
+        game.play_hand()
+    print(f"5000 silent hands in {time.perf_counter() - start:.2f} s")
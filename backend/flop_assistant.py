@@ -1,56 +1,92 @@
-from treys import Card
+import numpy as np
+
+from combos import COMBOS
 from evaluator import HandEvaluator
+from monte_carlo import monte_carlo_equity
+from range_equity import combo_name, combo_vector, range_vector, range_vs_range
 
 handevaluator = HandEvaluator()
-# Sample equity map
-equity_map = {
-    2: {"percent_on_2_coming_cards": 8.7, "percent_on_1_coming_cards": 4.55},
-    3: {"percent_on_2_coming_cards": 8.7, "percent_on_1_coming_cards": 4.55},
-    4: {"percent_on_2_coming_cards": 18.5, "percent_on_1_coming_cards": 8.9},
-    5: {"percent_on_2_coming_cards": 20.2, "percent_on_1_coming_cards": 11.3},
-    6: {"percent_on_2_coming_cards": 24.75, "percent_on_1_coming_cards": 13.6},
-    7: {"percent_on_2_coming_cards": 27.8, "percent_on_1_coming_cards": 15.9},
-    8: {"percent_on_2_coming_cards": 32.6, "percent_on_1_coming_cards": 18.2},
-    9: {"percent_on_2_coming_cards": 38.6, "percent_on_1_coming_cards": 20.5},
-    10: {"percent_on_2_coming_cards": 39.6, "percent_on_1_coming_cards": 22.7},
-    11: {"percent_on_2_coming_cards": 39.6, "percent_on_1_coming_cards": 22.7},
-    12: {"percent_on_2_coming_cards": 45.0, "percent_on_1_coming_cards": 27.2},
-    13: {"percent_on_2_coming_cards": 45.0, "percent_on_1_coming_cards": 27.2},
-    14: {"percent_on_2_coming_cards": 45.0, "percent_on_1_coming_cards": 27.2},
-    15: {"percent_on_2_coming_cards": 57.3, "percent_on_1_coming_cards": 38.3},
-}
-
-def recommend_action(hero_hand, community, updated_opponent_range, round):
+
+METHODS = ("exact", "monte_carlo")
+
+def recommend_action(hero_hand, community, updated_opponent_range, round, method="exact", tolerance=0.005, time_budget=0.25, seed=None,
+                     best_combo=False):
+    """
+    Computes hero's equity against each opponent range.
+
+    The outs are the next cards that make hero the favourite against the whole range, read from the
+    exact range result. The analysis against the single strongest combo of the range (a full turn+river
+    enumeration per opponent) is only run when best_combo is set.
+
+    :param hero_hand: Hero's hole cards (2 cards)
+    :param community: Community cards dealt so far
+    :param updated_opponent_range: Dictionary of position to list of hand notations
+    :param round: Name of the current round ("flop" or "turn")
+    :param method: "exact" to enumerate every runout, "monte_carlo" to sample runouts until
+                   the confidence interval is below tolerance or time_budget (seconds) runs out
+                   (see METHODS)
+    :param seed: Optional seed or numpy Generator for the Monte Carlo streams
+    :param best_combo: Whether to add the strongest combos of each range ("combo", "top_combos") and
+                       the outs against the strongest one ("clean_outs", "runner_runner_outs", "redraw_risk")
+    :return: Dictionary of position to equity results; std_error and samples are 0.0 and None for the
+             exact method, and outs and combo_equities are None and empty for Monte Carlo
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown equity method: {method}")
 
     equity_results = {}
+    hero_weights = combo_vector(hero_hand)
 
     for position, range_list in updated_opponent_range.items():
         if not range_list:
             continue # skip empty ranges
-        
-        # Get best possible hand from opponent's range
-        best_hand = handevaluator.get_best_opponent_hand(range_list, community, hero_hand)
-        best_combo = best_hand["combo"]
-
-        # ompute outs vs. that combo
-        outs_result = handevaluator.compute_outs(hero_hand, community, best_combo)
-        num_outs = outs_result["outs_on_turn"]
-
-        # Map to equity
-        if num_outs > 15:
-            equity = 64.8 if round == "flop" else 47.1
-        else:
-            equity = (
-                equity_map.get(num_outs, {}).get("percent_on_2_coming_cards", 0.0)
-                if round =="flop"
-                else equity_map.get(num_outs, {}).get("percent_on_1_coming_cards", 0.0)
+
+        villain_weights = range_vector(range_list)
+
+        if method == "monte_carlo":
+            villain_combos = [COMBOS[index] for index in np.flatnonzero(villain_weights)]
+            mc_result = monte_carlo_equity(
+                hero_hand, community, [villain_combos],
+                tolerance=tolerance, time_budget=time_budget, seed=seed,
             )
+            if not mc_result["samples"]:
+                continue # every combo of the range is blocked by the board or hero's cards
+            equity = mc_result["equity"]
+            std_error, samples = mc_result["std_error"], mc_result["samples"]
+            num_outs = None  # Only the exact method enumerates the next cards
+            combo_equities = {}  # Only the exact method reports per-combo equities
+        else:
+            # Exact equity against the whole range over every remaining runout
+            range_result = range_vs_range(hero_weights, villain_weights, community)
+            if range_result["equity"] is None:
+                continue # every combo of the range is blocked by the board or hero's cards
+            villain_equities = range_result["villain_combo_equities"]
+            combo_equities = {
+                combo_name(index): float(1.0 - villain_equities[index]) * 100
+                for index in np.flatnonzero(~np.isnan(villain_equities))
+            }
+            equity = range_result["equity"]
+            std_error, samples = 0.0, None
+            num_outs = int(np.sum(range_result["next_card_equities"] > 0.5))
 
-        # Store
+        # Store (same keys for both methods)
         equity_results[position] = {
             "outs": num_outs,
-            "equity": equity,
-            "combo": best_combo
+            "equity": equity * 100,
+            "std_error": std_error,
+            "samples": samples,
+            "combo_equities": combo_equities,
         }
 
-    return equity_results
\ No newline at end of file
+        if best_combo:
+            best_hand = handevaluator.get_best_opponent_hand(range_list, community, hero_hand, k=3)
+            outs_result = handevaluator.compute_outs(hero_hand, community, best_hand["combo"])
+            equity_results[position].update({
+                "clean_outs": outs_result["clean_outs"],
+                "runner_runner_outs": outs_result["runner_runner_outs"],
+                "redraw_risk": outs_result["redraw_risk"],
+                "combo": best_hand["combo"],
+                "top_combos": best_hand["top_combos"],
+            })
+
+    return equity_results
@@ -0,0 +1,244 @@
+"""
+Offline index of hole-card strengths on every strategically distinct flop.
+
+Up to suit permutation there are only 1,755 flops. For each canonical flop
+(see isomorphism.canonicalize) the index stores:
+
+- the 5-card strength of every one of the 1,326 combos (0 if it shares a card with the flop)
+- a bitmask of the draws each combo holds (see the DRAW_* flags)
+
+The file is built once (see the __main__ block) and opened with numpy.memmap.
+At request time a real flop is mapped to its canonical flop, and real combos
+are mapped to canonical combos through the same suit permutation, so a
+range lookup is an array read instead of an evaluator loop.
+"""
+import os
+import struct
+from itertools import combinations, permutations
+
+import numpy as np
+
+from batch_evaluator import evaluate_on_board
+from combos import COMBO_ARRAY, COMBO_INDEX, NUM_COMBOS, combo_index
+from isomorphism import canonicalize
+from lookup_evaluator import card_to_code, straight_high
+
+DRAW_FLUSH = 1
+DRAW_BACKDOOR_FLUSH = 2
+DRAW_OPEN_ENDED = 4
+DRAW_GUTSHOT = 8
+DRAW_OVERCARDS = 16
+
+DRAW_NAMES = {
+    DRAW_FLUSH: "flush draw",
+    DRAW_BACKDOOR_FLUSH: "backdoor flush draw",
+    DRAW_OPEN_ENDED: "open-ended straight draw",
+    DRAW_GUTSHOT: "gutshot",
+    DRAW_OVERCARDS: "overcards",
+}
+
+MAGIC = b"FLOP"
+VERSION = 2
+HEADER = struct.Struct("<4sIII")
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "flop_index.bin")
+
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+PERMUTATION_IDS = {perm: index for index, perm in enumerate(SUIT_PERMUTATIONS)}
+
+
+class _Tables:
+    """
+    Lookup tables of the index, built on first use (about a second) rather than when the module is imported.
+    """
+
+    def __init__(self):
+        self.canonical_flops = sorted({canonicalize(flop)[0][0] for flop in combinations(range(52), 3)})
+        self.flop_ids = {flop: index for index, flop in enumerate(self.canonical_flops)}
+        # permuted_combos[i] maps real combo indices to canonical ones under SUIT_PERMUTATIONS[i]
+        self.permuted_combos = np.array([
+            [COMBO_INDEX[(low & ~3) | perm[low & 3]][(high & ~3) | perm[high & 3]] for low, high in COMBO_ARRAY]
+            for perm in SUIT_PERMUTATIONS
+        ], dtype=np.int16)
+        # Ranks that would complete a straight for a given 13-bit rank mask
+        self.straight_completions = np.array([
+            sum(1 << rank for rank in range(13) if not mask >> rank & 1 and straight_high(mask | 1 << rank) >= 0)
+            if straight_high(mask) < 0 else 0
+            for mask in range(1 << 13)
+        ], dtype=np.int32)
+        self.popcount = np.array([bin(mask).count("1") for mask in range(1 << 13)], dtype=np.int8)
+
+
+_tables = None
+
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = _Tables()
+    return _tables
+
+
+def canonical_flops():
+    """
+    Returns the 1,755 canonical flops, sorted (row order of the index).
+    """
+    return _get_tables().canonical_flops
+
+def describe_draws(draws):
+    """
+    Lists the names of the draws in a draw bitmask.
+    """
+    return [name for flag, name in DRAW_NAMES.items() if draws & flag]
+
+
+def _flop_draws(flop):
+    """
+    Computes the draw bitmask of every combo on a flop (vectorized over the 1,326 combos).
+    """
+    tables = _get_tables()
+    flop = np.asarray(flop)
+    ranks = COMBO_ARRAY >> 2
+    suits = COMBO_ARRAY & 3
+    draws = np.zeros(NUM_COMBOS, dtype=np.uint8)
+
+    for suit in range(4):
+        hole = (suits == suit).sum(axis=1)
+        total = hole + (flop & 3 == suit).sum()
+        draws |= np.where((hole > 0) & (total == 4), DRAW_FLUSH, 0).astype(np.uint8)
+        draws |= np.where((hole > 0) & (total == 3), DRAW_BACKDOOR_FLUSH, 0).astype(np.uint8)
+
+    board_mask = int(np.bitwise_or.reduce(1 << (flop >> 2)))
+    hand_masks = board_mask | (1 << ranks[:, 0]) | (1 << ranks[:, 1])
+    outs = tables.popcount[tables.straight_completions[hand_masks] & ~tables.straight_completions[board_mask]]
+    # Open-ended needs four consecutive ranks; two outs without them is a double gutshot
+    four_in_a_row = (hand_masks & hand_masks >> 1 & hand_masks >> 2 & hand_masks >> 3) != 0
+    open_ended = (outs >= 2) & four_in_a_row
+    draws |= np.where(open_ended, DRAW_OPEN_ENDED, 0).astype(np.uint8)
+    draws |= np.where((outs >= 1) & ~open_ended, DRAW_GUTSHOT, 0).astype(np.uint8)
+
+    draws |= np.where(ranks.min(axis=1) > (flop >> 2).max(), DRAW_OVERCARDS, 0).astype(np.uint8)
+    return draws
+
+
+def build_index(path=DEFAULT_PATH):
+    """
+    Computes strengths and draws of every combo on every canonical flop and writes them to disk.
+
+    :param path: Output file path.
+    """
+    flops = canonical_flops()
+    num_flops = len(flops)
+    strengths = np.zeros((num_flops, NUM_COMBOS), dtype=np.uint32)
+    draws = np.zeros((num_flops, NUM_COMBOS), dtype=np.uint8)
+
+    for flop_id, flop in enumerate(flops):
+        live = ~np.isin(COMBO_ARRAY, flop).any(axis=1)
+        strengths[flop_id, live] = evaluate_on_board(COMBO_ARRAY[live], list(flop))
+        draws[flop_id] = np.where(live, _flop_draws(flop), 0)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, num_flops, NUM_COMBOS))
+        f.write(np.array(flops, dtype=np.uint8).tobytes())
+        f.write(strengths.tobytes())
+        f.write(draws.tobytes())
+
+
+class FlopIndex:
+    """
+    Memory-mapped view over a flop index file.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Opens an index built by build_index.
+
+        :param path: Path of the index file.
+        """
+        with open(path, "rb") as f:
+            magic, version, num_flops, num_combos = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or num_flops != len(canonical_flops()) or num_combos != NUM_COMBOS:
+            raise ValueError(f"{path} is not a flop index (version {VERSION}).")
+
+        offset = HEADER.size + num_flops * 3
+        self.strengths = np.memmap(path, dtype=np.uint32, mode="r", offset=offset, shape=(num_flops, num_combos))
+        offset += self.strengths.nbytes
+        self.draws = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(num_flops, num_combos))
+
+    @staticmethod
+    def locate(flop):
+        """
+        Maps a real flop to its canonical flop.
+
+        :param flop: 3 flop cards (strings or integer codes)
+        :return: Tuple (flop id, mapping from real combo index to canonical combo index)
+        """
+        tables = _get_tables()
+        (key,), suit_map = canonicalize(flop)
+        return tables.flop_ids[key], tables.permuted_combos[PERMUTATION_IDS[tuple(suit_map)]]
+
+    def combo_strengths(self, flop, combo_indices=None):
+        """
+        Reads the strengths of real combos on a real flop.
+
+        :param flop: 3 flop cards
+        :param combo_indices: Real combo indices (defaults to all 1,326 combos)
+        :return: uint32 array of strengths (0 for combos that share a card with the flop)
+        """
+        flop_id, combo_map = self.locate(flop)
+        if combo_indices is None:
+            return self.strengths[flop_id][combo_map]
+        return self.strengths[flop_id][combo_map[combo_indices]]
+
+    def combo_draws(self, flop, combo_indices=None):
+        """
+        Reads the draw bitmasks of real combos on a real flop.
+
+        :param flop: 3 flop cards
+        :param combo_indices: Real combo indices (defaults to all 1,326 combos)
+        :return: uint8 array of draw bitmasks
+        """
+        flop_id, combo_map = self.locate(flop)
+        if combo_indices is None:
+            return self.draws[flop_id][combo_map]
+        return self.draws[flop_id][combo_map[combo_indices]]
+
+    def hand_strength(self, hole_cards, flop):
+        """
+        Reads the strength of one hand on a flop.
+        """
+        return int(self.combo_strengths(flop, [combo_index(hole_cards)])[0])
+
+
+_index = None
+
+
+def get_index(path=DEFAULT_PATH):
+    """
+    Returns the shared memory-mapped index, or None if it has not been built yet.
+    """
+    global _index
+    if _index is None:
+        if not os.path.exists(path):
+            return None
+        _index = FlopIndex(path)
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the isomorphic flop index.")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_index(args.output)
+    print(f"Indexed {len(canonical_flops())} flops in {time.perf_counter() - start:.1f} s")
+
+    index = FlopIndex(args.output)
+    flop = ["Q♠", "J♠", "2♥"]
+    hand = [card_to_code("A♠"), card_to_code("T♠")]
+    draws = index.combo_draws(flop, [combo_index(hand)])[0]
+    print(f"A♠T♠ on {flop}: strength {index.hand_strength(hand, flop)}, draws {describe_draws(draws)}")
@@ -1,76 +1,138 @@
-from player import Player
+from player import GameClosed, Player
 from deck import Deck
 from betting import BettingRound
 from evaluator import HandEvaluator
-import time
+from cards import CARDS
+from events import (CommunityCardsDealt, ConsoleLogger, EventBus, GameOver, HandEnded, HandStarted, PotAwarded,
+                    ShowdownStarted)
+import threading
+
+SMALL_BLIND = 100
+BIG_BLIND = 200
+
 class Game:
     """
     Manages the entire game of No-Limit Texas Hold'em.
     Handles player actions, betting rounds, community cards, and the showdown.
     """
 
-    def __init__(self, players, starting_stacks, manual_holecards=None):
+    def __init__(self, players, starting_stacks, manual_holecards=None, rng=None, strategies=None, verbose=None,
+                 recorder=None, events=None):
         """
         Initializes a new poker game.
 
         :param players: List of player names.
         :param starting_stack: The amount of chips each player starts with.
+        :param rng: Seed or numpy Generator of this table's deck (see rng.make_rng).
+        :param strategies: Strategy for every player, or dictionary of player name to strategy (see strategies.py).
+                           When given, the game runs headless: strategies decide synchronously and every hand
+                           is played from the deal to the showdown without waiting for the frontend, so every
+                           player needs a strategy. An empty dictionary is the same as None.
+        :param verbose: Whether to print the course of the game (defaults to False when headless).
+        :param recorder: Optional HandRecorder appending every hand to a hand history (see history.py).
+        :param events: EventBus receiving the events of the game (see events.py); a new one by default.
+        :raises ValueError: If strategies are given but some player has none.
         """
+        if strategies is not None and not isinstance(strategies, dict):
+            strategies = {name: strategies for name in players}
+        self.strategies = strategies or {}
+        self.headless = bool(self.strategies)
+        if self.headless and any(name not in self.strategies for name in players):
+            missing = ", ".join(name for name in players if name not in self.strategies)
+            raise ValueError(f"Headless game without a strategy for {missing}")
+        self.events = events if events is not None else EventBus()
+        if (not self.headless if verbose is None else verbose):
+            ConsoleLogger(self.events)
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.subscribe(self.events)
 
         # self.players = [Player(name, stack, i) for i, (name, stack) in enumerate(zip(players, starting_stacks))]
         self.awaiting_flop_input = False
         self.awaiting_turn_input = False
         
         self.updated_ranges = {}
+        self.preflop_raisers = []  # Names of the players who raised preflop this hand, in order (kept by the BettingRound)
         self.players = []
         for idx, (name, stack) in enumerate(zip(players, starting_stacks)):
-            self.players.append(Player(name, stack, idx))
+            self.players.append(Player(name, stack, idx, events=self.events))
         self.current_bet = max(p.current_bet for p in self.players) if self.players else 0
-        self.deck = Deck()  # Create a deck instance
+        self.deck = Deck(rng=rng)  # Create a deck instance with its own RNG stream
         self.community_cards = []  # Store community cards
         self.pot = 0  # Main pot
-        self.small_blind = 100
-        self.big_blind = 200
+        self.small_blind = SMALL_BLIND
+        self.big_blind = BIG_BLIND
         self.dealer_position = 0  # Track the dealer position
         self.small_blind_position = (self.dealer_position + 1) % len(self.players)
         self.big_blind_position = (self.dealer_position + 2) % len(self.players)
         self.current_betting_round = None  # Stores the current betting round
         self.hand_number = 0  # Keeps track of how many hands have been played
         self.manual_holecards = manual_holecards or {}
-        self.ready_for_next_hand = False  # Flag to indicate if the game is ready for the next hand
+        self._next_hand_condition = threading.Condition()
+        self._ready_for_next_hand = False  # Flag to indicate if the game is ready for the next hand
+        self.closed = False
+
+    @property
+    def ready_for_next_hand(self):
+        return self._ready_for_next_hand
+
+    @ready_for_next_hand.setter
+    def ready_for_next_hand(self, ready):
+        """
+        Setting the flag to True wakes up start_game.
+        """
+        with self._next_hand_condition:
+            self._ready_for_next_hand = ready
+            self._next_hand_condition.notify_all()
+
+    def close(self):
+        """
+        Stops the game: threads waiting for the frontend (actions or the next hand) raise GameClosed.
+        """
+        with self._next_hand_condition:
+            self.closed = True
+            self._next_hand_condition.notify_all()
+        for player in self.players:
+            player.cancel()
 
     def start_game(self, max_hands=10):
         """
         Runs a full poker game for a specified number of hands.
 
         :param max_hands: Number of hands to play before ending the game.
+        :raises GameClosed: If the game is closed while waiting for the frontend.
         """
         for _ in range(max_hands):
             self.play_hand()
-            while not self.ready_for_next_hand:
-                time.sleep(0.01)
+            if not self.headless:
+                with self._next_hand_condition:
+                    self._next_hand_condition.wait_for(lambda: self._ready_for_next_hand or self.closed)
+                    if self.closed:
+                        raise GameClosed()
+                    self._ready_for_next_hand = False
             if self.check_game_over():
-                break  # Stop the game if only one player remains
-        print("\nGame Over!")
+                return  # Stop the game if only one player remains
+        if self.events:
+            self.events.emit(GameOver(None, 0))
 
     def play_hand(self):
         """
         Manages a single hand of poker from dealing to showdown.
+        In interactive mode the hand pauses after preflop until the frontend sets the flop.
         """
+        if self.headless:
+            return self.play_hand_old()
+
         self.hand_number += 1
-        print(f"\n=== Hand {self.hand_number} ===")
 
+        starting_stacks = [p.stack for p in self.players]
         self.reset_hand()
         self.deck.shuffle()
         self.assign_blinds()
         self.deal_hole_cards()
+        self.emit_hand_started(starting_stacks)
         self.execute_betting_round("Preflop")
 
-        if self.hand_continues():
-            self.awaiting_flop_input = True
-            
-        print("after waiting self.current_bet: ", self.current_bet)
-
         # if self.hand_continues():
         #     self.deal_community_cards(3, "Flop")
         #     self.execute_betting_round("Flop")
@@ -92,14 +154,23 @@ class Game:
     def play_hand_old(self):
         """
         Manages a single hand of poker from dealing to showdown.
+        This is the flow used by headless games, where strategies make every decision.
+
+        :return: Dictionary with the dealer position the hand was played with, the final pot,
+                 whether it went to showdown, and per seat the net chips won and whether the
+                 player was still in at the showdown
         """
         self.hand_number += 1
-        print(f"\n=== Hand {self.hand_number} ===")
+
+        starting_stacks = [p.stack for p in self.players]
+        dealer_position = self.dealer_position
+        showdown = False
 
         self.reset_hand()
         self.deck.shuffle()
         self.assign_blinds()
         self.deal_hole_cards()
+        self.emit_hand_started(starting_stacks)
         self.execute_betting_round("Preflop")
 
         if self.hand_continues():
@@ -115,10 +186,97 @@ class Game:
             self.execute_betting_round("River")
 
         if self.hand_continues():
+            showdown = True
+            at_showdown = [not p.folded for p in self.players]
             self.showdown()
 
+        result = {
+            "dealer_position": dealer_position,
+            "pot": sum(p.current_hand_bet for p in self.players),
+            "showdown": showdown,
+            "net": [p.stack - stack for p, stack in zip(self.players, starting_stacks)],
+            "at_showdown": at_showdown if showdown else [False] * len(self.players),
+        }
+        if self.events:
+            self.events.emit(HandEnded(self.hand_number, tuple(p.stack for p in self.players)))
+
         self.reset_players_for_next_hand()
         self.rotate_dealer()
+        return result
+
+    def start_hand(self):
+        """
+        Starts an interactive hand without blocking: deals, posts the blinds and opens the preflop
+        round. The frontend then plays it one request at a time (perform_action, start_betting_round),
+        which lets a server keep the game in a store between requests instead of in a thread.
+        """
+        self.hand_number += 1
+
+        starting_stacks = [p.stack for p in self.players]
+        self.reset_hand()
+        self.deck.shuffle()
+        self.assign_blinds()
+        self.deal_hole_cards()
+        self.emit_hand_started(starting_stacks)
+        self.start_betting_round("Preflop")
+
+    def start_betting_round(self, round_name):
+        """
+        Opens a betting round and plays it until a player without strategy has to act.
+
+        :param round_name: The name of the betting phase (Preflop, Flop, Turn, River).
+        """
+        self.current_betting_round = self.new_betting_round(round_name)
+        self.current_betting_round.announce()
+        self.advance()
+
+    def perform_action(self, player_name, action, amount):
+        """
+        Applies the action of the player whose turn it is, then lets the strategies play until
+        the next player without strategy has to act or the round is over.
+
+        :param player_name: Name of the player acting.
+        :param action: fold, call or raise.
+        :param amount: Amount of chips for call and raise.
+        :raises ValueError: If there is no betting round, it is not the player's turn or the bet is not valid.
+        """
+        betting_round = self.current_betting_round
+        if betting_round is None or betting_round.finished:
+            raise ValueError("No betting round in progress")
+        player = next((p for p in self.players if p.name == player_name), None)
+        if player is None:
+            raise ValueError(f"Unknown player: {player_name}")
+        betting_round.perform_action(player, action, amount)
+        self.advance()
+
+    def advance(self):
+        """
+        Plays the strategies of the current betting round and finishes the round once nobody is left to act.
+        """
+        betting_round = self.current_betting_round
+        while not betting_round.finished:
+            player = betting_round.next_player()
+            if player is None:
+                betting_round.finished = True
+                self.finish_betting_round()
+                return
+            strategy = betting_round.strategies.get(player.name) or player.strategy
+            if strategy is None:
+                return  # Waiting for the frontend
+            action, amount = strategy.choose_action(betting_round.get_valid_actions(player), player=player, game=self)
+            betting_round.perform_action(player, action, amount)
+
+    def emit_hand_started(self, starting_stacks):
+        """
+        Announces a hand once the blinds are posted and the hole cards dealt.
+
+        :param starting_stacks: Stacks of the players before the blinds.
+        """
+        if self.events:
+            self.events.emit(HandStarted(
+                self.hand_number, self.dealer_position, tuple(p.name for p in self.players), tuple(starting_stacks),
+                self.small_blind, self.big_blind, tuple(tuple(p.hole_cards) for p in self.players),
+            ))
 
     def reset_hand(self):
         """
@@ -126,6 +284,7 @@ class Game:
         """
         self.community_cards = []
         self.pot = 0
+        self.preflop_raisers = []
         self.deck.reset_deck()
         for player in self.players:
             player.reset_for_new_hand()
@@ -134,14 +293,15 @@ class Game:
         """
         Assigns the small and big blinds.
         """
-        self.small_blind_player = self.players[(self.dealer_position + 1) % len(self.players)]
-        self.big_blind_player = self.players[(self.dealer_position + 2) % len(self.players)]
+        self.small_blind_position = (self.dealer_position + 1) % len(self.players)
+        self.big_blind_position = (self.dealer_position + 2) % len(self.players)
+        self.small_blind_player = self.players[self.small_blind_position]
+        self.big_blind_player = self.players[self.big_blind_position]
 
         self.small_blind_player.place_bet(self.small_blind)
         self.big_blind_player.place_bet(self.big_blind)
 
         self.pot += self.small_blind + self.big_blind
-        print(f"\nBlinds: {self.small_blind_player.name} posts {self.small_blind}, {self.big_blind_player.name} posts {self.big_blind}")
 
     def deal_hole_cards_old(self):
         """
@@ -150,23 +310,21 @@ class Game:
         for player in self.players:
             if not player.folded:
                 player.receive_cards(self.deck.deal(2))
-                print(f"{player.name} receives two hole cards.")
 
     def deal_hole_cards(self):
+        if self.headless:
+            return self.deal_hole_cards_old()
+
         for player in self.players:
             if not player.folded:
                 if player.name.lower() == "you" and "you" in self.manual_holecards:
                     cards = self.manual_holecards["you"]
                     # Remove selected cards from deck
-                    self.deck.cards = [c for c in self.deck.cards if c not in cards]
+                    self.deck.remove(cards)
                     player.receive_cards(cards)
-                    print(f"{player.name} receives manually selected hole cards: {cards}")
                 elif player.name.lower() == "you" and "you" not in self.manual_holecards:
                     player.receive_cards(self.deck.deal(2))
-                    print(f"{player.name} receives two hole cards.")
-                else:
-                    # player.receive_cards(self.deck.deal(2))
-                    print(f"{player.name} receives two hole cards.")
+                # The other players' cards are unknown
 
     def deal_community_cards(self, num_cards, round_name):
         """
@@ -177,7 +335,20 @@ class Game:
         """
         new_cards = self.deck.deal(num_cards)
         self.community_cards.extend(new_cards)
-        print(f"\n{round_name} dealt: {', '.join(self.community_cards)}")
+        if self.events:
+            self.events.emit(CommunityCardsDealt(round_name, tuple(new_cards), tuple(self.community_cards)))
+
+    def set_community_cards(self, cards):
+        """
+        Adds community cards chosen by the user (e.g., the flop entered in the frontend).
+
+        :param cards: List of Cards.
+        """
+        self.deck.remove(cards)
+        self.community_cards.extend(cards)
+        if self.events:
+            street = {3: "Flop", 4: "Turn", 5: "River"}.get(len(self.community_cards))
+            self.events.emit(CommunityCardsDealt(street, tuple(cards), tuple(self.community_cards)))
 
     def execute_betting_round(self, round_name, preflop=False):
         """
@@ -186,10 +357,19 @@ class Game:
         :param round_name: The name of the betting phase (Preflop, Flop, Turn, River).
         :param preflop: Boolean flag to indicate if this is a preflop round (changes action order).
         """
-        print(f"\n--- {round_name} Betting Round ---")
+        self.current_betting_round = self.new_betting_round(round_name, preflop)
+        self.current_betting_round.announce()
+        self.current_betting_round.process_actions(self) # <- line not needed for frontend, but needed if playing with terminal
+        self.current_betting_round.finished = True
+        self.finish_betting_round()
+
+    def new_betting_round(self, round_name, preflop=False):
+        """
+        Creates the BettingRound of a street.
+        """
         if "preflop" in round_name.lower():
             preflop = True
-        self.current_betting_round = BettingRound(
+        return BettingRound(
             players=self.players, 
             pot=self.pot,
             dealer_position=self.dealer_position,
@@ -197,13 +377,87 @@ class Game:
             bb_position=self.big_blind_position,
             small_blind=self.small_blind,
             preflop=preflop,
+            strategies=self.strategies,
+            events=self.events,
+            street=round_name,
+            raisers=self.preflop_raisers if preflop else None,
         )
 
-        self.current_betting_round.process_actions(self) # <- line not needed for frontend, but needed if playing with terminal
-        print("self.pot: ", self.pot)
-        print("self.current_betting_round.pot: ", self.current_betting_round.pot)
+    def finish_betting_round(self):
+        """
+        Collects the pot of the current betting round.
+        Interactive hands then pause until the frontend sets the flop (after preflop) or the turn (after the flop).
+        """
         self.pot = self.current_betting_round.pot  # Update the total pot
 
+        # Checked once the pot is up to date, since hand_continues awards it when everyone else folded.
+        if not self.headless:
+            if self.current_betting_round.preflop:
+                if self.hand_continues():
+                    self.awaiting_flop_input = True
+            elif len(self.community_cards) == 3:
+                if self.hand_continues():
+                    self.awaiting_turn_input = True
+
+
+    def to_dict(self):
+        """
+        Serializes an interactive game (players, deck and its RNG, board, pot, blinds, betting round, ...)
+        into JSON-compatible data, so it can be stored between requests (see state_store.py).
+        Strategies, event subscribers and recorders are not part of it.
+        """
+        return {
+            "players": [p.to_dict() for p in self.players],
+            "deck": self.deck.to_dict(),
+            "community_cards": [int(card) for card in self.community_cards],
+            "pot": self.pot,
+            "small_blind": self.small_blind,
+            "big_blind": self.big_blind,
+            "dealer_position": self.dealer_position,
+            "small_blind_position": self.small_blind_position,
+            "big_blind_position": self.big_blind_position,
+            "hand_number": self.hand_number,
+            "manual_holecards": {name: [int(card) for card in cards] for name, cards in self.manual_holecards.items()},
+            "awaiting_flop_input": self.awaiting_flop_input,
+            "awaiting_turn_input": self.awaiting_turn_input,
+            "updated_ranges": self.updated_ranges,
+            "preflop_raisers": self.preflop_raisers,
+            "current_betting_round": self.current_betting_round.to_dict() if self.current_betting_round else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data, verbose=None, recorder=None, events=None):
+        """
+        Rebuilds an interactive game serialized by to_dict.
+
+        :param data: Dictionary returned by to_dict.
+        :param verbose: Whether to print the course of the game (default True, as for interactive games).
+        :param recorder: Optional HandRecorder (see history.py).
+        :param events: Optional EventBus receiving the events of the game.
+        """
+        game = cls([p["name"] for p in data["players"]], [p["stack"] for p in data["players"]],
+                   verbose=verbose, recorder=recorder, events=events)
+        game.players = [Player.from_dict(p, events=game.events) for p in data["players"]]
+        game.current_bet = max(p.current_bet for p in game.players) if game.players else 0
+        game.deck = Deck.from_dict(data["deck"])
+        game.community_cards = [CARDS[code] for code in data["community_cards"]]
+        game.pot = data["pot"]
+        game.small_blind = data["small_blind"]
+        game.big_blind = data["big_blind"]
+        game.dealer_position = data["dealer_position"]
+        game.small_blind_position = data["small_blind_position"]
+        game.big_blind_position = data["big_blind_position"]
+        game.hand_number = data["hand_number"]
+        game.manual_holecards = {name: [CARDS[code] for code in cards] for name, cards in data["manual_holecards"].items()}
+        game.awaiting_flop_input = data["awaiting_flop_input"]
+        game.awaiting_turn_input = data["awaiting_turn_input"]
+        game.updated_ranges = data["updated_ranges"]
+        game.preflop_raisers = data["preflop_raisers"]
+        if data["current_betting_round"] is not None:
+            game.current_betting_round = BettingRound.from_dict(
+                data["current_betting_round"], game.players, strategies=game.strategies, events=game.events,
+                raisers=game.preflop_raisers if data["current_betting_round"]["preflop"] else None)
+        return game
 
     def hand_continues(self):
         """
@@ -216,15 +470,12 @@ class Game:
         if len(active_players) == 1:
             winner = active_players[0]
             winner.stack += self.pot
-            print(f"\n{winner.name} wins the pot of {self.pot} chips!")
+            if self.events and self.pot:
+                self.events.emit(PotAwarded(winner.name, self.pot, self.pot))
             self.pot = 0
             return False
         
         # If all active players are all-in, no further betting rounds needed
-        if all(p.all_in for p in active_players):
-            print("\nAll remaining players are all-in. Moving to showdown...")
-            return True
-
         return True
 
     def calculate_side_pots(self):
@@ -234,8 +485,6 @@ class Game:
         all_bets = sorted(set(p.current_hand_bet for p in self.players if p.current_hand_bet > 0))
         side_pots = []
         previous_bet = 0
-        print([(p.name, p.current_hand_bet) for p in self.players])
-        print("all_bets: ", all_bets)
         for bet in all_bets:
             involved_players = [p for p in self.players if p.current_hand_bet >= bet]
             side_pot = (bet - previous_bet) * len(involved_players)
@@ -249,16 +498,15 @@ class Game:
         Determines the winner(s) and distributes the pot(s).
         Creates side pots when players are all-in and others continue betting.
         """
-        print("\n--- Showdown ---")
-        
         active_players = [p for p in self.players if not p.folded]
-        for p in active_players:
-            print(f"{p.name}: {p.hole_cards}")
+        if self.events:
+            self.events.emit(ShowdownStarted(tuple((p.name, tuple(p.hole_cards)) for p in active_players)))
 
         if len(active_players) == 1:
             winner = active_players[0]
             winner.stack += self.pot
-            print(f"{winner.name} wins {self.pot} chips!")
+            if self.events:
+                self.events.emit(PotAwarded(winner.name, self.pot, self.pot))
             self.pot = 0
             return
 
@@ -295,14 +543,14 @@ class Game:
                     split_amount = current_pot // len(winners)
                     remainder = current_pot % len(winners)
                     
-                    print(f"\nPot level {bet_level} chips ({current_pot} total):")
                     for player in self.players:
                         if player.name in winners:
                             extra_chip = 1 if remainder > 0 else 0
                             remainder -= 1
                             winning_amount = split_amount + extra_chip
                             player.stack += winning_amount
-                            print(f"{player.name} wins {winning_amount} chips!")
+                            if self.events:
+                                self.events.emit(PotAwarded(player.name, winning_amount, current_pot))
                     
                     remaining_pot -= current_pot
             
@@ -332,15 +580,17 @@ class Game:
         """
         active_players = [p for p in self.players if p.stack > 0]
         if len(active_players) == 1:
-            print(f"\n🏆 {active_players[0].name} is the winner with {active_players[0].stack} chips!")
+            if self.events:
+                self.events.emit(GameOver(active_players[0].name, active_players[0].stack))
             return True
         return False
 
 if __name__ == "__main__":
+    from strategies import RangeStrategy
 
-    # Create a game with 3 players and 1000 chips each
+    # Headless game: 6 players with 1000 chips each, every decision made by the preflop charts
     players = ["Anne", "Benoît", "Claire", "Denis", "Elodie", "François"]
-    poker_game = Game(players, starting_stack=1000)
+    poker_game = Game(players, starting_stacks=[1000] * len(players), rng=42, strategies=RangeStrategy(), verbose=True)
 
     # Start the game for up to 10 hands
     poker_game.start_game(max_hands=10)
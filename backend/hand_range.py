@@ -0,0 +1,320 @@
+"""
+Compiled hand ranges as 1,326-bit combo masks.
+
+Bit i of a Range mask is set when combo i (see combos.py) is in the range, so
+union, intersection, difference and counting are plain integer bit operations,
+and removing dead cards is a single AND with a precomputed per-card mask.
+
+Notation lists (as found in ranges.py) and range strings in compact notation
+are compiled once and memoized, so ranges used on every request are only
+expanded the first time they are seen. The compact notation accepts tokens
+separated by commas or spaces:
+
+- single hands: "AA", "AKs", "AKo", "AK" (suited and offsuit)
+- plus ranges: "22+" (22 up to AA), "ATs+" (ATs up to AKs)
+- dash ranges: "22-77", "KQo-K9o", "A5s-A2s"
+- explicit combos: "AsKs", "A♠K♠"
+- optional weights between 0 and 1: "AKo:0.5", "AsKs:0.25" (later tokens override earlier ones)
+"""
+import math
+
+import numpy as np
+
+from combos import COMBOS, NUM_COMBOS, combo_index
+from lookup_evaluator import RANK_INDEX, RANKS, SUIT_INDEX, card_to_code, code_to_card
+from preflop_equity import CLASS_COMBOS, CLASS_INDEX
+
+# CARD_COMBO_MASKS[code] has the bits of every combo that uses this card
+CARD_COMBO_MASKS = [0] * 52
+for _index, (_low, _high) in enumerate(COMBOS):
+    CARD_COMBO_MASKS[_low] |= 1 << _index
+    CARD_COMBO_MASKS[_high] |= 1 << _index
+
+_notation_masks = {}
+_compiled_ranges = {}
+_parsed_ranges = {}
+
+
+def _parse_hand(hand, token):
+    """
+    Splits a hand class notation (e.g., "AKs", "T9", "77") into (high rank, low rank, suitedness).
+    """
+    if len(hand) not in (2, 3) or hand[0] not in RANK_INDEX or hand[1] not in RANK_INDEX:
+        raise ValueError(f"Invalid range notation: {token!r}")
+    high, low, kind = RANK_INDEX[hand[0]], RANK_INDEX[hand[1]], hand[2:]
+    if kind not in ("", "s", "o") or (high == low and kind):
+        raise ValueError(f"Invalid range notation: {token!r}")
+    if high < low:
+        high, low = low, high
+    return high, low, kind
+
+
+def _class_mask(high, low, kind):
+    """
+    Returns the combo mask of a hand class; a non-pair without suitedness covers both.
+    """
+    if high == low:
+        names = [RANKS[high] * 2]
+    else:
+        names = [RANKS[high] + RANKS[low] + suitedness for suitedness in (kind or "so")]
+    mask = 0
+    for name in names:
+        for combo in CLASS_COMBOS[CLASS_INDEX[name]]:
+            mask |= 1 << combo_index(combo)
+    return mask
+
+
+def _token_mask(token):
+    """
+    Expands one compact notation token (without weight) into a combo mask.
+    """
+    if "-" in token:
+        first, last = token.split("-", 1)
+        high1, low1, kind1 = _parse_hand(first, token)
+        high2, low2, kind2 = _parse_hand(last, token)
+        if kind1 != kind2:
+            raise ValueError(f"Invalid range notation: {token!r}")
+        if high1 == low1 and high2 == low2:
+            ranks = [(rank, rank) for rank in range(min(high1, high2), max(high1, high2) + 1)]
+        elif high1 == high2 and high1 != low1 and high2 != low2:
+            ranks = [(high1, low) for low in range(min(low1, low2), max(low1, low2) + 1)]
+        else:
+            raise ValueError(f"Invalid range notation: {token!r}")
+        mask = 0
+        for high, low in ranks:
+            mask |= _class_mask(high, low, kind1)
+        return mask
+
+    if token.endswith("+"):
+        high, low, kind = _parse_hand(token[:-1], token)
+        if high == low:
+            ranks = [(rank, rank) for rank in range(high, 13)]
+        else:
+            ranks = [(high, rank) for rank in range(low, high)]
+        mask = 0
+        for high, low in ranks:
+            mask |= _class_mask(high, low, kind)
+        return mask
+
+    if len(token) == 4 and token[1] in SUIT_INDEX and token[3] in SUIT_INDEX:
+        if token[0] not in RANK_INDEX or token[2] not in RANK_INDEX:
+            raise ValueError(f"Invalid range notation: {token!r}")
+        index = combo_index([token[:2], token[2:]])
+        if index < 0:
+            raise ValueError(f"Invalid range notation: {token!r}")
+        return 1 << index
+
+    return _class_mask(*_parse_hand(token, token))
+
+
+def notation_mask(notation):
+    """
+    Returns the combo mask of a single notation token (e.g., "AKs", "77", "AJ", "ATs+", "22-77").
+
+    :param notation: Hand notation, without weight
+    :return: Integer combo mask
+    :raises ValueError: If the notation cannot be parsed (not cached, so it raises every time)
+    """
+    mask = _notation_masks.get(notation)
+    if mask is None:
+        mask = _token_mask(notation)
+        _notation_masks[notation] = mask
+    return mask
+
+
+def parse_range(text):
+    """
+    Compiles a range string in compact notation, memoized by the string.
+
+    :param text: Range string (e.g., "22+, ATs+, KQo-K9o, AKo:0.5")
+    :return: Range, with per-combo weights when any token carries a weight other than 1
+    :raises ValueError: If a token cannot be parsed or its weight is not between 0 and 1
+    """
+    compiled = _parsed_ranges.get(text)
+    if compiled is None:
+        mask = 0
+        weighted = []
+        for token in text.replace(",", " ").split():
+            hand, _, weight = token.partition(":")
+            try:
+                weight = float(weight) if weight else 1.0
+            except ValueError:
+                raise ValueError(f"Invalid range weight: {token!r}") from None
+            if not math.isfinite(weight) or not 0 <= weight <= 1:
+                raise ValueError(f"Invalid range weight: {token!r}")
+            token_mask = _token_mask(hand)
+            mask = mask & ~token_mask if weight == 0 else mask | token_mask
+            if weight != 1.0 or weighted:
+                weighted.append((token_mask, weight))
+
+        weights = None
+        if any(weight != 1.0 for _, weight in weighted):
+            weights = np.ones(NUM_COMBOS)
+            for token_mask, weight in weighted:
+                weights[Range(token_mask).indices()] = weight
+            weights.flags.writeable = False  # The cached Range is shared by every caller
+        compiled = Range(mask, weights)
+        _parsed_ranges[text] = compiled
+    return compiled
+
+
+def dead_mask(cards):
+    """
+    Returns the mask of every combo that uses one of the given cards.
+
+    :param cards: Dead cards (strings or integer codes)
+    :return: Integer combo mask
+    """
+    mask = 0
+    for card in cards:
+        mask |= CARD_COMBO_MASKS[card_to_code(card)]
+    return mask
+
+
+class Range:
+    """
+    Set of combos stored as a 1,326-bit integer mask, with optional per-combo weights.
+    """
+
+    __slots__ = ("mask", "weights")
+
+    def __init__(self, mask=0, weights=None):
+        """
+        Initializes a range from a combo mask.
+
+        :param mask: Integer with bit i set when combo i is in the range.
+        :param weights: Optional 1,326-combo weight vector (None when every combo has weight 1).
+        """
+        self.mask = mask
+        self.weights = weights
+
+    @classmethod
+    def from_notations(cls, notations):
+        """
+        Compiles a list of hand notations, memoized by the notation list.
+
+        :param notations: List of hand notations (e.g., ["AKs", "77"])
+        :return: Range
+        """
+        key = tuple(notations)
+        compiled = _compiled_ranges.get(key)
+        if compiled is None:
+            mask = 0
+            for notation in key:
+                mask |= notation_mask(notation)
+            compiled = cls(mask)
+            _compiled_ranges[key] = compiled
+        return compiled
+
+    @classmethod
+    def from_combos(cls, combos):
+        """
+        Builds a range from explicit combos.
+
+        :param combos: List of 2-card combos (strings or integer codes)
+        :return: Range
+        """
+        mask = 0
+        for combo in combos:
+            mask |= 1 << combo_index(combo)
+        return cls(mask)
+
+    def remove_dead(self, dead_cards):
+        """
+        Returns the range without the combos that use any of the dead cards.
+
+        :param dead_cards: Dead cards (strings or integer codes)
+        :return: Range
+        """
+        return Range(self.mask & ~dead_mask(dead_cards), self.weights)
+
+    def includes(self, notation):
+        """
+        Checks whether every combo of a hand notation (e.g., "AKs") is in the range.
+
+        :raises ValueError: If the notation cannot be parsed
+        """
+        mask = notation_mask(notation)
+        return mask != 0 and self.mask & mask == mask
+
+    def indices(self):
+        """
+        Returns the combo indices of the range, in increasing order.
+        """
+        mask = self.mask
+        indices = []
+        while mask:
+            low_bit = mask & -mask
+            indices.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return indices
+
+    def combos(self):
+        """
+        Returns the combos of the range as (code, code) tuples.
+        """
+        return [COMBOS[index] for index in self.indices()]
+
+    def card_combos(self):
+        """
+        Returns the combos of the range as Card pairs, high card first (e.g., [A♠, K♠]).
+        """
+        return [[code_to_card(high), code_to_card(low)] for low, high in self.combos()]
+
+    def to_weights(self, weight=1.0):
+        """
+        Returns the range as a 1,326-combo weight vector.
+        """
+        weights = np.zeros(NUM_COMBOS)
+        indices = self.indices()
+        weights[indices] = weight if self.weights is None else self.weights[indices] * weight
+        return weights
+
+    def __or__(self, other):
+        weights = None
+        if self.weights is not None or other.weights is not None:
+            weights = other.to_weights()
+            indices = self.indices()
+            weights[indices] = self.to_weights()[indices]
+        return Range(self.mask | other.mask, weights)
+
+    def __and__(self, other):
+        return Range(self.mask & other.mask, self.weights)
+
+    def __sub__(self, other):
+        return Range(self.mask & ~other.mask, self.weights)
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __contains__(self, combo):
+        return bool(self.mask >> combo_index(combo) & 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, Range) or self.mask != other.mask:
+            return False
+        if self.weights is None and other.weights is None:
+            return True
+        return bool(np.array_equal(self.to_weights(), other.to_weights()))
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return f"Range({len(self)} combos)"
+
+
+if __name__ == "__main__":
+    from ranges import PREFLOP_BET_RANGES
+
+    open_raise = PREFLOP_BET_RANGES["CO"]["open_raise"]
+    co_range = Range.from_notations(open_raise["pairs"] + open_raise["suited"] + open_raise["offsuit"])
+    live = co_range.remove_dead(["A♠", "K♦", "Q♠", "7♠", "2♥"])
+    print(f"CO open: {co_range}, live after dead cards: {live}")
+
+    compact = parse_range("22+, A2s+, K8s+, Q8s+, J8s+, T8s+, 96s+, 86s+, 75s+, 65s, A8o+, K9o+, Q9o+, J9o+, T9o, 98o")
+    print(f"Compact CO open: {compact}, same as the list: {compact == co_range}")
+    print(f"Weighted: {parse_range('QQ+, AKs, AKo:0.5').to_weights().sum()} combos")
@@ -0,0 +1,381 @@
+"""
+SQLite hand-history database with running player statistics.
+
+Hands recorded by history.HandRecorder are ingested in bulk transactions.
+Every hand is stored once (with its raw record, so it can be replayed) and
+indexed per player by position, hole-card class and the last street the
+player reached. Preflop and flop tendencies are kept as running counters in a
+small player_stats table, one row per player and position, updated on insert:
+
+- VPIP: put chips in voluntarily preflop (any call other than a free check, or a raise)
+- PFR: raised preflop
+- 3-bet: re-raised when facing exactly one raise, out of the times it was possible
+- c-bet: as the last preflop raiser, bet the flop when checked to, out of the times it was possible
+
+Statistics are read from the counters, never by rescanning hands, so they
+stay instant however many hands are stored. assistant.get_updated_ranges uses
+them to narrow opponent ranges to the hands a player actually plays.
+"""
+import json
+import sqlite3
+
+import numpy as np
+
+from assistant import classify_hand, determine_position
+from preflop_equity import CLASS_COMBOS, CLASS_INDEX, CLASS_NAMES, get_table
+from ranges import PREFLOP_BET_RANGES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hands (
+    id INTEGER PRIMARY KEY,
+    hand_number INTEGER,
+    num_players INTEGER,
+    dealer INTEGER,
+    big_blind INTEGER,
+    pot INTEGER,
+    record TEXT
+);
+CREATE TABLE IF NOT EXISTS hand_players (
+    hand_id INTEGER,
+    seat INTEGER,
+    player TEXT,
+    position TEXT,
+    hole_class TEXT,
+    last_street INTEGER,
+    net INTEGER,
+    vpip INTEGER,
+    pfr INTEGER,
+    three_bet INTEGER,
+    cbet INTEGER,
+    PRIMARY KEY (hand_id, seat)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hand_players_player ON hand_players (player, position);
+CREATE INDEX IF NOT EXISTS hand_players_class ON hand_players (hole_class);
+CREATE INDEX IF NOT EXISTS hand_players_street ON hand_players (last_street);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player TEXT,
+    position TEXT,
+    hands INTEGER,
+    vpip INTEGER,
+    pfr INTEGER,
+    three_bet_opportunities INTEGER,
+    three_bets INTEGER,
+    cbet_opportunities INTEGER,
+    cbets INTEGER,
+    net INTEGER,
+    PRIMARY KEY (player, position)
+) WITHOUT ROWID;
+"""
+
+STAT_COLUMNS = ("hands", "vpip", "pfr", "three_bet_opportunities", "three_bets", "cbet_opportunities", "cbets", "net")
+
+UPSERT_STATS = f"""
+INSERT INTO player_stats (player, position, {", ".join(STAT_COLUMNS)}) VALUES (?, ?, {", ".join("?" * len(STAT_COLUMNS))})
+ON CONFLICT (player, position) DO UPDATE SET {", ".join(f"{c} = {c} + excluded.{c}" for c in STAT_COLUMNS)}
+"""
+
+
+def hand_pot(hand):
+    """
+    Returns the chips put in the pot during a recorded hand: the blinds and every call and raise,
+    capped by the stacks of the players.
+    """
+    num_players = len(hand["players"])
+    small_blind, big_blind = hand["blinds"]
+    put_in = [0] * num_players
+    put_in[(hand["dealer"] + 1) % num_players] += small_blind
+    put_in[(hand["dealer"] + 2) % num_players] += big_blind
+    for street_actions in hand["actions"]:
+        for seat, code, *amount in street_actions:
+            if amount:
+                put_in[seat] += amount[0]
+    return sum(min(chips, stack) for chips, stack in zip(put_in, hand["stacks"]))
+
+
+def hand_player_stats(hand):
+    """
+    Derives the per-player statistics of a recorded hand.
+
+    :param hand: Hand dictionary (see history.py)
+    :return: List with, per seat, a dictionary of position, hole_class, last_street, net and the
+             vpip / pfr / three_bet / cbet flags (three_bet and cbet are None without the opportunity)
+    """
+    num_players = len(hand["players"])
+    actions = hand["actions"]
+    stats = [{
+        "position": determine_position((seat - hand["dealer"]) % num_players, num_players),
+        "hole_class": classify_hand(cards) if len(cards) == 2 else None,
+        "last_street": len(actions) - 1,
+        "net": hand["net"][seat],
+        "vpip": False, "pfr": False, "three_bet": None, "cbet": None,
+    } for seat, cards in enumerate(hand["hole"])]
+
+    raises = 0
+    aggressor = None
+    for seat, code, *amount in actions[0]:
+        player = stats[seat]
+        if raises == 1 and seat != aggressor and player["three_bet"] is None:
+            player["three_bet"] = code == "r"
+        if code == "r":
+            player["vpip"] = player["pfr"] = True
+            raises += 1
+            aggressor = seat
+        elif code == "c" and amount and amount[0]:
+            player["vpip"] = True
+
+    for street, street_actions in enumerate(actions):
+        for seat, code, *_ in street_actions:
+            if code == "f":
+                stats[seat]["last_street"] = street
+
+    if aggressor is not None and len(actions) > 1 and stats[aggressor]["last_street"] > 0:
+        for seat, code, *_ in actions[1]:
+            if seat == aggressor:
+                stats[aggressor]["cbet"] = code == "r"
+                break
+            if code == "r":
+                break  # Someone bet into the preflop raiser: no c-bet opportunity
+    return stats
+
+
+def _notation_order():
+    """
+    Orders the 169 hand classes from strongest to weakest.
+
+    Uses the all-in equity against a random hand when the preflop equity table is built,
+    otherwise how many of the preflop charts play each hand.
+    """
+    table = get_table()
+    if table is not None:
+        counts = np.asarray(table.counts, dtype=np.float64)
+        strength = (counts * table.equities).sum(axis=1) / counts.sum(axis=1)
+    else:
+        strength = np.zeros(len(CLASS_NAMES))
+        for rules in PREFLOP_BET_RANGES.values():
+            open_raise = rules.get("open_raise", {})
+            for notations in (open_raise.get("pairs", []) + open_raise.get("suited", []) + open_raise.get("offsuit", []),
+                              rules.get("3bet_vs_raise", []), rules.get("call_vs_raise", [])):
+                for index, name in enumerate(CLASS_NAMES):
+                    strength[index] += name in notations
+        # Break ties by card ranks: the grid index puts higher ranks first
+        strength -= np.arange(len(CLASS_NAMES)) * 1e-6
+    return [CLASS_NAMES[index] for index in np.argsort(-strength, kind="stable")]
+
+
+_order = None
+
+
+def frequency_range(lower, upper):
+    """
+    Returns the hands between two frequencies of the strongest-first hand order
+    (e.g., 0 to 0.2 is the top 20% of combos).
+
+    :param lower: Share of combos above the range, between 0 and 1
+    :param upper: Share of combos up to the end of the range, between 0 and 1
+    :return: List of hand notations
+    """
+    global _order
+    if _order is None:
+        _order = _notation_order()
+    total = sum(len(combos) for combos in CLASS_COMBOS)
+    notations = []
+    cumulative = 0
+    for name in _order:
+        size = len(CLASS_COMBOS[CLASS_INDEX[name]])
+        # A class belongs to the range when most of its combos fall inside it
+        middle = (cumulative + size / 2) / total
+        if lower <= middle < upper:
+            notations.append(name)
+        cumulative += size
+    return notations
+
+
+class HandDatabase:
+    """
+    SQLite store of recorded hands with incremental player statistics.
+    """
+
+    def __init__(self, path=":memory:"):
+        """
+        :param path: Database file (created if needed), or ":memory:"
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def insert_hands(self, hands):
+        """
+        Stores hands and updates the player statistics, in a single transaction.
+
+        :param hands: Iterable of hand dictionaries (see history.py)
+        :return: Number of hands stored
+        """
+        counters = {}
+        rows = []
+        count = 0
+        with self.connection:
+            cursor = self.connection.cursor()
+            for hand in hands:
+                if "net" not in hand:
+                    continue
+                cursor.execute(
+                    "INSERT INTO hands (hand_number, num_players, dealer, big_blind, pot, record) VALUES (?, ?, ?, ?, ?, ?)",
+                    (hand["hand"], len(hand["players"]), hand["dealer"], hand["blinds"][1],
+                     hand_pot(hand), json.dumps(hand, separators=(",", ":"))),
+                )
+                hand_id = cursor.lastrowid
+                for seat, (name, stats) in enumerate(zip(hand["players"], hand_player_stats(hand))):
+                    rows.append((
+                        hand_id, seat, name, stats["position"], stats["hole_class"], stats["last_street"], stats["net"],
+                        stats["vpip"], stats["pfr"], stats["three_bet"], stats["cbet"],
+                    ))
+                    counter = counters.setdefault((name, stats["position"]), [0] * len(STAT_COLUMNS))
+                    counter[0] += 1
+                    counter[1] += stats["vpip"]
+                    counter[2] += stats["pfr"]
+                    counter[3] += stats["three_bet"] is not None
+                    counter[4] += bool(stats["three_bet"])
+                    counter[5] += stats["cbet"] is not None
+                    counter[6] += bool(stats["cbet"])
+                    counter[7] += stats["net"]
+                count += 1
+            cursor.executemany("INSERT INTO hand_players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            cursor.executemany(UPSERT_STATS, [(*key, *values) for key, values in counters.items()])
+        return count
+
+    def ingest(self, path, batch_size=10000):
+        """
+        Loads a hand history file written by HandRecorder, one transaction per batch.
+
+        :param path: Hand history file
+        :param batch_size: Number of hands per transaction
+        :return: Number of hands stored
+        """
+        from history import read_hands
+
+        batch = []
+        count = 0
+        for hand in read_hands(path):
+            batch.append(hand)
+            if len(batch) >= batch_size:
+                count += self.insert_hands(batch)
+                batch = []
+        return count + self.insert_hands(batch)
+
+    def player_stats(self, player, position=None):
+        """
+        Returns the running statistics of a player, overall or at one position.
+
+        :param player: Player name
+        :param position: Optional position name (e.g., "BTN")
+        :return: Dictionary with the number of hands, the vpip, pfr, three_bet and cbet frequencies
+                 (None without any opportunity) and the net chips, or None if the player has no hands
+        """
+        query = f"SELECT {', '.join(f'SUM({c})' for c in STAT_COLUMNS)} FROM player_stats WHERE player = ?"
+        params = [player]
+        if position is not None:
+            query += " AND position = ?"
+            params.append(position)
+        hands, vpip, pfr, three_bet_opportunities, three_bets, cbet_opportunities, cbets, net = \
+            self.connection.execute(query, params).fetchone()
+        if not hands:
+            return None
+        return {
+            "hands": hands,
+            "vpip": vpip / hands,
+            "pfr": pfr / hands,
+            "three_bet": three_bets / three_bet_opportunities if three_bet_opportunities else None,
+            "cbet": cbets / cbet_opportunities if cbet_opportunities else None,
+            "net": net,
+        }
+
+    def find_hands(self, player=None, position=None, hole_class=None, street=None, limit=None):
+        """
+        Finds stored hands through the indexes.
+
+        :param player: Optional player name
+        :param position: Optional position name of that player
+        :param hole_class: Optional hole-card class (e.g., "AKs")
+        :param street: Optional street the player reached (0 preflop to 3 river)
+        :param limit: Optional maximum number of hands
+        :return: List of hand dictionaries
+        """
+        conditions, params = [], []
+        for column, value in (("player", player), ("position", position), ("hole_class", hole_class)):
+            if value is not None:
+                conditions.append(f"hp.{column} = ?")
+                params.append(value)
+        if street is not None:
+            conditions.append("hp.last_street >= ?")
+            params.append(street)
+        query = "SELECT DISTINCT h.id, h.record FROM hand_players hp JOIN hands h ON h.id = hp.hand_id"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY h.id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return [json.loads(record) for _, record in self.connection.execute(query, params)]
+
+    def observed_range(self, player, position, action, min_hands=50):
+        """
+        Narrows a player's preflop range from their observed frequencies.
+
+        :param player: Player name
+        :param position: Position name; the player's overall stats are used with too few hands there
+        :param action: Preflop action of the player: "raise", "three_bet", "call" or "check"
+        :param min_hands: Minimum number of hands before the stats are trusted
+        :return: List of hand notations, or None if the player has too few hands
+        """
+        stats = self.player_stats(player, position)
+        if stats is None or stats["hands"] < min_hands:
+            stats = self.player_stats(player)
+        if stats is None or stats["hands"] < min_hands:
+            return None
+
+        if action == "three_bet" and stats["three_bet"] is not None:
+            # 3-bets are a share of the times facing a raise, i.e. roughly of the hands not folded
+            return frequency_range(0, stats["three_bet"] * stats["vpip"])
+        if action in ("raise", "three_bet"):
+            return frequency_range(0, stats["pfr"])
+        if action == "call":
+            return frequency_range(stats["pfr"], stats["vpip"])
+        return frequency_range(stats["pfr"], 1)
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    from game import Game
+    from history import HandRecorder
+    from strategies import RandomStrategy, RangeStrategy
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "hands.jsonl")
+    names = ["Anne", "Benoît", "Claire", "Denis", "Elodie", "François"]
+    strategies = {name: RangeStrategy() if i % 2 else RandomStrategy(rng=i) for i, name in enumerate(names)}
+    with HandRecorder(path) as recorder:
+        game = Game(names, [20000] * len(names), rng=42, strategies=strategies, recorder=recorder)
+        for _ in range(20000):
+            for player in game.players:
+                player.stack = 20000
+            game.play_hand()
+
+    database = HandDatabase(os.path.join(directory, "hands.db"))
+    start = time.perf_counter()
+    count = database.ingest(path)
+    print(f"Ingested {count} hands in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    for name in names:
+        stats = database.player_stats(name)
+        print(f"{name:>9}: VPIP {stats['vpip']:.0%}, PFR {stats['pfr']:.0%}, 3-bet {stats['three_bet'] or 0:.0%}, "
+              f"c-bet {stats['cbet'] or 0:.0%} over {stats['hands']} hands")
+    print(f"Stats queries in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Observed UTG opening range of Anne: {database.observed_range('Anne', 'UTG', 'raise')}")
+    print(f"Hands where Benoît held AKs: {len(database.find_hands(player='Benoît', hole_class='AKs'))}")
@@ -0,0 +1,292 @@
+"""
+Streaming hand histories: a recorder fed by the engine events and a replay engine.
+
+Every hand is one line of compact JSON, with cards as integer codes (see
+cards.py) and actions as ``[seat, "f" | "c" | "r", amount]`` per street:
+
+    {"hand":1,"players":["A","B","C"],"stacks":[1000,1000,1000],"dealer":0,"blinds":[100,200],
+     "hole":[[48,45],[12,8],[30,31]],"board":[51,0,22,40,3],
+     "actions":[[[0,"r",400],[1,"c",300],[2,"f"]],[[1,"c",0],[0,"c",0]],...],"net":[500,-400,-100]}
+
+The recorder subscribes to the events of the game (see events.py). Records
+are buffered in memory and appended to the file every flush_every hands or,
+from a timer, flush_interval seconds after the oldest buffered hand
+finished, so recording costs a few list appends per action. Reading back is
+one json.loads per line, and replay_hands streams the records through Game and BettingRound (headless,
+with the recorded cards and decisions) to rebuild and check every hand.
+"""
+import json
+import threading
+
+from deck import Deck
+from events import ActionTaken, CommunityCardsDealt, HandEnded, HandStarted
+from game import Game
+from strategies import Strategy
+
+ACTION_CODES = {"fold": "f", "call": "c", "raise": "r"}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+STREET_BY_BOARD_SIZE = {0: 0, 3: 1, 4: 2, 5: 3}
+
+
+class HandRecording:
+    """
+    Record of the hand in progress at one table, built from the events of its game.
+
+    HandRecorder keeps one for the game it records. A server that rebuilds its games between requests
+    keeps the record of each table with the table instead, and gives it to a new HandRecording on every
+    request (see app.py).
+    """
+
+    def __init__(self, on_finish, hand=None):
+        """
+        :param on_finish: Called with the JSON line of every finished hand
+        :param hand: Record of a hand in progress, as left in hand by an earlier recording of the same table
+        """
+        self.on_finish = on_finish
+        self.hand = hand
+
+    def subscribe(self, events):
+        """
+        Records the hands announced on an EventBus.
+        """
+        events.subscribe(self.start_hand, HandStarted)
+        events.subscribe(self.action, ActionTaken)
+        events.subscribe(self.deal, CommunityCardsDealt)
+        events.subscribe(self.end_hand, HandEnded)
+
+    def unsubscribe(self, events):
+        for handler in (self.start_hand, self.action, self.deal, self.end_hand):
+            events.unsubscribe(handler)
+
+    def start_hand(self, event):
+        """
+        Opens the record of a hand once the blinds are posted and the hole cards dealt.
+        """
+        if self.hand is not None:
+            # The previous hand was never closed (interactive games): it ended with these stacks
+            self._finish(event.stacks)
+        self.hand = {
+            "hand": event.hand_number,
+            "players": list(event.players),
+            "stacks": list(event.stacks),
+            "dealer": event.dealer,
+            "blinds": [event.small_blind, event.big_blind],
+            "hole": [[int(card) for card in cards] for cards in event.hole_cards],
+            "board": [],
+            "actions": [[]],
+        }
+
+    def action(self, event):
+        """
+        Records an action of the current street.
+        """
+        if self.hand is None:
+            return
+        code = ACTION_CODES[event.action]
+        self.hand["actions"][-1].append([event.seat, code] if code == "f" else [event.seat, code, event.amount])
+
+    def deal(self, event):
+        """
+        Records community cards and opens the actions of the next street.
+        """
+        if self.hand is None:
+            return
+        self.hand["board"].extend(int(card) for card in event.cards)
+        while len(self.hand["actions"]) <= STREET_BY_BOARD_SIZE[len(self.hand["board"])]:
+            self.hand["actions"].append([])
+
+    def end_hand(self, event):
+        """
+        Closes the record of the current hand with the final stacks.
+        """
+        if self.hand is not None:
+            self._finish(event.stacks)
+
+    def _finish(self, final_stacks):
+        hand, self.hand = self.hand, None
+        hand["net"] = [final - start for final, start in zip(final_stacks, hand["stacks"])]
+        self.on_finish(json.dumps(hand, separators=(",", ":")))
+
+
+class HandRecorder:
+    """
+    Appends every hand of a Game to a line-delimited JSON hand history.
+
+    Pass it to Game(..., recorder=...), or subscribe it to any EventBus (see events.py).
+    Several processes can append to the same file, since every write appends a batch of whole lines.
+    """
+
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        """
+        :param path: File the hands are appended to
+        :param flush_every: Number of buffered hands that triggers a write
+        :param flush_interval: Maximum number of seconds a finished hand stays in the buffer (None to only
+                               write every flush_every hands and on flush or close)
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._file = open(path, "ab", buffering=0)  # Unbuffered: every write appends whole lines in one call
+        self._buffer = []
+        self._timer = None  # Pending write of the buffered hands
+        self._lock = threading.Lock()
+        self._recording = HandRecording(self.write_line)
+
+    def subscribe(self, events):
+        """
+        Records the hands announced on an EventBus.
+        """
+        self._recording.subscribe(events)
+
+    def write_line(self, line):
+        """
+        Buffers the JSON line of a finished hand (see HandRecording).
+        """
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._write()
+            elif self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _write(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file.closed:
+            return  # A timer that fired while the recorder was being closed
+        if self._buffer:
+            self._file.write(("\n".join(self._buffer) + "\n").encode("utf-8"))
+            self._buffer.clear()
+
+    def flush(self):
+        """
+        Writes the buffered hands to the file.
+        """
+        with self._lock:
+            self._write()
+
+    def close(self):
+        """
+        Writes the buffered hands and closes the file (a hand still in progress is dropped).
+        """
+        with self._lock:  # A timer firing meanwhile waits, then finds the file closed
+            self._write()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_hands(path):
+    """
+    Streams the records of a hand history.
+
+    :param path: Hand history file written by HandRecorder
+    :return: Generator of hand dictionaries
+    """
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayStrategy(Strategy):
+    """
+    Replays the recorded decisions of a hand, in order.
+    """
+
+    def __init__(self, hand):
+        self.actions = iter([action for street in hand["actions"] for action in street])
+
+    def choose_action(self, valid_actions, player=None, game=None):
+        seat, code, *amount = next(self.actions)
+        if seat != player.position:
+            raise ValueError(f"Replay expected seat {seat} to act, not seat {player.position}")
+        return ACTION_NAMES[code], amount[0] if amount else None
+
+
+class _ScriptedDeck(Deck):
+    """
+    Deck whose shuffles put the recorded cards on top, in dealing order.
+    """
+
+    def __init__(self, cards):
+        self.script = cards
+        super().__init__()
+
+    def shuffle(self, num_cards=None):
+        super().shuffle(num_cards)
+        for offset, card in enumerate(self.script):
+            self._swap(self._top + offset, self._position[card])
+
+
+def replay_hand(hand, verify=True):
+    """
+    Plays a recorded hand again through Game and BettingRound, without the frontend.
+
+    :param hand: Hand dictionary, as returned by read_hands
+    :param verify: Whether to check the replayed result against the recorded one
+    :return: Result of Game.play_hand_old
+    :raises ValueError: If the replay diverges from the record
+    """
+    game = Game(hand["players"], hand["stacks"], strategies=ReplayStrategy(hand), verbose=False)
+    game.small_blind, game.big_blind = hand["blinds"]
+    game.dealer_position = hand["dealer"]
+    game.hand_number = hand["hand"] - 1
+    game.deck = _ScriptedDeck([card for cards in hand["hole"] for card in cards] + hand["board"])
+    result = game.play_hand()
+    if verify and result["net"] != hand["net"]:
+        raise ValueError(f"Replay of hand {hand['hand']} diverged: {result['net']} != {hand['net']}")
+    return result
+
+
+def replay_hands(path, verify=True):
+    """
+    Streams a hand history back through the engine.
+
+    Hands recorded without every hole card (interactive games, where only the user's cards are
+    known) cannot be replayed and are skipped.
+
+    :param path: Hand history file written by HandRecorder
+    :param verify: Whether to check every replayed result against the record
+    :return: Generator of (hand dictionary, Game.play_hand_old result) tuples
+    """
+    for hand in read_hands(path):
+        if all(len(cards) == 2 for cards in hand["hole"]):
+            yield hand, replay_hand(hand, verify)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    from strategies import RandomStrategy, RangeStrategy
+
+    path = os.path.join(tempfile.mkdtemp(), "hands.jsonl")
+    names = ["Anne", "Benoît", "Claire", "Denis", "Elodie", "François"]
+    strategies = {name: RangeStrategy() if i % 2 else RandomStrategy(rng=i) for i, name in enumerate(names)}
+
+    with HandRecorder(path) as recorder:
+        game = Game(names, [20000] * len(names), rng=42, strategies=strategies, recorder=recorder)
+        start = time.perf_counter()
+        for _ in range(2000):
+            for player in game.players:
+                player.stack = 20000
+            game.play_hand()
+        print(f"Recorded {game.hand_number} hands in {time.perf_counter() - start:.2f} s "
+              f"({os.path.getsize(path) / 1024:.0f} kB)")
+
+    start = time.perf_counter()
+    hands = sum(1 for _ in read_hands(path))
+    print(f"Read {hands} hands in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    replayed = sum(1 for _ in replay_hands(path))
+    print(f"Replayed and verified {replayed} hands in {time.perf_counter() - start:.2f} s")
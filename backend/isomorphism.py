@@ -0,0 +1,67 @@
+"""
+Suit-isomorphism canonicalization.
+
+Two spots that only differ by a permutation of suits (e.g. A♠K♠ on a ♠♠♥ flop
+and A♥K♥ on a ♥♥♠ flop) have the same strengths, outs and equities. The
+canonical form relabels suits so that both spots produce the same key, which
+lets results be shared across them.
+"""
+from lookup_evaluator import card_to_code
+
+
+def canonicalize(*groups):
+    """
+    Maps groups of cards (e.g. hole cards, board) to a suit-normalized key.
+
+    Suits are ordered by their per-group rank masks, so suits playing the same
+    role in every group are interchangeable and any order among them yields the
+    same key.
+
+    :param groups: Lists of cards (strings or integer codes)
+    :return: Tuple (key, suit_map) where key is a tuple of sorted canonical code tuples (one per group)
+             and suit_map[original_suit] is the canonical suit
+    """
+    code_groups = [[card_to_code(card) for card in group] for group in groups]
+
+    signatures = [[0] * len(code_groups) for _ in range(4)]
+    for index, codes in enumerate(code_groups):
+        for code in codes:
+            signatures[code & 3][index] |= 1 << (code >> 2)
+
+    order = sorted(range(4), key=lambda suit: signatures[suit], reverse=True)
+    suit_map = [0] * 4
+    for canonical_suit, suit in enumerate(order):
+        suit_map[suit] = canonical_suit
+
+    key = tuple(
+        tuple(sorted((code & ~3) | suit_map[code & 3] for code in codes))
+        for codes in code_groups
+    )
+    return key, suit_map
+
+
+def invert_suit_map(suit_map):
+    """
+    Returns the mapping from canonical suits back to the original suits.
+    """
+    inverse = [0] * 4
+    for suit, canonical_suit in enumerate(suit_map):
+        inverse[canonical_suit] = suit
+    return inverse
+
+
+def remap_codes(codes, suit_map):
+    """
+    Applies a suit mapping to card codes.
+
+    :param codes: Iterable of integer card codes
+    :param suit_map: suit_map[suit] is the suit to use instead
+    :return: List of remapped codes
+    """
+    return [(code & ~3) | suit_map[code & 3] for code in codes]
+
+
+if __name__ == "__main__":
+    key_a, _ = canonicalize(["A♠", "K♠"], ["Q♠", "7♠", "2♥"])
+    key_b, _ = canonicalize(["A♥", "K♥"], ["Q♥", "7♥", "2♠"])
+    print(key_a, key_a == key_b)
@@ -0,0 +1,297 @@
+"""
+Lookup-table hand evaluator working on integer card codes.
+
+A card code is ``rank * 4 + suit`` where rank goes from 0 ("2") to 12 ("A")
+and suit follows HandEvaluator.SUIT_LETTERS (0 = s, 1 = h, 2 = d, 3 = c).
+
+Every card is mapped to a single additive key that packs three fields:
+
+- bits 0-51: one bit per card (13 bits per suit), used to read flush ranks
+- bits 52-67: one 4-bit counter per suit, used to detect flushes
+- bits 68+: a base-5 rank count key, used to look up non-flush hands
+
+Summing the keys of 5, 6 or 7 cards gives the key of the hand, so a board
+key can be computed once and extended with hole cards (or turn/river cards)
+by a single addition. Evaluating a key costs one flush test and one table
+lookup. Strengths are plain integers: higher is better.
+"""
+from cards import CARDS, RANK_INDEX, RANKS, SUIT_INDEX, SUIT_SYMBOLS, SUITS, to_card
+
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+CATEGORY_NAMES = [
+    "High Card",
+    "One Pair",
+    "Two Pair",
+    "Three of a Kind",
+    "Straight",
+    "Flush",
+    "Full House",
+    "Four of a Kind",
+    "Straight Flush",
+]
+
+SUIT_COUNT_SHIFT = 52
+RANK_KEY_SHIFT = 68
+FLUSH_PROBE = 0x3333  # adding 3 to a suit counter sets its high bit once it reaches 5
+FLUSH_CHECK = 0x8888
+
+WHEEL_MASK = (1 << 12) | 0b1111
+
+
+def card_to_code(card):
+    """
+    Converts a card into its integer code.
+
+    :param card: Card, card string with a suit symbol or letter (e.g., "A♠", "Td", "10♣") or an integer code
+    :return: Interned Card, whose integer value is the code (0 to 51)
+    """
+    return to_card(card)
+
+
+def code_to_card(code):
+    """
+    Converts an integer code back into its interned Card.
+
+    :param code: Integer code between 0 and 51
+    :return: Card (str() gives e.g. "A♠")
+    """
+    return CARDS[code]
+
+
+def _pack(category, ranks):
+    """
+    Packs a hand category and its 5 ranks (by order of significance) into a strength.
+    """
+    strength = category
+    for rank in ranks:
+        strength = (strength << 4) | rank
+    return strength
+
+
+def straight_high(mask):
+    """
+    Returns the top rank of the best straight in a 13-bit rank mask, or -1.
+    """
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        if mask & window == window:
+            return top
+    if mask & WHEEL_MASK == WHEEL_MASK:
+        return 3
+    return -1
+
+
+def _straight_ranks(top):
+    if top == 3:
+        return [3, 2, 1, 0, 12]
+    return [top, top - 1, top - 2, top - 3, top - 4]
+
+
+def _score_flush_mask(mask):
+    """
+    Scores the best flush or straight flush contained in a single-suit rank mask.
+    """
+    top = straight_high(mask)
+    if top >= 0:
+        return _pack(STRAIGHT_FLUSH, _straight_ranks(top))
+    ranks = [r for r in range(12, -1, -1) if mask >> r & 1][:5]
+    return _pack(FLUSH, ranks)
+
+
+def _score_counts(counts):
+    """
+    Scores the best non-flush 5-card hand from per-rank card counts.
+    """
+    by_count = {4: [], 3: [], 2: [], 1: []}
+    mask = 0
+    for rank in range(12, -1, -1):
+        count = counts[rank]
+        if count:
+            by_count[count].append(rank)
+            mask |= 1 << rank
+
+    quads, trips, pairs, singles = by_count[4], by_count[3], by_count[2], by_count[1]
+
+    if quads:
+        quad = quads[0]
+        kicker = max(r for r in range(13) if counts[r] and r != quad)
+        return _pack(FOUR_OF_A_KIND, [quad] * 4 + [kicker])
+
+    if trips and (len(trips) > 1 or pairs):
+        trip = trips[0]
+        pair = max(trips[1:] + pairs)
+        return _pack(FULL_HOUSE, [trip] * 3 + [pair] * 2)
+
+    top = straight_high(mask)
+    if top >= 0:
+        return _pack(STRAIGHT, _straight_ranks(top))
+
+    if trips:
+        trip = trips[0]
+        return _pack(THREE_OF_A_KIND, [trip] * 3 + singles[:2])
+
+    if len(pairs) >= 2:
+        high, low = pairs[0], pairs[1]
+        kicker = max(pairs[2:] + singles)
+        return _pack(TWO_PAIR, [high, high, low, low, kicker])
+
+    if pairs:
+        pair = pairs[0]
+        return _pack(ONE_PAIR, [pair, pair] + singles[:3])
+
+    return _pack(HIGH_CARD, singles[:5])
+
+
+def _build_flush_table():
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            table[mask] = _score_flush_mask(mask)
+    return table
+
+
+def _build_rank_table():
+    """
+    Scores every rank multiset of 5 to 7 cards (at most 4 cards per rank).
+    """
+    table = {}
+    counts = [0] * 13
+
+    def fill(rank, total, key):
+        if rank == 13:
+            if total >= 5:
+                table[key] = _score_counts(counts)
+            return
+        for count in range(min(4, 7 - total) + 1):
+            counts[rank] = count
+            fill(rank + 1, total + count, key + count * 5 ** rank)
+        counts[rank] = 0
+
+    fill(0, 0, 0)
+    return table
+
+
+FLUSH_TABLE = _build_flush_table()
+RANK_TABLE = _build_rank_table()
+
+CARD_KEYS = [
+    (1 << ((code & 3) * 13 + (code >> 2)))
+    | (1 << (SUIT_COUNT_SHIFT + 4 * (code & 3)))
+    | (5 ** (code >> 2) << RANK_KEY_SHIFT)
+    for code in range(52)
+]
+
+
+def hand_key(codes):
+    """
+    Computes the additive key of a set of card codes.
+
+    :param codes: Iterable of integer card codes
+    :return: Integer key that can be extended with further cards by addition
+    """
+    key = 0
+    for code in codes:
+        key += CARD_KEYS[code]
+    return key
+
+
+def evaluate_key(key):
+    """
+    Evaluates a hand key built from 5 to 7 cards.
+
+    :param key: Additive key as returned by hand_key
+    :return: Integer strength (higher is better)
+    """
+    flush = ((key >> SUIT_COUNT_SHIFT) + FLUSH_PROBE) & FLUSH_CHECK
+    if flush:
+        suit = (flush.bit_length() >> 2) - 1
+        return FLUSH_TABLE[(key >> (13 * suit)) & 0x1FFF]
+    return RANK_TABLE[key >> RANK_KEY_SHIFT]
+
+
+def evaluate_codes(codes):
+    """
+    Evaluates the best 5-card hand among 5, 6 or 7 card codes.
+
+    :param codes: Iterable of integer card codes
+    :return: Integer strength (higher is better)
+    """
+    key = 0
+    for code in codes:
+        key += CARD_KEYS[code]
+    return evaluate_key(key)
+
+
+def evaluate_cards(cards):
+    """
+    Evaluates the best 5-card hand among 5, 6 or 7 cards.
+
+    :param cards: List of card strings (e.g., ["A♠", "K♦", "T♠", "J♠", "Q♠"])
+    :return: Integer strength (higher is better)
+    """
+    return evaluate_codes(card_to_code(card) for card in cards)
+
+
+def strength_category(strength):
+    """
+    Returns the category index (HIGH_CARD ... STRAIGHT_FLUSH) of a strength.
+    """
+    return strength >> 20
+
+
+def strength_ranks(strength):
+    """
+    Returns the 5 ranks of a strength, by order of significance.
+    """
+    return [(strength >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]
+
+
+def strength_name(strength):
+    """
+    Returns the hand rank name of a strength, as used by HandEvaluator.HAND_RANKINGS.
+    """
+    category = strength_category(strength)
+    if category == STRAIGHT_FLUSH and strength_ranks(strength)[0] == 12:
+        return "Royal Flush"
+    return CATEGORY_NAMES[category]
+
+
+def best_five_codes(codes, strength):
+    """
+    Picks the 5 cards that make up a given strength.
+
+    :param codes: Card codes the strength was computed from
+    :param strength: Strength as returned by evaluate_codes
+    :return: List of 5 card codes, by order of significance
+    """
+    codes = list(codes)
+    ranks = strength_ranks(strength)
+    if strength_category(strength) in (FLUSH, STRAIGHT_FLUSH):
+        suit_counts = [0] * 4
+        for code in codes:
+            suit_counts[code & 3] += 1
+        suit = suit_counts.index(max(suit_counts))
+        codes = [code for code in codes if code & 3 == suit]
+
+    best = []
+    for rank in ranks:
+        code = next(c for c in codes if c >> 2 == rank and c not in best)
+        best.append(code)
+    return best
+
+
+if __name__ == "__main__":
+    hand = ["A♠", "K♦", "T♠", "J♠", "Q♠", "9♠", "2♣"]
+    strength = evaluate_cards(hand)
+    best = [code_to_card(c) for c in best_five_codes([card_to_code(c) for c in hand], strength)]
+    print(f"{hand}: {strength_name(strength)} {best} (strength {strength})")
+    print(f"{len(RANK_TABLE)} rank entries, {len(FLUSH_TABLE)} flush entries")
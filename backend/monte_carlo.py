@@ -0,0 +1,210 @@
+"""
+Monte Carlo equity estimation for multiway spots and wide ranges.
+
+Sampling runs in batches across a ProcessPoolExecutor. Every batch gets its own
+stream spawned from a single SeedSequence (see rng.py), so workers never share
+RNG state and batch i of a given seed always holds the same samples. Within a
+batch, runouts are dealt and evaluated as arrays. Batches are merged in order,
+and sampling stops as soon as the confidence interval on the equity is
+narrower than the requested tolerance, max_batches were merged, or the time
+budget runs out.
+
+Only the time budget depends on timing: with time_budget=None the result is a
+deterministic function of the seed (the same batches are merged in the same
+order, in-process or with any number of workers). With a time budget, how many
+batches make it before the deadline varies from run to run, so the estimate
+does too. At most one batch per worker is in flight, and the batches still
+running at the deadline are waited for (not merged) so they do not keep the
+workers busy into the next call.
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from lookup_evaluator import card_to_code
+from rng import deal_boards, make_rng, seed_sequence
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers):
+    """
+    Returns a process pool shared across calls, so workers are only started once.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+            _executor_workers = max_workers
+        return _executor
+
+
+def _to_codes(opponent):
+    """
+    Normalizes an opponent (a combo or a list of combos) into a list of code tuples.
+    """
+    if opponent and isinstance(opponent[0], (list, tuple)):
+        return [tuple(card_to_code(card) for card in combo) for combo in opponent]
+    return [tuple(card_to_code(card) for card in opponent)]
+
+
+def _run_batch(hero, board, opponents, samples, seed_sequence):
+    """
+    Plays a batch of random runouts and returns the sum and sum of squares of hero's pot share.
+
+    Opponent combos and runouts are all drawn up front (one runout per sample, see
+    rng.deal_boards) and evaluated as arrays. Samples where two opponents or an
+    opponent and the runout share a card are rejected, which keeps every
+    accepted sample uniform over the compatible deals.
+
+    :param hero: Tuple of hero's card codes
+    :param board: Tuple of known board card codes
+    :param opponents: List of opponents, each a list of candidate combos (tuples of codes)
+    :param samples: Number of runouts to sample
+    :param seed_sequence: numpy SeedSequence owned by this batch
+    :return: Tuple (sum of shares, sum of squared shares, number of valid samples)
+    """
+    rng = make_rng(seed_sequence)
+    known = set(hero) | set(board)
+    candidates = [
+        np.array([combo for combo in combos if combo[0] not in known and combo[1] not in known], dtype=np.intp)
+        for combos in opponents
+    ]
+    if any(len(combos) == 0 for combos in candidates):
+        return 0.0, 0.0, 0
+
+    live = np.array([code for code in range(52) if code not in known], dtype=np.intp)
+    runouts = deal_boards(rng, live, samples, 5 - len(board))
+    hands = [combos[rng.integers(len(combos), size=samples)] for combos in candidates]
+
+    dealt = np.sort(np.concatenate(hands + [runouts], axis=1), axis=1)
+    valid = (dealt[:, 1:] != dealt[:, :-1]).all(axis=1)
+    if not valid.any():
+        return 0.0, 0.0, 0
+
+    boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.intp), (samples, len(board))), runouts], axis=1)[valid]
+    hero_scores = evaluate_batch(np.concatenate([np.broadcast_to(np.array(hero, dtype=np.intp), (len(boards), 2)), boards], axis=1))
+    opponent_scores = np.stack([evaluate_batch(np.concatenate([hand[valid], boards], axis=1)) for hand in hands])
+
+    best = opponent_scores.max(axis=0)
+    tied = (opponent_scores == hero_scores).sum(axis=0)
+    shares = np.where(hero_scores > best, 1.0, np.where(hero_scores == best, 1.0 / (1 + tied), 0.0))
+    return float(shares.sum()), float((shares * shares).sum()), int(len(shares))
+
+
+def _summary(total, total_sq, count, elapsed, converged):
+    if count == 0:
+        return {"equity": 0.0, "std_error": None, "samples": 0, "elapsed": elapsed, "converged": False}
+    mean = total / count
+    variance = max(total_sq / count - mean * mean, 0.0)
+    std_error = math.sqrt(variance / count) if count > 1 else None
+    return {
+        "equity": mean,
+        "std_error": std_error,
+        "samples": count,
+        "elapsed": elapsed,
+        "converged": converged,
+    }
+
+
+def monte_carlo_equity(hero_hand, board, opponents, tolerance=0.005, time_budget=1.0,
+                       batch_size=2000, max_workers=None, seed=None, z_score=1.96, min_samples=2000,
+                       max_batches=None):
+    """
+    Estimates hero's equity (share of the pot) against one or more opponents.
+
+    :param hero_hand: Hero's hole cards (2 cards)
+    :param board: Known community cards (0 to 5 cards)
+    :param opponents: List of opponents, each either a combo (2 cards) or a range (list of combos)
+    :param tolerance: Stop once the half-width of the confidence interval is below this value
+    :param time_budget: Maximum wall-clock time in seconds, or None to stop on tolerance and max_batches only
+                        (the result is then reproducible for a given seed)
+    :param batch_size: Number of samples per batch sent to a worker
+    :param max_workers: Number of worker processes (defaults to the CPU count, 0 runs in-process)
+    :param seed: Optional seed (integer, SeedSequence or numpy Generator) to make the batch streams reproducible
+    :param z_score: z-score of the confidence interval (1.96 for 95%)
+    :param min_samples: Minimum number of samples before the tolerance is checked
+    :param max_batches: Maximum number of batches to merge (required when time_budget is None)
+    :return: Dictionary with equity, std_error, samples, elapsed time and whether the tolerance was met
+    """
+    if time_budget is None and max_batches is None:
+        raise ValueError("max_batches is required without a time budget")
+    hero = tuple(card_to_code(card) for card in hero_hand)
+    board_codes = tuple(card_to_code(card) for card in board)
+    opponent_codes = [_to_codes(opponent) for opponent in opponents]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    seeds = seed_sequence(seed)
+    start = time.perf_counter()
+    deadline = math.inf if time_budget is None else start + time_budget
+    total = total_sq = 0.0
+    count = 0
+    merged = 0
+
+    def converged():
+        if count < max(min_samples, 2):
+            return False
+        mean = total / count
+        variance = max(total_sq / count - mean * mean, 0.0)
+        return z_score * math.sqrt(variance / count) <= tolerance
+
+    def finished():
+        return converged() or (max_batches is not None and merged >= max_batches)
+
+    if max_workers == 0:
+        while time.perf_counter() < deadline and not finished():
+            batch = _run_batch(hero, board_codes, opponent_codes, batch_size, seeds.spawn(1)[0])
+            total, total_sq, count = total + batch[0], total_sq + batch[1], count + batch[2]
+            merged += 1
+        return _summary(total, total_sq, count, time.perf_counter() - start, converged())
+
+    executor = _get_executor(max_workers)
+    futures = {}  # Batch index to future, for the batches not merged yet
+    submitted = 0
+    try:
+        while not finished():
+            while len(futures) < max_workers and (max_batches is None or submitted < max_batches):
+                futures[submitted] = executor.submit(
+                    _run_batch, hero, board_codes, opponent_codes, batch_size, seeds.spawn(1)[0]
+                )
+                submitted += 1
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            wait([futures[merged]], timeout=None if time_budget is None else remaining)
+            # Merge in batch order, so the stopping point only depends on the seed
+            while merged in futures and futures[merged].done() and not finished():
+                batch = futures.pop(merged).result()
+                total, total_sq, count = total + batch[0], total_sq + batch[1], count + batch[2]
+                merged += 1
+    finally:
+        for future in futures.values():
+            future.cancel()
+        wait(list(futures.values()))  # Free the workers still running a batch
+
+    return _summary(total, total_sq, count, time.perf_counter() - start, converged())
+
+
+if __name__ == "__main__":
+    result = monte_carlo_equity(
+        ["A♠", "K♠"], [],
+        [["Q♦", "Q♣"], [["J♥", "T♥"], ["9♣", "9♦"]]],
+        tolerance=0.002, time_budget=5.0, seed=42,
+    )
+    print(result)
+
+    # Without a time budget, a seed gives the same estimate in-process and with workers
+    for max_workers in (0, None):
+        result = monte_carlo_equity(["A♠", "K♠"], [], [["Q♦", "Q♣"]], tolerance=0.0,
+                                    time_budget=None, max_batches=20, max_workers=max_workers, seed=7)
+        print(f"max_workers={max_workers}: equity {result['equity']:.5f} over {result['samples']} samples")
@@ -1,13 +1,25 @@
-import time
+import threading
+
+from cards import CARDS
+from events import WaitingForAction
+
+
+class GameClosed(Exception):
+    """
+    Raised in a game thread waiting for the frontend when its game is closed.
+    """
+
 
 class Player:
-    def __init__(self, name: str, stack: int, position: int):
+    def __init__(self, name: str, stack: int, position: int, strategy=None, events=None):
         """
         Initializes a poker player.
 
         :param name: The player's name.
         :param stack: The player's starting chip count.
         :param position: The player's seat position (0 = Small Blind, 1 = Big Blind, etc.).
+        :param strategy: Optional strategy object (see strategies.py) deciding instead of the frontend.
+        :param events: Optional EventBus (see events.py) told when the player waits for the frontend.
         """
         self.name = name                # Player's name
         self.stack = stack              # Current chip count
@@ -21,6 +33,10 @@ class Player:
 
         self.pending_action = None  # For frontend interaction
         self.waiting_for_action = False
+        self.action_ready = threading.Event()  # Set when the frontend submits an action
+        self.cancelled = False
+        self.strategy = strategy
+        self.events = events
 
     def receive_cards(self, cards: list):
         """
@@ -58,14 +74,45 @@ class Player:
                     return action, valid_actions.get(action, None)
             print("Invalid action. Try again.")
     
-    def make_decision(self, valid_actions, ai_model=False):
-        if ai_model:
-            return ai_model.choose_action(valid_actions)  # AI chooses the best action
-        
+    def submit_action(self, action, amount):
+        """
+        Hands an action from the frontend to the waiting game thread.
+
+        :param action: Action name (fold, call, raise).
+        :param amount: Amount of chips for call and raise.
+        """
+        self.pending_action = (action, amount)
+        self.action_ready.set()
+
+    def cancel(self):
+        """
+        Wakes up a pending make_decision, which raises GameClosed (e.g., the table was evicted).
+        """
+        self.cancelled = True
+        self.action_ready.set()
+
+    def make_decision(self, valid_actions, ai_model=None, game=None):
+        """
+        Returns the player's action: decided synchronously by a strategy when there is one,
+        otherwise blocks until the frontend submits it.
+
+        :param valid_actions: Dictionary of available actions.
+        :param ai_model: Optional strategy overriding the player's own.
+        :param game: Game being played, passed to the strategy.
+        :return: Tuple (action: str, amount: int or None)
+        :raises GameClosed: If the game is closed while waiting.
+        """
+        strategy = ai_model or self.strategy
+        if strategy:
+            return strategy.choose_action(valid_actions, player=self, game=game)
+
         self.waiting_for_action = True
-        print(f"⏳ Waiting for frontend to provide action for {self.name}")
-        while self.pending_action is None:
-            time.sleep(0.01)  # Add a small delay to avoid busy-waiting
+        if self.events:
+            self.events.emit(WaitingForAction(self.name))
+        self.action_ready.wait()
+        self.action_ready.clear()
+        if self.cancelled:
+            raise GameClosed()
 
         self.waiting_for_action = False
         action_and_amount = self.pending_action
@@ -84,22 +131,16 @@ class Player:
             self.current_hand_bet += self.stack
             self.stack = 0
             self.all_in = True
-            go_goes = "goes" if self.name.lower() != "you" else "go"
-            print(f"{self.name} {go_goes} all-in with {self.current_bet} chips!")
         else:
             self.stack -= amount
             self.current_bet += amount
             self.current_hand_bet += amount
-            bet_bets = "bets" if self.name.lower() != "you" else "bet"
-            print(f"{self.name} {bet_bets} {amount} chips. Remaining stack: {self.stack}")
 
     def fold_hand(self):
         """
         Marks the player as folded.
         """
         self.folded = True
-        fold_folds = "folds" if self.name.lower() != "you" else "fold"
-        print(f"{self.name} {fold_folds}.")
 
     def reset_for_new_hand(self):
         """
@@ -111,6 +152,36 @@ class Player:
         self.folded = False
         self.all_in = False
 
+    def to_dict(self):
+        """
+        Serializes the player's state (cards as codes, see cards.py); strategies and pending actions are not kept.
+        """
+        return {
+            "name": self.name,
+            "stack": self.stack,
+            "position": self.position,
+            "hole_cards": [int(card) for card in self.hole_cards],
+            "current_bet": self.current_bet,
+            "current_hand_bet": self.current_hand_bet,
+            "folded": self.folded,
+            "all_in": self.all_in,
+            "selected_hole_cards": self.selected_hole_cards,
+        }
+
+    @classmethod
+    def from_dict(cls, data, events=None):
+        """
+        Rebuilds a player serialized by to_dict.
+        """
+        player = cls(data["name"], data["stack"], data["position"], events=events)
+        player.hole_cards = [CARDS[code] for code in data["hole_cards"]]
+        player.current_bet = data["current_bet"]
+        player.current_hand_bet = data["current_hand_bet"]
+        player.folded = data["folded"]
+        player.all_in = data["all_in"]
+        player.selected_hole_cards = data["selected_hole_cards"]
+        return player
+
     def __str__(self):
         """
         Returns a string representation of the player.
@@ -120,8 +191,10 @@ class Player:
 
 
 if __name__ == "__main__":
+    from strategies import CallingStation
+
     # Create two players
-    player1 = Player(name="Alice", stack=1000, position=0)
+    player1 = Player(name="Alice", stack=1000, position=0, strategy=CallingStation())
     player2 = Player(name="Bob", stack=1000, position=1)
 
     # Deal hole cards
@@ -0,0 +1,281 @@
+"""
+Precomputed preflop all-in equity between the 169 canonical starting hands.
+
+The table is built once by an offline step (see the __main__ block) and written
+to a compact binary file:
+
+- a 16-byte header: magic b"PFEQ", format version, number of classes, samples per matchup
+- a 169x169 float32 matrix: equity of the row hand against the column hand
+- a 169x169 uint16 matrix: number of card-compatible combo pairs for each matchup
+
+At runtime both matrices are opened with numpy.memmap, so every process shares
+the page cache instead of holding its own copy, and range-vs-range equity is a
+weighted sum over the two matrices. Weighting by the compatible combo counts
+accounts for card removal between the two ranges (e.g. AKo vs AA has 36 combo
+pairs, not 12 x 6).
+
+Hand classes are indexed on the usual 13x13 grid, aces first: the diagonal
+holds pairs, cells above it suited hands and cells below it offsuit hands.
+"""
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from batch_evaluator import evaluate_batch
+from isomorphism import canonicalize
+from lookup_evaluator import RANKS, card_to_code
+from rng import deal_boards, make_rng, seed_sequence
+
+MAGIC = b"PFEQ"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+NUM_CLASSES = 169
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "preflop_equity.bin")
+
+
+def class_name(index):
+    """
+    Returns the notation of a hand class (e.g., "AKs", "77", "T9o").
+    """
+    row, col = divmod(index, 13)
+    high, low = RANKS[12 - min(row, col)], RANKS[12 - max(row, col)]
+    if row == col:
+        return high + low
+    return high + low + ("s" if row < col else "o")
+
+
+CLASS_NAMES = [class_name(index) for index in range(NUM_CLASSES)]
+CLASS_INDEX = {name: index for index, name in enumerate(CLASS_NAMES)}
+
+
+def class_of_combo(cards):
+    """
+    Returns the class index of a 2-card combo.
+
+    :param cards: 2 cards (strings or integer codes)
+    :return: Index between 0 and 168
+    """
+    first, second = (card_to_code(card) for card in cards)
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if high == low:
+        return (12 - high) * 14
+    if first & 3 == second & 3:
+        return (12 - high) * 13 + (12 - low)
+    return (12 - low) * 13 + (12 - high)
+
+
+def class_combos(index):
+    """
+    Lists the combos of a hand class as pairs of card codes.
+
+    :param index: Class index between 0 and 168
+    :return: List of (code, code) tuples (6 for pairs, 4 suited, 12 offsuit)
+    """
+    row, col = divmod(index, 13)
+    high, low = 12 - min(row, col), 12 - max(row, col)
+    if row == col:
+        return [(high * 4 + s1, high * 4 + s2) for s1, s2 in combinations(range(4), 2)]
+    if row < col:
+        return [(high * 4 + s, low * 4 + s) for s in range(4)]
+    return [(high * 4 + s1, low * 4 + s2) for s1 in range(4) for s2 in range(4) if s1 != s2]
+
+
+CLASS_COMBOS = [class_combos(index) for index in range(NUM_CLASSES)]
+
+
+def _combo_pair_equity(hero, villain, samples, rng):
+    """
+    Estimates the all-in equity of one combo against another on random boards.
+    """
+    dead = set(hero) | set(villain)
+    deck = np.array([code for code in range(52) if code not in dead], dtype=np.intp)
+    boards = deal_boards(rng, deck, samples, 5)
+    hero_scores = evaluate_batch(np.concatenate([np.broadcast_to(hero, (samples, 2)), boards], axis=1))
+    villain_scores = evaluate_batch(np.concatenate([np.broadcast_to(villain, (samples, 2)), boards], axis=1))
+    return ((hero_scores > villain_scores).sum() + 0.5 * (hero_scores == villain_scores).sum()) / samples
+
+
+def _build_row(args):
+    """
+    Computes the equities of one hand class against every class at or after it.
+    """
+    row, samples, seed_sequence = args
+    rng = make_rng(seed_sequence)
+    equities = np.zeros(NUM_CLASSES, dtype=np.float32)
+    counts = np.zeros(NUM_CLASSES, dtype=np.uint16)
+    for col in range(row, NUM_CLASSES):
+        # Group compatible combo pairs by suit isomorphism: every group shares one estimate
+        groups = {}
+        for hero in CLASS_COMBOS[row]:
+            for villain in CLASS_COMBOS[col]:
+                if set(hero) & set(villain):
+                    continue
+                key, _ = canonicalize(hero, villain)
+                groups.setdefault(key, [hero, villain, 0])[2] += 1
+        total = sum(count for _, _, count in groups.values())
+        counts[col] = total
+        if total:
+            equities[col] = sum(
+                count * _combo_pair_equity(hero, villain, samples, rng)
+                for hero, villain, count in groups.values()
+            ) / total
+    return row, equities, counts
+
+
+def build_table(path=DEFAULT_PATH, samples=2000, seed=0, max_workers=None):
+    """
+    Computes the 169x169 preflop equity matrix and writes it to disk.
+
+    :param path: Output file path.
+    :param samples: Number of random boards per distinct combo matchup.
+    :param seed: Seed of the per-row RNG streams (integer, SeedSequence or numpy Generator).
+    :param max_workers: Number of worker processes (defaults to the CPU count).
+    """
+    equities = np.zeros((NUM_CLASSES, NUM_CLASSES), dtype=np.float32)
+    counts = np.zeros((NUM_CLASSES, NUM_CLASSES), dtype=np.uint16)
+    seeds = seed_sequence(seed).spawn(NUM_CLASSES)
+    tasks = [(row, samples, seeds[row]) for row in range(NUM_CLASSES)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for row, row_equities, row_counts in executor.map(_build_row, tasks):
+            equities[row, row:] = row_equities[row:]
+            equities[row:, row] = 1.0 - row_equities[row:]
+            counts[row, row:] = row_counts[row:]
+            counts[row:, row] = row_counts[row:]
+            print(f"{CLASS_NAMES[row]} done")
+    np.fill_diagonal(equities, 0.5)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_CLASSES, samples))
+        f.write(equities.tobytes())
+        f.write(counts.tobytes())
+
+
+class PreflopEquityTable:
+    """
+    Memory-mapped view over a preflop equity file.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Opens an equity file built by build_table.
+
+        :param path: Path of the equity file.
+        """
+        with open(path, "rb") as f:
+            magic, version, num_classes, samples = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or num_classes != NUM_CLASSES:
+            raise ValueError(f"{path} is not a preflop equity table (version {VERSION}).")
+
+        self.samples = samples
+        shape = (NUM_CLASSES, NUM_CLASSES)
+        self.equities = np.memmap(path, dtype=np.float32, mode="r", offset=HEADER.size, shape=shape)
+        self.counts = np.memmap(
+            path, dtype=np.uint16, mode="r", offset=HEADER.size + self.equities.nbytes, shape=shape
+        )
+
+    @staticmethod
+    def range_weights(hand_range):
+        """
+        Converts a range into a 169-entry weight vector.
+
+        :param hand_range: List of hand notations (e.g., ["AKs", "77"]), a dictionary of notation
+                           to weight, or a weight vector
+        :return: float64 array of 169 weights
+        """
+        if isinstance(hand_range, np.ndarray):
+            return hand_range.astype(np.float64, copy=False)
+        weights = np.zeros(NUM_CLASSES)
+        items = hand_range.items() if isinstance(hand_range, dict) else ((name, 1.0) for name in hand_range)
+        for name, weight in items:
+            if name in CLASS_INDEX:
+                weights[CLASS_INDEX[name]] = weight
+            elif name + "s" in CLASS_INDEX:
+                # Notations without suitedness cover both the suited and offsuit classes
+                weights[CLASS_INDEX[name + "s"]] = weight
+                weights[CLASS_INDEX[name + "o"]] = weight
+        return weights
+
+    def hand_vs_hand(self, hand, other):
+        """
+        Returns the equity of one hand class against another.
+
+        :param hand: Notation of the first hand (e.g., "AKs")
+        :param other: Notation of the second hand (e.g., "QQ")
+        :return: Equity between 0 and 1
+        """
+        return float(self.equities[CLASS_INDEX[hand], CLASS_INDEX[other]])
+
+    def range_vs_range(self, hand_range, other_range):
+        """
+        Returns the equity of a range against another, weighted by compatible combo counts.
+
+        :param hand_range: First range (see range_weights)
+        :param other_range: Second range (see range_weights)
+        :return: Equity between 0 and 1, or None if the ranges share no compatible combos
+        """
+        weights = self.range_weights(hand_range)
+        other_weights = self.range_weights(other_range)
+        rows = np.flatnonzero(weights)
+        cols = np.flatnonzero(other_weights)
+        pair_weights = np.outer(weights[rows], other_weights[cols]) * self.counts[np.ix_(rows, cols)]
+        total = pair_weights.sum()
+        if total == 0:
+            return None
+        return float((pair_weights * self.equities[np.ix_(rows, cols)]).sum() / total)
+
+    def combo_vs_range(self, hole_cards, other_range):
+        """
+        Returns the equity of a specific combo against a range, removing the combos it blocks.
+
+        :param hole_cards: Hero's 2 hole cards
+        :param other_range: Opponent range (see range_weights)
+        :return: Equity between 0 and 1, or None if every combo of the range is blocked
+        """
+        hero = {card_to_code(card) for card in hole_cards}
+        row = class_of_combo(hole_cards)
+        other_weights = self.range_weights(other_range)
+        cols = np.flatnonzero(other_weights)
+        live = np.array([
+            sum(1 for combo in CLASS_COMBOS[col] if not hero & set(combo)) for col in cols
+        ], dtype=np.float64)
+        pair_weights = other_weights[cols] * live
+        total = pair_weights.sum()
+        if total == 0:
+            return None
+        return float((pair_weights * self.equities[row, cols]).sum() / total)
+
+
+_table = None
+
+
+def get_table(path=DEFAULT_PATH):
+    """
+    Returns the shared memory-mapped table, or None if it has not been built yet.
+    """
+    global _table
+    if _table is None:
+        if not os.path.exists(path):
+            return None
+        _table = PreflopEquityTable(path)
+    return _table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the 169x169 preflop equity table.")
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    build_table(args.output, samples=args.samples, seed=args.seed, max_workers=args.workers)
+    table = PreflopEquityTable(args.output)
+    print(f"AA vs KK: {table.hand_vs_hand('AA', 'KK'):.3f}")
+    print(f"AKs vs QQ: {table.hand_vs_hand('AKs', 'QQ'):.3f}")
@@ -0,0 +1,160 @@
+"""
+Vectorized range-vs-range equity on a given board.
+
+Ranges are weight vectors over the 1,326 combos (see combos.py). Combos that
+use a dead card are zeroed with a single mask, and combo pairs that share a
+card are excluded through a precomputed 1326x1326 overlap matrix.
+
+For every remaining runout the strengths of all combos in play are computed in
+one broadcast call, then compared as a (hero combos x villain combos) matrix.
+Summing over runouts gives the overall equity as well as the equity of each
+individual combo of either range, and hero's equity once a given card comes
+next (from the runouts that contain it).
+"""
+from itertools import combinations
+
+import numpy as np
+
+from batch_evaluator import evaluate_combos_on_boards
+from combos import COMBO_ARRAY, NUM_COMBOS, blocked_combos, combo_index
+from lookup_evaluator import card_to_code, code_to_card
+from hand_range import Range
+
+# OVERLAPS[i, j] is True when combos i and j share a card
+OVERLAPS = (
+    (COMBO_ARRAY[:, None, 0] == COMBO_ARRAY[None, :, 0])
+    | (COMBO_ARRAY[:, None, 0] == COMBO_ARRAY[None, :, 1])
+    | (COMBO_ARRAY[:, None, 1] == COMBO_ARRAY[None, :, 0])
+    | (COMBO_ARRAY[:, None, 1] == COMBO_ARRAY[None, :, 1])
+)
+
+MAX_CHUNK_CELLS = 4_000_000
+
+
+def range_vector(notations, weight=1.0):
+    """
+    Expands hand notations into a 1,326-combo weight vector.
+
+    :param notations: List of hand notations (e.g., ["AKs", "77", "AJ"])
+    :param weight: Weight given to every listed combo
+    :return: float64 array of 1,326 weights
+    """
+    return Range.from_notations(notations).to_weights(weight)
+
+
+def combo_vector(cards):
+    """
+    Returns the weight vector of a single known combo.
+
+    :param cards: 2 hole cards
+    :return: float64 array of 1,326 weights with a single 1
+    """
+    weights = np.zeros(NUM_COMBOS)
+    weights[combo_index(cards)] = 1.0
+    return weights
+
+
+def combo_name(index):
+    """
+    Returns the card strings of a combo index (e.g., "A♠K♠").
+    """
+    low, high = COMBO_ARRAY[index]
+    return code_to_card(high).symbol + code_to_card(low).symbol
+
+
+def range_vs_range(hero_weights, villain_weights, board, dead_cards=()):
+    """
+    Computes hero's equity against a villain range over every runout of the board.
+
+    :param hero_weights: 1,326-combo weight vector of hero's range (a single combo for a known hand)
+    :param villain_weights: 1,326-combo weight vector of the villain's range
+    :param board: Community cards (3 to 5 cards)
+    :param dead_cards: Other cards known to be out of play
+    :return: Dictionary with the overall equity, per-combo equities of both ranges (NaN for combos
+             out of play), hero's equity once each card code comes next (NaN for cards that cannot),
+             and the total weight of the combo pairs that were compared
+    """
+    board_codes = [card_to_code(card) for card in board]
+    dead = blocked_combos(board_codes + [card_to_code(card) for card in dead_cards])
+    hero_weights = np.where(dead, 0.0, hero_weights)
+    villain_weights = np.where(dead, 0.0, villain_weights)
+
+    hero_idx = np.flatnonzero(hero_weights)
+    villain_idx = np.flatnonzero(villain_weights)
+    hero_equities = np.full(NUM_COMBOS, np.nan)
+    villain_equities = np.full(NUM_COMBOS, np.nan)
+    if not len(hero_idx) or not len(villain_idx):
+        return {"equity": None, "hero_combo_equities": hero_equities,
+                "villain_combo_equities": villain_equities, "next_card_equities": np.full(52, np.nan), "weight": 0.0}
+
+    # Weight of each (hero combo, villain combo) pair, zero when they share a card
+    pair_weights = np.outer(hero_weights[hero_idx], villain_weights[villain_idx])
+    pair_weights[OVERLAPS[np.ix_(hero_idx, villain_idx)]] = 0.0
+
+    used = np.union1d(hero_idx, villain_idx)
+    hero_pos = np.searchsorted(used, hero_idx)
+    villain_pos = np.searchsorted(used, villain_idx)
+    used_combos = COMBO_ARRAY[used]
+
+    deck = [code for code in range(52) if code not in board_codes]
+    runouts = np.array(list(combinations(deck, 5 - len(board_codes))), dtype=np.intp).reshape(-1, 5 - len(board_codes))
+    boards = np.concatenate([np.broadcast_to(board_codes, (len(runouts), len(board_codes))), runouts], axis=1)
+
+    won = np.zeros_like(pair_weights)  # hero wins + half of the ties, per pair
+    total = np.zeros_like(pair_weights)
+    card_won = np.zeros(52)  # the same, per next card code
+    card_total = np.zeros(52)
+    chunk = max(1, MAX_CHUNK_CELLS // pair_weights.size)
+    for start in range(0, len(boards), chunk):
+        chunk_runouts = runouts[start:start + chunk]
+        strengths = evaluate_combos_on_boards(used_combos, boards[start:start + chunk])
+
+        # A combo is only live on a runout that does not use one of its cards
+        live = ~(chunk_runouts[:, :, None, None] == used_combos[None, None, :, :]).any(axis=(1, 3))
+        hero_strengths = strengths[:, hero_pos]
+        villain_strengths = strengths[:, villain_pos]
+        live_pairs = live[:, hero_pos][:, :, None] & live[:, villain_pos][:, None, :]
+
+        diff = hero_strengths[:, :, None].astype(np.int64) - villain_strengths[:, None, :]
+        score = np.where(diff > 0, 1.0, np.where(diff == 0, 0.5, 0.0))
+        counted = live_pairs * pair_weights
+        scored = score * counted
+        won += scored.sum(axis=0)
+        total += counted.sum(axis=0)
+
+        # Every card of a runout can come next, so each one gets the results of the runout
+        runout_won = scored.sum(axis=(1, 2))
+        runout_total = counted.sum(axis=(1, 2))
+        for column in chunk_runouts.T:
+            np.add.at(card_won, column, runout_won)
+            np.add.at(card_total, column, runout_total)
+
+    weight = total.sum()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hero_equities[hero_idx] = won.sum(axis=1) / total.sum(axis=1)
+        villain_equities[villain_idx] = 1.0 - won.sum(axis=0) / total.sum(axis=0)
+        next_card_equities = np.where(card_total > 0, card_won / card_total, np.nan)
+
+    return {
+        "equity": float(won.sum() / weight) if weight else None,
+        "hero_combo_equities": hero_equities,
+        "villain_combo_equities": villain_equities,
+        "next_card_equities": next_card_equities,
+        "weight": float(weight),
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    result = range_vs_range(
+        combo_vector(["A♠", "K♠"]),
+        range_vector(["QQ", "77", "22", "AQs", "KQs", "JTs", "AK"]),
+        ["Q♠", "7♠", "2♥"],
+    )
+    print(f"Equity: {result['equity']:.3f} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+    villain = result["villain_combo_equities"]
+    for index in np.flatnonzero(~np.isnan(villain))[:5]:
+        print(f"  vs {combo_name(index)}: hero {1 - villain[index]:.3f}")
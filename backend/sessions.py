@@ -0,0 +1,312 @@
+"""
+Tables served by the backend.
+
+Every API request names its table (the ``table`` query parameter or JSON
+field, "default" when absent). The state of every table lives in a state
+store (see state_store.py) as serialized JSON with a version: a request
+loads its table, plays it one step (Game.start_hand, Game.perform_action,
+...) and saves it back, so nothing waits in a thread between requests and
+several gunicorn workers can serve the same tables through a shared store.
+
+The TableManager keeps the games it rebuilt in a per-process cache and only
+rebuilds one when the stored version changed, i.e. when another worker
+saved it. Requests on the same table are serialized within a process, and
+across processes saving raises VersionConflict so the request can be
+retried. Tables that have not been used for idle_timeout seconds are
+evicted, and the cache holds at most max_tables games.
+
+Versions start over when a table is deleted and opened again, so every
+table also gets a random epoch when it is created. Its state tag
+("<epoch>-<version>") names one state of one table for good, e.g. in
+HTTP ETags.
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from game import Game
+from state_store import MemoryStateStore, VersionConflict
+
+DEFAULT_TABLE = "default"
+
+
+class Table:
+    """
+    State of one table: its game and whether its configuration is locked.
+    """
+
+    def __init__(self, table_id, version=0, epoch=None):
+        self.table_id = table_id
+        self.epoch = epoch or secrets.token_hex(4)  # Tells this table apart from earlier tables with the same id
+        self.game = None
+        self.config_locked = False
+        self.recording = None  # Hand history record of the hand in progress (see history.HandRecording)
+        self.version = version  # Version of the stored state this table was loaded from
+        self.saved_state = None  # Stored state at that version, to skip saving unchanged tables
+        self.last_access = time.monotonic()
+
+    @property
+    def state_tag(self):
+        """
+        Returns "<epoch>-<version>", which names the current state of this table.
+        """
+        return f"{self.epoch}-{self.version}"
+
+    def to_dict(self):
+        return {
+            "epoch": self.epoch,
+            "config_locked": self.config_locked,
+            "recording": self.recording,
+            "game": self.game.to_dict() if self.game else None,
+        }
+
+    @classmethod
+    def from_dict(cls, table_id, data, version):
+        """
+        Rebuilds a table from its stored state.
+        """
+        table = cls(table_id, version, data["epoch"])
+        table.saved_state = data
+        table.config_locked = data["config_locked"]
+        table.recording = data["recording"]
+        if data["game"] is not None:
+            table.game = Game.from_dict(data["game"])
+        return table
+
+    def reset(self):
+        """
+        Drops the game (and the record of its hand in progress) and unlocks the configuration.
+        """
+        self.game = None
+        self.recording = None
+        self.config_locked = False
+
+
+class TableManager:
+    """
+    Tables keyed by id, stored in a state store and cached per process.
+    """
+
+    def __init__(self, store=None, max_tables=500, idle_timeout=3600, lock_stripes=64, history_size=8):
+        """
+        :param store: State store of the tables (see state_store.py); a MemoryStateStore by default
+        :param max_tables: Maximum number of games cached in the process; opening one more drops the least recently used
+        :param idle_timeout: Seconds without requests after which a table is evicted
+        :param lock_stripes: Number of locks serializing the requests of the process by table
+        :param history_size: Number of recent views kept per table (see snapshot)
+        """
+        self.store = store if store is not None else MemoryStateStore()
+        self.max_tables = max_tables
+        self.idle_timeout = idle_timeout
+        self._tables = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+        self._stripes = [threading.RLock() for _ in range(lock_stripes)]
+        self._last_sweep = time.monotonic()
+        self._changed = threading.Condition()  # Notified whenever this process saves a table
+        self.history_size = history_size
+        self._history = {}  # Table id to OrderedDict of state tag to view, oldest first
+        self.poll_interval = 0.5  # Seconds between version checks for changes saved by other processes
+
+    def lock(self, table_id=DEFAULT_TABLE):
+        """
+        Returns the lock to hold while changing a table, so the requests of this process on a table run one at a time.
+        """
+        return self._stripes[hash(table_id) % len(self._stripes)]
+
+    def get(self, table_id=DEFAULT_TABLE, create=True):
+        """
+        Returns a table with its latest stored state, marking it as used.
+
+        :param table_id: Table id
+        :param create: Whether to open the table if it does not exist
+        :return: Table, or None if it does not exist and create is False
+        """
+        now = time.monotonic()
+        with self._lock:
+            sweep = self._evict_idle(now)
+            table = self._tables.get(table_id)
+        if sweep:
+            self.store.delete_idle(self.idle_timeout)  # Outside the lock, which every request takes
+        version = self.store.version(table_id)
+        if table is None or table.version != version:
+            # Never seen by this process, or saved by another one since
+            data, version = self.store.load(table_id)
+            if data is not None:
+                table = Table.from_dict(table_id, data, version)
+            elif create:
+                table = Table(table_id)
+            else:
+                return None
+        table.last_access = now
+        with self._lock:
+            self._tables[table_id] = table
+            self._tables.move_to_end(table_id)
+            while len(self._tables) > self.max_tables:
+                old_id, _ = self._tables.popitem(last=False)
+                self._history.pop(old_id, None)
+                if not self.store.shared:
+                    self.store.delete(old_id)  # The cache is all there is of it
+        return table
+
+    def save(self, table):
+        """
+        Saves a table changed by a request; a table whose state did not change keeps its version.
+
+        :raises VersionConflict: If another process saved the table since it was loaded; the cached copy is dropped
+        """
+        state = table.to_dict()
+        if state == table.saved_state:
+            return
+        try:
+            table.version = self.store.save(table.table_id, state, table.version)
+        except VersionConflict:
+            self.discard(table.table_id)
+            raise
+        table.saved_state = state
+        with self._changed:
+            self._changed.notify_all()
+
+    def snapshot(self, table, build):
+        """
+        Returns a view of a table (e.g., the state shown by the frontend), built once per state tag.
+
+        :param table: Table, as returned by get
+        :param build: Function building the view of a table
+        :return: View of the table in its current state
+        """
+        tag = table.state_tag
+        with self._lock:
+            history = self._history.get(table.table_id)
+            if history is not None and tag in history:
+                return history[tag]
+        view = build(table)
+        with self._lock:
+            history = self._history.setdefault(table.table_id, OrderedDict())
+            history[tag] = view
+            while len(history) > self.history_size:
+                history.popitem(last=False)
+        return view
+
+    def snapshot_at(self, table_id, tag):
+        """
+        Returns the view of a table in a recent state, or None if this process no longer has it.
+
+        :param tag: State tag of the table (see Table.state_tag)
+        """
+        with self._lock:
+            return self._history.get(table_id, {}).get(tag)
+
+    def wait_for_change(self, table_id, version, timeout):
+        """
+        Blocks until the stored version of a table differs from the given one.
+        Saves of this process wake the waiters at once; saves of other processes (shared stores)
+        are seen within poll_interval seconds.
+
+        :param version: Version the caller has; None returns immediately
+        :param timeout: Maximum number of seconds to wait
+        :return: Current version (equal to version on timeout)
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                current = self.store.version(table_id)
+                remaining = deadline - time.monotonic()
+                if current != version or remaining <= 0:
+                    return current
+                self._changed.wait(min(remaining, self.poll_interval) if self.store.shared else remaining)
+
+    def discard(self, table_id):
+        """
+        Drops the cached copy of a table (e.g., after a failed request changed it), so it is reloaded from the store.
+        """
+        with self._lock:
+            self._tables.pop(table_id, None)
+
+    def remove(self, table_id):
+        """
+        Forgets a table.
+        """
+        self.discard(table_id)
+        with self._lock:
+            self._history.pop(table_id, None)
+        self.store.delete(table_id)
+
+    def evict_idle(self):
+        """
+        Forgets the tables idle for longer than idle_timeout.
+
+        :return: Number of tables evicted from the store
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now  # Swept below
+            self._evict_idle(now)
+        return self.store.delete_idle(self.idle_timeout)
+
+    def _evict_idle(self, now):
+        """
+        Drops the idle tables from the cache; call with the lock held.
+
+        :return: Whether the store is due for a sweep of its idle tables, to run after releasing the lock
+        """
+        while self._tables:
+            table = next(iter(self._tables.values()))
+            if now - table.last_access < self.idle_timeout:
+                break
+            self._tables.popitem(last=False)
+            self._history.pop(table.table_id, None)
+        if now - self._last_sweep >= min(self.idle_timeout, 60):
+            self._last_sweep = now
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, table_id):
+        return table_id in self._tables
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from state_store import SQLiteStateStore
+
+    # Two "workers" sharing one SQLite store
+    path = os.path.join(tempfile.mkdtemp(), "tables.db")
+    worker_a, worker_b = TableManager(SQLiteStateStore(path)), TableManager(SQLiteStateStore(path))
+
+    table = worker_a.get("demo")
+    table.game = Game(["You", "Bob", "Carol"], [1000] * 3, rng=1, verbose=False)
+    table.config_locked = True
+    table.game.start_hand()
+    worker_a.save(table)
+
+    table = worker_b.get("demo")
+    player = table.game.current_betting_round.next_player()
+    print(f"Worker B sees hand {table.game.hand_number}, {player.name} to act")
+    table.game.perform_action(player.name, "call", table.game.current_betting_round.get_valid_actions(player)["call"])
+    worker_b.save(table)
+
+    stale = worker_a._tables["demo"]  # Still at the version before worker B's call
+    player = stale.game.current_betting_round.next_player()
+    stale.game.perform_action(player.name, "fold", None)
+    try:
+        worker_a.save(stale)
+    except VersionConflict:
+        print("Worker A's stale copy was rejected")
+    table = worker_a.get("demo")
+    print(f"Worker A reloaded version {table.version}, {table.game.current_betting_round.get_active_player()} to act")
+
+    # Cached tables of a process
+    tables = TableManager(max_tables=100, idle_timeout=0.5)
+    for index in range(150):
+        table = tables.get(f"table-{index}")
+        table.game = Game(["You", "Bob", "Carol"], [1000] * 3, rng=index, verbose=False)
+        table.game.start_hand()
+        tables.save(table)
+    print(f"Cached tables: {len(tables)}")
+    time.sleep(0.6)
+    print(f"Evicted {tables.evict_idle()} idle tables, cached tables: {len(tables)}")
@@ -0,0 +1,198 @@
+"""
+Bulk self-play simulation across all CPU cores.
+
+Hands are played in batches by worker processes. Each batch builds its own
+headless Game (and so its own Deck) with a random stream spawned from a single
+SeedSequence, plays its hands and sends back compact per-hand arrays: net
+chips by position, which positions reached the showdown and the pot size.
+The parent merges the batches into running totals as they complete, so memory
+stays flat however many hands are played.
+
+Stacks are reset before every hand, so each hand is played at the same depth.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from assistant import determine_position
+from game import BIG_BLIND, Game
+from rng import seed_sequence
+from strategies import RangeStrategy
+
+
+def _play_batch(num_players, starting_stack, strategies, hands, seeds):
+    """
+    Plays a batch of headless hands.
+
+    :param num_players: Number of seats
+    :param starting_stack: Stack of every player at the start of each hand
+    :param strategies: Strategy for every player, or list of one strategy per seat
+    :param hands: Number of hands to play
+    :param seeds: numpy SeedSequence owned by this batch
+    :return: Tuple (net chips (hands, positions) int64, reached showdown (hands, positions) bool, pots (hands,) int64),
+             with positions ordered by distance from the button
+    """
+    game_seed, strategy_seed = seeds.spawn(2)
+    names = [f"Player {seat + 1}" for seat in range(num_players)]
+    if isinstance(strategies, (list, tuple)):
+        strategies = dict(zip(names, strategies))
+    game = Game(names, [starting_stack] * num_players, rng=game_seed, strategies=strategies, verbose=False)
+
+    distinct = {id(strategy): strategy for strategy in game.strategies.values()}
+    for strategy, child in zip(distinct.values(), strategy_seed.spawn(len(distinct))):
+        strategy.seed(child)
+
+    nets = np.zeros((hands, num_players), dtype=np.int64)
+    at_showdown = np.zeros((hands, num_players), dtype=bool)
+    pots = np.zeros(hands, dtype=np.int64)
+    seats = np.arange(num_players)
+    for hand in range(hands):
+        for player in game.players:
+            player.stack = starting_stack
+        result = game.play_hand()
+        positions = (seats - result["dealer_position"]) % num_players
+        nets[hand, positions] = result["net"]
+        at_showdown[hand, positions] = result["at_showdown"]
+        pots[hand] = result["pot"]
+    return nets, at_showdown, pots
+
+
+class SimulationStats:
+    """
+    Running totals of a simulation, merged batch by batch.
+    """
+
+    def __init__(self, num_players, big_blind):
+        self.num_players = num_players
+        self.big_blind = big_blind
+        self.hands = 0
+        self.showdowns = 0
+        self.pot_total = 0
+        self.net = np.zeros(num_players, dtype=np.int64)
+        self.net_sq = np.zeros(num_players, dtype=np.float64)
+        self.showdowns_by_position = np.zeros(num_players, dtype=np.int64)
+        self.pots_won = np.zeros(num_players, dtype=np.int64)
+        self.pot_won_total = np.zeros(num_players, dtype=np.int64)
+
+    def merge(self, nets, at_showdown, pots):
+        """
+        Adds the per-hand results of a batch to the totals.
+        """
+        self.hands += len(pots)
+        self.showdowns += int(at_showdown.any(axis=1).sum())
+        self.pot_total += int(pots.sum())
+        self.net += nets.sum(axis=0)
+        self.net_sq += (nets.astype(np.float64) ** 2).sum(axis=0)
+        self.showdowns_by_position += at_showdown.sum(axis=0)
+        won = nets > 0
+        self.pots_won += won.sum(axis=0)
+        self.pot_won_total += (won * pots[:, None]).sum(axis=0)
+
+    def summary(self):
+        """
+        Returns the aggregated statistics.
+
+        :return: Dictionary with the number of hands, the overall showdown frequency and average pot,
+                 and per position: net chips, big blinds won per 100 hands (with its standard error),
+                 showdown frequency, share of pots won and average size of the pots won
+        """
+        hands = max(self.hands, 1)
+        positions = {}
+        for index in range(self.num_players):
+            name = determine_position(index, self.num_players)
+            mean = self.net[index] / hands
+            variance = max(self.net_sq[index] / hands - mean * mean, 0.0)
+            positions[name] = {
+                "net": int(self.net[index]),
+                "bb_per_100": mean / self.big_blind * 100,
+                "bb_per_100_std_error": (variance / hands) ** 0.5 / self.big_blind * 100,
+                "showdown_frequency": self.showdowns_by_position[index] / hands,
+                "win_frequency": self.pots_won[index] / hands,
+                "average_pot_won": self.pot_won_total[index] / self.pots_won[index] if self.pots_won[index] else 0.0,
+            }
+        return {
+            "hands": self.hands,
+            "showdown_frequency": self.showdowns / hands,
+            "average_pot": self.pot_total / hands,
+            "positions": positions,
+        }
+
+
+def simulate(num_hands, num_players=6, starting_stack=20000, strategies=None, batch_size=500,
+             max_workers=None, seed=None, progress=None):
+    """
+    Plays many hands of headless self-play and aggregates the results by position.
+
+    :param num_hands: Number of hands to play
+    :param num_players: Number of seats
+    :param starting_stack: Stack of every player at the start of each hand
+    :param strategies: Strategy for every player, or list of one strategy per seat (defaults to RangeStrategy)
+    :param batch_size: Number of hands per batch sent to a worker
+    :param max_workers: Number of worker processes (defaults to the CPU count, 0 runs in-process)
+    :param seed: Optional seed (integer, SeedSequence or numpy Generator) to make the run reproducible
+    :param progress: Optional callback called with the SimulationStats after each merged batch
+    :return: Dictionary of aggregated statistics (see SimulationStats.summary)
+    """
+    if strategies is None:
+        strategies = RangeStrategy()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    seeds = seed_sequence(seed)
+    batches = [batch_size] * (num_hands // batch_size)
+    if num_hands % batch_size:
+        batches.append(num_hands % batch_size)
+    tasks = [(num_players, starting_stack, strategies, hands, child) for hands, child in zip(batches, seeds.spawn(len(batches)))]
+    stats = SimulationStats(num_players, BIG_BLIND)
+
+    if max_workers == 0:
+        for task in tasks:
+            stats.merge(*_play_batch(*task))
+            if progress:
+                progress(stats)
+        return stats.summary()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        tasks = iter(tasks)
+        pending = set()
+        while True:
+            # Keep a bounded number of batches in flight so results are merged as they stream back
+            for task in tasks:
+                pending.add(executor.submit(_play_batch, *task))
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stats.merge(*future.result())
+                if progress:
+                    progress(stats)
+    return stats.summary()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate self-play hands with the preflop charts.")
+    parser.add_argument("--hands", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--stack", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = simulate(args.hands, num_players=args.players, starting_stack=args.stack,
+                       batch_size=args.batch_size, max_workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{summary['hands']} hands in {elapsed:.1f} s ({summary['hands'] / elapsed:.0f} hands/s)")
+    print(f"Showdown frequency {summary['showdown_frequency']:.1%}, average pot {summary['average_pot']:.0f}")
+    for position, stats in summary["positions"].items():
+        print(f"  {position:>3}: {stats['bb_per_100']:+8.1f} bb/100 (± {stats['bb_per_100_std_error']:.1f}), "
+              f"showdown {stats['showdown_frequency']:.1%}, wins {stats['win_frequency']:.1%}, "
+              f"average pot won {stats['average_pot_won']:.0f}")
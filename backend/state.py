@@ -0,0 +1,376 @@
+"""
+Compact, snapshot-able state of a hand for search and simulation.
+
+Game, Player and BettingRound are full objects wired to the deck, the
+frontend and the strategies, so branching on them means deep-copying a whole
+object graph. A GameState holds only what the betting needs: stacks, street
+bets and hand contributions in fixed-size integer arrays, folded / all-in /
+acted flags as bitmasks over seats, and the cards as tuples of card codes.
+Copying one is a handful of small array copies, so lookahead search can
+branch thousands of times per decision:
+
+    snapshot = state.snapshot()
+    for action in candidates:
+        state.act(action)           # in place
+        ...
+        state.restore(snapshot)     # back to the branch point, no allocation
+
+or, without mutating anything, ``child = state.apply(action)``.
+
+Actions are the ``(action, amount)`` tuples of the strategies and of /action,
+checked against valid_actions, which follows BettingRound.get_valid_actions.
+"""
+from array import array
+
+from lookup_evaluator import evaluate_codes
+
+PREFLOP, FLOP, TURN, RIVER, SHOWDOWN = range(5)
+STREET_NAMES = ("Preflop", "Flop", "Turn", "River", "Showdown")
+STREET_BY_BOARD_SIZE = {0: PREFLOP, 3: FLOP, 4: TURN, 5: RIVER}
+
+
+class GameState:
+    """
+    State of one hand: whose turn it is, the chips of every seat and the cards.
+
+    Street SHOWDOWN means the hand is over, either because one player is left or because
+    the betting is closed (after the river, or with at most one player able to act).
+    """
+
+    __slots__ = (
+        "num_players", "dealer", "small_blind", "big_blind",
+        "stacks", "bets", "contributed",
+        "folded", "all_in", "acted",
+        "to_act", "street", "current_bet",
+        "hole_cards", "board",
+    )
+
+    def __init__(self, stacks, dealer=0, small_blind=100, big_blind=200, hole_cards=None, board=()):
+        """
+        Initializes a state before the blinds are posted (see new_hand to start a hand).
+
+        :param stacks: Stack of every seat
+        :param dealer: Seat of the dealer button
+        :param small_blind: Small blind amount
+        :param big_blind: Big blind amount
+        :param hole_cards: Optional hole cards of every seat (card codes or Cards)
+        :param board: Community cards already dealt
+        """
+        self.num_players = len(stacks)
+        self.dealer = dealer
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.stacks = array("q", stacks)
+        self.bets = array("q", bytes(8 * self.num_players))  # Chips put in on the current street
+        self.contributed = array("q", bytes(8 * self.num_players))  # Chips put in during the whole hand
+        self.folded = 0
+        self.all_in = 0
+        self.acted = 0  # Seats that acted since the last raise
+        self.to_act = -1
+        self.street = STREET_BY_BOARD_SIZE[len(board)]
+        self.current_bet = 0
+        self.hole_cards = tuple(tuple(cards) for cards in hole_cards) if hole_cards else ((),) * self.num_players
+        self.board = tuple(board)
+
+    @classmethod
+    def new_hand(cls, stacks, dealer=0, small_blind=100, big_blind=200, hole_cards=None):
+        """
+        Starts a hand: posts the blinds and gives the action to the player after the big blind.
+
+        :return: GameState
+        """
+        state = cls(stacks, dealer, small_blind, big_blind, hole_cards)
+        n = state.num_players
+        state._put_in((dealer + 1) % n, small_blind)
+        state._put_in((dealer + 2) % n, big_blind)
+        state.current_bet = max(state.bets)
+        state.to_act = state._next_to_act((dealer + 2) % n)
+        return state
+
+    @classmethod
+    def from_game(cls, game, player=None):
+        """
+        Captures the state of a live Game (e.g., to search from the current decision).
+
+        The live engine keeps Player.current_bet for the whole hand, so the captured street bets
+        are those totals: the amounts to call and the minimum raise match BettingRound exactly.
+
+        :param game: Game being played
+        :param player: Player to act (defaults to the active player of the current betting round)
+        :return: GameState
+        """
+        players = game.players
+        state = cls(
+            [p.stack for p in players], game.dealer_position, game.small_blind, game.big_blind,
+            [p.hole_cards for p in players], game.community_cards,
+        )
+        for seat, p in enumerate(players):
+            state.bets[seat] = p.current_bet
+            state.contributed[seat] = p.current_hand_bet
+            state.folded |= p.folded << seat
+            state.all_in |= (p.all_in or p.stack == 0) << seat
+        state.current_bet = max(state.bets)
+
+        betting_round = game.current_betting_round
+        if player is None and betting_round:
+            name = betting_round.get_active_player()
+            player = next((p for p in players if p.name == name), None)
+        if player is None:
+            state.to_act = state._next_to_act(state.dealer + (2 if state.street == PREFLOP else 0))
+        else:
+            state.to_act = player.position
+            for p in betting_round.betting_order[:betting_round.current_index] if betting_round else ():
+                state.acted |= 1 << p.position
+        return state
+
+    @property
+    def pot(self):
+        return sum(self.contributed)
+
+    @property
+    def is_terminal(self):
+        return self.street == SHOWDOWN
+
+    @property
+    def active_seats(self):
+        """
+        Seats that have not folded.
+        """
+        return [seat for seat in range(self.num_players) if not self.folded >> seat & 1]
+
+    def copy(self):
+        """
+        Returns an independent copy (arrays are copied, card tuples are shared).
+        """
+        state = GameState.__new__(GameState)
+        state.num_players = self.num_players
+        state.dealer = self.dealer
+        state.small_blind = self.small_blind
+        state.big_blind = self.big_blind
+        state.stacks = self.stacks[:]
+        state.bets = self.bets[:]
+        state.contributed = self.contributed[:]
+        state.folded = self.folded
+        state.all_in = self.all_in
+        state.acted = self.acted
+        state.to_act = self.to_act
+        state.street = self.street
+        state.current_bet = self.current_bet
+        state.hole_cards = self.hole_cards
+        state.board = self.board
+        return state
+
+    def snapshot(self):
+        """
+        Returns the mutable part of the state, to restore it later.
+
+        :return: Tuple, to pass to restore
+        """
+        return (
+            self.stacks[:], self.bets[:], self.contributed[:], self.folded, self.all_in, self.acted,
+            self.to_act, self.street, self.current_bet, self.board,
+        )
+
+    def restore(self, snapshot):
+        """
+        Puts the state back to a snapshot, in place. A snapshot can be restored any number of times.
+
+        :param snapshot: Value returned by snapshot
+        """
+        stacks, bets, contributed, self.folded, self.all_in, self.acted, \
+            self.to_act, self.street, self.current_bet, self.board = snapshot
+        self.stacks[:] = stacks
+        self.bets[:] = bets
+        self.contributed[:] = contributed
+
+    def valid_actions(self):
+        """
+        Determines the legal actions of the player to act, like BettingRound.get_valid_actions.
+
+        :return: Dictionary of valid actions, or None when nobody is to act.
+        """
+        if self.to_act < 0:
+            return None
+        stack = self.stacks[self.to_act]
+        amount_to_call = min(self.current_bet - self.bets[self.to_act], stack)
+        return {
+            "fold": True,
+            "call": max(amount_to_call, 0),
+            "raise": (max(self.current_bet * 2, self.current_bet + 1), stack) if stack > amount_to_call else None,
+        }
+
+    def apply(self, action):
+        """
+        Returns the state after the player to act takes an action, leaving this state unchanged.
+
+        :param action: Tuple (action, amount), as returned by a strategy
+        :return: New GameState
+        """
+        state = self.copy()
+        state.act(action)
+        return state
+
+    def act(self, action):
+        """
+        Applies an action of the player to act in place.
+
+        :param action: Tuple (action, amount); call amounts are computed, raise amounts are the chips put in
+                       and must reach the minimum raise of valid_actions unless they put the player all-in
+        :raises ValueError: If nobody is to act or the action is not valid
+        """
+        seat = self.to_act
+        if seat < 0:
+            raise ValueError("No player to act")
+        name, amount = action
+        if name == "fold":
+            self.folded |= 1 << seat
+        elif name == "call":
+            self._put_in(seat, self.current_bet - self.bets[seat])
+        elif name == "raise":
+            raise_range = self.valid_actions()["raise"]
+            if raise_range is None or amount is None or amount <= self.current_bet - self.bets[seat]:
+                raise ValueError(f"Invalid raise of {amount} chips")
+            if amount < raise_range[0] and amount < self.stacks[seat]:
+                raise ValueError(f"Raise of {amount} chips below the minimum of {raise_range[0]}")
+            self._put_in(seat, amount)
+            if self.bets[seat] > self.current_bet:
+                self.current_bet = self.bets[seat]
+                self.acted = 0  # Everyone gets another chance
+        else:
+            raise ValueError(f"Invalid action: {name}")
+        self.acted |= 1 << seat
+        self._advance(seat)
+
+    def deal(self, cards):
+        """
+        Adds community cards in place (the chance moves between streets).
+
+        :param cards: Card codes or Cards
+        """
+        self.board += tuple(cards)
+
+    def payouts(self):
+        """
+        Splits the pot of a finished hand, side pots included (odd chips go to the first seats).
+
+        :return: List of the chips won by every seat; subtract contributed for net results
+        """
+        active = self.active_seats
+        payouts = [0] * self.num_players
+        if len(active) == 1:
+            payouts[active[0]] = self.pot
+            return payouts
+        if len(self.board) < 5:
+            raise ValueError("The board must be complete to split the pot")
+
+        strengths = {seat: evaluate_codes(self.hole_cards[seat] + self.board) for seat in active}
+        previous_level = 0
+        for level in sorted(set(self.contributed)):
+            if level == 0:
+                continue
+            pot = sum(min(bet, level) - previous_level for bet in self.contributed if bet > previous_level)
+            eligible = [seat for seat in active if self.contributed[seat] >= level]
+            if eligible:
+                best = max(strengths[seat] for seat in eligible)
+                winners = [seat for seat in eligible if strengths[seat] == best]
+                share, remainder = divmod(pot, len(winners))
+                for index, seat in enumerate(winners):
+                    payouts[seat] += share + (index < remainder)
+            else:
+                # Chips nobody still in can claim (e.g. an uncalled over-bet that folded) go back to their owners
+                for seat in range(self.num_players):
+                    if self.contributed[seat] > previous_level:
+                        payouts[seat] += min(self.contributed[seat], level) - previous_level
+            previous_level = level
+        return payouts
+
+    def _put_in(self, seat, amount):
+        amount = min(amount, self.stacks[seat])
+        self.stacks[seat] -= amount
+        self.bets[seat] += amount
+        self.contributed[seat] += amount
+        if self.stacks[seat] == 0:
+            self.all_in |= 1 << seat
+
+    def _can_act(self, seat):
+        return not (self.folded | self.all_in) >> seat & 1
+
+    def _next_to_act(self, seat):
+        """
+        Returns the first seat after seat still owing an action on this street, or -1.
+        """
+        for offset in range(1, self.num_players + 1):
+            candidate = (seat + offset) % self.num_players
+            if self._can_act(candidate) and (
+                    not self.acted >> candidate & 1 or self.bets[candidate] < self.current_bet):
+                return candidate
+        return -1
+
+    def _advance(self, seat):
+        """
+        Moves the turn after seat acted, closing the street (or the hand) when nobody owes an action.
+        """
+        if len(self.active_seats) == 1:
+            self.to_act = -1
+            self.street = SHOWDOWN
+            return
+        self.to_act = self._next_to_act(seat)
+        if self.to_act >= 0:
+            return
+
+        can_act = sum(self._can_act(s) for s in range(self.num_players))
+        if self.street == RIVER or can_act <= 1:
+            self.street = SHOWDOWN
+            return
+        self.street += 1
+        for s in range(self.num_players):
+            self.bets[s] = 0
+        self.current_bet = 0
+        self.acted = 0
+        self.to_act = self._next_to_act(self.dealer)
+
+    def __str__(self):
+        seats = ", ".join(
+            f"{seat}: {self.stacks[seat]}" + (" folded" if self.folded >> seat & 1 else "")
+            + (" all-in" if self.all_in >> seat & 1 else "") + (" *" if seat == self.to_act else "")
+            for seat in range(self.num_players)
+        )
+        return f"{STREET_NAMES[self.street]} | Pot: {self.pot} | Current Bet: {self.current_bet} | {seats}"
+
+
+if __name__ == "__main__":
+    import time
+
+    from game import Game
+    from strategies import RangeStrategy
+
+    state = GameState.new_hand([20000] * 6, dealer=0)
+    print(state)
+    state = state.apply(("raise", state.valid_actions()["raise"][0]))
+    print(state)
+
+    # Branch every action of the player to act, many times over, from one snapshot
+    snapshot = state.snapshot()
+    start = time.perf_counter()
+    for _ in range(10000):
+        for action in (("fold", None), ("call", None), ("raise", state.valid_actions()["raise"][0])):
+            state.act(action)
+            state.restore(snapshot)
+    elapsed = time.perf_counter() - start
+    print(f"30000 act/restore in {elapsed * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        state.apply(("call", None))
+    print(f"10000 apply in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Capture a live headless game at every decision and check the state agrees on the legal actions
+    class Checked(RangeStrategy):
+        def choose_action(self, valid_actions, player=None, game=None):
+            captured = GameState.from_game(game, player)
+            assert captured.valid_actions() == valid_actions
+            return super().choose_action(valid_actions, player, game)
+
+    game = Game([f"Player {i + 1}" for i in range(6)], [20000] * 6, rng=42, strategies=Checked())
+    game.start_game(max_hands=200)
+    print("Captured states match the live game over 200 hands")
@@ -0,0 +1,227 @@
+"""
+Stores keeping the state of the tables outside the server process.
+
+Each table is saved as serialized JSON (see Game.to_dict) with a version
+number. A request loads the table, changes it and saves it back with the
+version it loaded; if another request (possibly in another gunicorn worker)
+saved the table in between, save raises VersionConflict and the request is
+retried on the fresh state (optimistic concurrency). No game lives in a
+thread between requests, so any worker can serve any request.
+
+MemoryStateStore keeps the tables in the process (single worker, and
+scripts); SQLiteStateStore shares them between the processes of a machine
+through one SQLite file in WAL mode.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+
+class VersionConflict(Exception):
+    """
+    Raised when a table was saved by someone else since it was loaded.
+    """
+
+
+class MemoryStateStore:
+    """
+    Tables of one process, kept as JSON text like in the shared stores.
+    """
+
+    shared = False  # Other processes do not see these tables
+
+    def __init__(self):
+        self._tables = {}  # Table id to (version, last update, JSON text)
+        self._lock = threading.Lock()
+
+    def version(self, table_id):
+        """
+        Returns the version of a table, 0 if it was never saved.
+        """
+        entry = self._tables.get(table_id)
+        return entry[0] if entry else 0
+
+    def load(self, table_id):
+        """
+        Returns the state of a table.
+
+        :return: Tuple (data, version); (None, 0) if the table was never saved
+        """
+        entry = self._tables.get(table_id)
+        if entry is None:
+            return None, 0
+        return json.loads(entry[2]), entry[0]
+
+    def save(self, table_id, data, version):
+        """
+        Saves the state of a table loaded at the given version.
+
+        :param data: JSON-compatible state
+        :param version: Version the state was loaded at (0 for a new table)
+        :return: New version
+        :raises VersionConflict: If the table was saved by someone else since
+        """
+        text = json.dumps(data, separators=(",", ":"))
+        with self._lock:
+            if self.version(table_id) != version:
+                raise VersionConflict(table_id)
+            self._tables[table_id] = (version + 1, time.time(), text)
+        return version + 1
+
+    def delete(self, table_id):
+        with self._lock:
+            self._tables.pop(table_id, None)
+
+    def delete_idle(self, idle_timeout):
+        """
+        Deletes the tables not saved for idle_timeout seconds.
+
+        :return: Number of tables deleted
+        """
+        deadline = time.time() - idle_timeout
+        with self._lock:
+            idle = [table_id for table_id, entry in self._tables.items() if entry[1] < deadline]
+            for table_id in idle:
+                del self._tables[table_id]
+        return len(idle)
+
+
+class SQLiteStateStore:
+    """
+    Tables in a SQLite file shared by the workers of a server.
+    """
+
+    shared = True
+
+    def __init__(self, path):
+        """
+        :param path: SQLite database file, created if needed
+        """
+        self.path = path
+        self._local = threading.local()  # One connection per thread
+        with self._connection() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS tables (
+                    table_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    updated REAL NOT NULL,
+                    data TEXT NOT NULL
+                )""")
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def version(self, table_id):
+        """
+        Returns the version of a table, 0 if it was never saved.
+        """
+        row = self._connection().execute("SELECT version FROM tables WHERE table_id = ?", (table_id,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, table_id):
+        """
+        Returns the state of a table.
+
+        :return: Tuple (data, version); (None, 0) if the table was never saved
+        """
+        row = self._connection().execute(
+            "SELECT data, version FROM tables WHERE table_id = ?", (table_id,)).fetchone()
+        if row is None:
+            return None, 0
+        return json.loads(row[0]), row[1]
+
+    def save(self, table_id, data, version):
+        """
+        Saves the state of a table loaded at the given version.
+
+        :param data: JSON-compatible state
+        :param version: Version the state was loaded at (0 for a new table)
+        :return: New version
+        :raises VersionConflict: If the table was saved by someone else since
+        """
+        text = json.dumps(data, separators=(",", ":"))
+        with self._connection() as connection:
+            if version == 0:
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO tables (table_id, version, updated, data) VALUES (?, 1, ?, ?)",
+                    (table_id, time.time(), text))
+            else:
+                cursor = connection.execute(
+                    "UPDATE tables SET version = version + 1, updated = ?, data = ? WHERE table_id = ? AND version = ?",
+                    (time.time(), text, table_id, version))
+        if cursor.rowcount != 1:
+            raise VersionConflict(table_id)
+        return version + 1
+
+    def delete(self, table_id):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM tables WHERE table_id = ?", (table_id,))
+
+    def delete_idle(self, idle_timeout):
+        """
+        Deletes the tables not saved for idle_timeout seconds.
+
+        :return: Number of tables deleted
+        """
+        with self._connection() as connection:
+            cursor = connection.execute("DELETE FROM tables WHERE updated < ?", (time.time() - idle_timeout,))
+        return cursor.rowcount
+
+
+def make_state_store(path=None):
+    """
+    Returns a SQLiteStateStore on path, or a MemoryStateStore when no path is given.
+    """
+    return SQLiteStateStore(path) if path else MemoryStateStore()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    from game import Game
+
+    path = os.path.join(tempfile.mkdtemp(), "tables.db")
+
+    def play_actions(worker):
+        """
+        Calls until the hand waits for the flop, from a separate process, retrying on conflicts.
+        """
+        store = SQLiteStateStore(path)
+        actions = conflicts = 0
+        while True:
+            data, version = store.load("demo")
+            game = Game.from_dict(data, verbose=False)
+            player = game.current_betting_round.next_player()
+            if player is None or game.awaiting_flop_input:
+                return actions, conflicts
+            game.perform_action(player.name, "call", game.current_betting_round.get_valid_actions(player)["call"])
+            try:
+                store.save("demo", game.to_dict(), version)
+                actions += 1
+            except VersionConflict:
+                conflicts += 1
+
+    store = SQLiteStateStore(path)
+    game = Game(["You", "Bob", "Carol", "Dan", "Eve", "Frank"], [1000] * 6, rng=42, verbose=False)
+    game.start_hand()
+    store.save("demo", game.to_dict(), 0)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(play_actions, range(4)))
+    data, version = store.load("demo")
+    print(f"Actions saved per worker: {[actions for actions, _ in results]}, "
+          f"conflicts retried: {sum(conflicts for _, conflicts in results)}")
+    print(f"Version {version}, pot {data['pot']}, awaiting flop: {data['awaiting_flop_input']}")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        data, version = store.load("demo")
+        version = store.save("demo", Game.from_dict(data, verbose=False).to_dict(), version)
+    print(f"1000 load/rebuild/save cycles in {time.perf_counter() - start:.2f} s")
@@ -0,0 +1,148 @@
+"""
+Pluggable decision strategies for headless play.
+
+A strategy decides synchronously: Player.make_decision calls
+``strategy.choose_action(valid_actions, player=player, game=game)`` and gets
+back an ``(action, amount)`` tuple, exactly what the frontend would have sent
+to /action. Strategies are passed to Game (and from there to BettingRound) as
+a dictionary of player name to strategy, or as a single strategy for every
+player.
+"""
+from abc import ABC, abstractmethod
+
+from assistant import chart_position, classify_hand, determine_position
+from evaluator import HandEvaluator
+from hand_range import Range
+from lookup_evaluator import ONE_PAIR, TWO_PAIR, strength_category
+from ranges import PREFLOP_BET_RANGES
+from rng import make_rng
+
+
+def _call(valid_actions):
+    return "call", valid_actions["call"]
+
+
+def _raise(valid_actions):
+    """
+    Makes the smallest legal raise, or calls when raising is not allowed.
+    """
+    if not valid_actions.get("raise"):
+        return _call(valid_actions)
+    min_raise, max_raise = valid_actions["raise"]
+    return "raise", min(min_raise, max_raise)
+
+
+def _check_or_fold(valid_actions):
+    if valid_actions["call"] == 0:
+        return _call(valid_actions)
+    return "fold", None
+
+
+class Strategy(ABC):
+    """
+    Base class of the decision strategies; subclasses implement choose_action.
+    """
+
+    @abstractmethod
+    def choose_action(self, valid_actions, player=None, game=None):
+        """
+        Picks an action.
+
+        :param valid_actions: Dictionary of valid actions, as returned by BettingRound.get_valid_actions
+        :param player: Player to act
+        :param game: Game being played
+        :return: Tuple (action, amount)
+        """
+
+    def seed(self, rng):
+        """
+        Gives the strategy its own random stream (e.g., one per simulation worker).
+
+        :param rng: Seed or numpy Generator (see rng.make_rng)
+        """
+
+
+class CallingStation(Strategy):
+    """
+    Always checks or calls.
+    """
+
+    def choose_action(self, valid_actions, player=None, game=None):
+        return _call(valid_actions)
+
+
+class RandomStrategy(Strategy):
+    """
+    Folds, calls or makes a minimum raise at random (never folds when checking is free).
+    """
+
+    def __init__(self, fold=0.2, raise_=0.1, rng=None):
+        """
+        :param fold: Probability of folding when facing a bet
+        :param raise_: Probability of raising
+        :param rng: Seed or numpy Generator (see rng.make_rng)
+        """
+        self.fold = fold
+        self.raise_ = raise_
+        self.rng = make_rng(rng)
+
+    def choose_action(self, valid_actions, player=None, game=None):
+        draw = self.rng.random()
+        if draw < self.raise_:
+            return _raise(valid_actions)
+        if draw < self.raise_ + self.fold:
+            return _check_or_fold(valid_actions)
+        return _call(valid_actions)
+
+    def seed(self, rng):
+        self.rng = make_rng(rng)
+
+
+class RangeStrategy(Strategy):
+    """
+    Plays the PREFLOP_BET_RANGES charts preflop, then bets two pair or better,
+    calls with one pair and checks or folds everything else.
+    """
+
+    def __init__(self, bet_ranges=None):
+        """
+        :param bet_ranges: Preflop charts with the layout of ranges.PREFLOP_BET_RANGES (defaults to it)
+        """
+        bet_ranges = bet_ranges or PREFLOP_BET_RANGES
+        self.open_ranges = {}
+        self.call_ranges = {}
+        self.three_bet_ranges = {}
+        for position, rules in bet_ranges.items():
+            open_raise = rules.get("open_raise", {})
+            self.open_ranges[position] = Range.from_notations(
+                open_raise.get("pairs", []) + open_raise.get("suited", []) + open_raise.get("offsuit", [])
+            )
+            self.call_ranges[position] = Range.from_notations(rules.get("call_vs_raise", []))
+            self.three_bet_ranges[position] = Range.from_notations(rules.get("3bet_vs_raise", []))
+
+    def choose_action(self, valid_actions, player=None, game=None):
+        if not game.community_cards:
+            return self._preflop_action(valid_actions, player, game)
+
+        category = strength_category(HandEvaluator.hand_strength(player.hole_cards, game.community_cards))
+        if category >= TWO_PAIR:
+            return _raise(valid_actions)
+        if category == ONE_PAIR:
+            return _call(valid_actions)
+        return _check_or_fold(valid_actions)
+
+    def _preflop_action(self, valid_actions, player, game):
+        position = chart_position(
+            determine_position((player.position - game.dealer_position) % len(game.players), len(game.players)))
+        hand = classify_hand(player.hole_cards)
+        has_raiser = any(p.current_bet > game.big_blind for p in game.players if p is not player)
+
+        if not has_raiser:
+            if self.open_ranges[position].includes(hand):
+                return _raise(valid_actions)
+            return _check_or_fold(valid_actions)
+        if self.three_bet_ranges[position].includes(hand):
+            return _raise(valid_actions)
+        if self.call_ranges[position].includes(hand):
+            return _call(valid_actions)
+        return _check_or_fold(valid_actions)
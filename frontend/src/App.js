@@ -3,7 +3,7 @@ import Table from "./components/Table";
 import HoleCardSelector from "./components/HoleCardSelector";
 import FlopCardSelector from "./components/FlopCardSelector";
 import TurnCardSelector from "./components/TurnCardSelector";
-import { sendGameConfig, startGame, fetchGameState, resetGame } from "./api";
+import { sendGameConfig, startGame, subscribeGameState, resetGame } from "./api";
 import "./App.css";
 
 const DEFAULT_STACK = 20000;
@@ -33,11 +33,7 @@ function App() {
   const [waitingForTurn, setWaitingForTurn] = useState(false);
 
   useEffect(() => {
-    let isActive = true;
-  
-    const poll = async () => {
-      if (!isActive) return;
-      const state = await fetchGameState();
+    const onState = (state) => {
       setGameState(state);
       setActivePlayer(state.active_player);
 
@@ -52,17 +48,11 @@ function App() {
         console.log("Triggering waitingForTurn");
         setWaitingForTurn(true);
       }
-
-      setTimeout(poll, 200);  // Reschedule next poll
     };
   
-    if (gameStarted) {
-      poll(); // Start polling
-    }
-  
-    return () => {
-      isActive = false; // Stop loop on unmount or game stop
-    };
+    if (!gameStarted) return;
+    // The server pushes the state whenever it changes
+    return subscribeGameState(onState); // Unsubscribe on unmount or game stop
   }, [gameStarted]);
 
   useEffect(() => {
@@ -15,11 +15,36 @@ export async function startGame() {
     return res.json();
 }
 
-export const fetchGameState = async () => {
-    const response = await axios.get(`${API_URL}/game_state`);
+export const fetchGameState = async (table = "default") => {
+    const response = await axios.get(`${API_URL}/game_state`, { params: { table }, withCredentials: true });
     return response.data;
 };
 
+// Calls onState with the game state now and every time it changes, pushed by the server
+// (Server-Sent Events; falls back to polling where EventSource is missing). Returns a function to stop.
+export function subscribeGameState(onState, table = "default", pollInterval = 1000) {
+    if (typeof EventSource === "undefined") {
+        let active = true;
+        const poll = async () => {
+            if (!active) return;
+            try {
+                onState(await fetchGameState(table));
+            } catch (error) {
+                console.error("Failed to fetch game state:", error);  // Retried at the next poll
+            } finally {
+                setTimeout(poll, pollInterval);
+            }
+        };
+        poll();
+        return () => { active = false; };
+    }
+
+    const params = new URLSearchParams({ table });
+    const source = new EventSource(`${API_URL}/game_state/stream?${params}`, { withCredentials: true });
+    source.addEventListener("state", (event) => onState(JSON.parse(event.data)));
+    return () => source.close();  // EventSource reconnects by itself until closed
+}
+
 export const sendAction = async (player, action, amount = 0) => {
     await axios.post(`${API_URL}/action`, { player, action, amount });
 };
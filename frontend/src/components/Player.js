@@ -63,7 +63,7 @@ export default function Player({ player, onUpdate, disabled, position, dealerPos
                                     if (equity_results && Object.keys(equity_results).length > 0) {
                                         const formatted = Object.entries(equity_results)
                                             .map(([pos, info]) =>
-                                                `${pos}: EQ ${info.equity.toFixed(1)}% (${info.outs} outs)`
+                                                `${pos}: EQ ${info.equity.toFixed(1)}%${info.outs === null ? "" : ` (${info.outs} outs)`}`
                                             )
                                             .join("\n");
                                         setSuggestion(formatted);
@@ -0,0 +1,99 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import app  # noqa: E402
+from sessions import TableManager  # noqa: E402
+from state_store import SQLiteStateStore, VersionConflict  # noqa: E402
+
+
+class TableRouteTest(unittest.TestCase):
+    """
+    Saving tables from the routes when two workers share a store.
+    """
+
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(), "tables.db")
+        self.worker = TableManager(SQLiteStateStore(path))
+        self.other_worker = TableManager(SQLiteStateStore(path))
+        patcher = mock.patch.object(app, "tables", self.worker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        table = self.worker.get("t")
+        table.config_locked = True
+        self.worker.save(table)
+
+    def call(self, view):
+        with app.app.test_request_context("/?table=t"):
+            return app.table_route(mutates=True)(view)()
+
+    def change_from_other_worker(self):
+        table = self.other_worker.get("t")
+        table.config_locked = not table.config_locked
+        self.other_worker.save(table)
+
+    def test_stale_save_raises_and_reloads(self):
+        stale = self.worker.get("t")
+        self.change_from_other_worker()
+        stale.config_locked = False
+        with self.assertRaises(VersionConflict):
+            self.worker.save(stale)
+        self.assertNotIn("t", self.worker)
+        self.assertEqual(self.worker.get("t").version, 2)
+
+    def test_conflict_runs_the_view_again_on_the_fresh_state(self):
+        calls = []
+
+        def view(table):
+            calls.append((table.version, table.config_locked))
+            if len(calls) == 1:
+                self.change_from_other_worker()  # Saved while this request runs
+            table.config_locked = not table.config_locked
+            return app.jsonify({"message": "ok"})
+
+        response = self.call(view)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, [(1, True), (2, False)])
+        data, version = self.worker.store.load("t")
+        self.assertEqual((data["config_locked"], version), (True, 3))
+
+    def test_busy_table_after_every_attempt_conflicted(self):
+        calls = []
+
+        def view(table):
+            calls.append(table.version)
+            self.change_from_other_worker()
+            table.config_locked = not table.config_locked
+            return app.jsonify({"message": "ok"})
+
+        response, status = self.call(view)
+        self.assertEqual(status, 409)
+        self.assertEqual(calls, list(range(1, app.SAVE_ATTEMPTS + 1)))
+        self.assertEqual(self.worker.store.version("t"), 1 + app.SAVE_ATTEMPTS)  # Only the other worker saved
+
+    def test_exception_drops_the_changed_table(self):
+        def view(table):
+            table.reset()
+            raise RuntimeError("view failed")
+
+        with self.assertRaises(RuntimeError):
+            self.call(view)
+        self.assertTrue(self.worker.get("t").config_locked)
+
+    def test_error_response_drops_the_changed_table(self):
+        def view(table):
+            table.reset()
+            return app.jsonify({"error": "Invalid"}), 400
+
+        response, status = self.call(view)
+        self.assertEqual(status, 400)
+        self.assertTrue(self.worker.get("t").config_locked)
+
+
+if __name__ == "__main__":
+    unittest.main()